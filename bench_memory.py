@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+组件内存基准 - 对比旧版（带 __dict__、运行时追加字段）与紧凑组件的内存占用
+"""
+
+import sys
+import os
+import tracemalloc
+from dataclasses import dataclass
+from typing import Dict, List, Any
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.ecs.components import (AttributeComponent, SkillComponent, StateComponent,
+                                 InventoryComponent, EquipmentComponent, PositionComponent)
+
+# ---- 旧版组件（与改造前定义一致） ----
+
+@dataclass
+class LegacyAttributeComponent:
+    health: int = 100
+    max_health: int = 100
+    mana: int = 50
+    max_mana: int = 50
+    constitution: int = 5
+    comprehension: int = 5
+    charm: int = 5
+    luck: int = 5
+    spiritual_root: int = 3
+    physical_attack: int = 10
+    spell_attack: int = 0
+    defense: int = 5
+    lifespan: int = 80
+    age: int = 16
+
+@dataclass
+class LegacySkillComponent:
+    learned_spells: List[str] = None
+    learned_gongfa: List[str] = None
+
+    def __post_init__(self):
+        if self.learned_spells is None:
+            self.learned_spells = []
+        if self.learned_gongfa is None:
+            self.learned_gongfa = []
+
+@dataclass
+class LegacyStateComponent:
+    realm: str = "mortal"
+    sect: str = None
+    buffs: Dict[str, Any] = None
+    debuffs: Dict[str, Any] = None
+
+    def __post_init__(self):
+        if self.buffs is None:
+            self.buffs = {}
+        if self.debuffs is None:
+            self.debuffs = {}
+
+@dataclass
+class LegacyInventoryComponent:
+    items: Dict[str, int] = None
+    capacity: int = 100
+
+    def __post_init__(self):
+        if self.items is None:
+            self.items = {}
+
+@dataclass
+class LegacyEquipmentComponent:
+    weapon: str = None
+    armor: str = None
+    accessory: str = None
+
+@dataclass
+class LegacyPositionComponent:
+    x: float = 0.0
+    y: float = 0.0
+    scene: str = "starting_village"
+
+def build_legacy():
+    attr = LegacyAttributeComponent()
+    # 旧版由各系统在运行时追加的字段
+    attr.determination = 3
+    attr.bone_root = 3
+    attr.power = 0
+    attr.talent = 0
+    attr.experience = 0
+    attr.level = 1
+    attr.martial_bonus = 0
+    attr.social_bonus = 0
+    attr.luck_modifier = 0.0
+    return (attr, LegacySkillComponent(), LegacyStateComponent(), LegacyInventoryComponent(),
+            LegacyEquipmentComponent(), LegacyPositionComponent())
+
+def build_compact():
+    return (AttributeComponent(), SkillComponent(), StateComponent(), InventoryComponent(),
+            EquipmentComponent(), PositionComponent())
+
+def measure(builder, count):
+    """返回创建count组组件占用的字节数"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = [builder() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del entities
+    return after - before
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    legacy = measure(build_legacy, count)
+    compact = measure(build_compact, count)
+
+    print(f"=== 组件内存基准（{count} 个实体，每个6个组件） ===")
+    print(f"旧版组件: {legacy / 1024 / 1024:8.1f} MB  ({legacy / count:6.0f} B/实体)")
+    print(f"紧凑组件: {compact / 1024 / 1024:8.1f} MB  ({compact / count:6.0f} B/实体)")
+    print(f"节省: {(1 - compact / legacy) * 100:.1f}%")
+
+if __name__ == "__main__":
+    main()
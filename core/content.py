@@ -0,0 +1,139 @@
+"""
+内容注册表 - data/ 下的每个文件在进程内只解析一次，所有使用方共享同一份只读数据
+
+数据经由数据目录读取（见 data_catalog），解析结果冻结为只读的字典与列表后缓存；
+修改数据文件后需调用 invalidate 丢弃缓存，下次访问时重新读取；
+changed 列出读取后被修改过的文件（数据管理器的热重载据此只重新读取变化的文件）。
+"""
+
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from .data_catalog import DataCatalog, data_catalog
+
+_MISSING = object()
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} 是共享的只读数据，需要修改时请先复制")
+
+class FrozenDict(dict):
+    """只读字典（dict(frozen) 可得到可修改的浅拷贝）"""
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+class FrozenList(list):
+    """只读列表（list(frozen) 可得到可修改的浅拷贝）"""
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = _readonly
+    append = extend = insert = pop = remove = clear = sort = reverse = _readonly
+    __iadd__ = __imul__ = _readonly
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+_EMPTY = FrozenDict()
+
+def freeze(value: Any) -> Any:
+    """把解析出的JSON数据递归转换为只读对象"""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+class ContentRegistry:
+    """内容注册表 - 按文件名（如 "taiwu_system.json"）记忆解析后的只读数据"""
+
+    def __init__(self, catalog: DataCatalog = None):
+        self.catalog = catalog or data_catalog
+        self._content: Dict[str, Any] = {}
+        # 文件名 -> 读取时源文件的 (大小, 修改时间纳秒)
+        self._stamps: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._lock = threading.Lock()
+        # 实际读取文件的次数
+        self.loads = 0
+
+    def get(self, name: str, default: Any = _MISSING) -> Any:
+        """读取数据文件；文件缺失或无法解析时返回default，未提供default则抛出异常"""
+        content = self._content.get(name, _MISSING)
+        if content is not _MISSING:
+            return content
+        with self._lock:
+            # 等锁期间其他线程可能已经读取完毕
+            content = self._content.get(name, _MISSING)
+            if content is not _MISSING:
+                return content
+            # 读取前记下版本，读取期间发生的修改在下次检查时仍能发现
+            stamp = self.stamp(name)
+            try:
+                content = freeze(self.catalog.load(name))
+            except (OSError, ValueError):
+                if default is _MISSING:
+                    raise
+                return default
+            self.loads += 1
+            self._content[name] = content
+            self._stamps[name] = stamp
+            return content
+
+    def section(self, name: str, key: str, default: Any = _EMPTY) -> Any:
+        """数据文件中顶层某个键的内容（文件或键缺失时返回default，默认为空的只读字典）"""
+        content = self.get(name, None)
+        if not isinstance(content, dict) or key not in content:
+            return default
+        return content[key]
+
+    def invalidate(self, name: str = None):
+        """丢弃某个文件（不指定时为全部文件）的缓存"""
+        with self._lock:
+            if name is None:
+                self._content.clear()
+                self._stamps.clear()
+            else:
+                self._content.pop(name, None)
+                self._stamps.pop(name, None)
+
+    def read(self, names: List[str]) -> Dict[str, Tuple[Any, Optional[Tuple[int, int]]]]:
+        """重新读取文件而不改动缓存，返回 文件名 -> (只读数据, 版本)
+
+        任一文件缺失或无法解析时抛出异常；读取成功后由 replace 一并换入。
+        """
+        staged = {}
+        for name in names:
+            stamp = self.stamp(name)
+            staged[name] = (freeze(self.catalog.load(name)), stamp)
+        return staged
+
+    def replace(self, staged: Dict[str, Tuple[Any, Optional[Tuple[int, int]]]]):
+        """换入 read 读取的数据"""
+        with self._lock:
+            for name, (content, stamp) in staged.items():
+                self._content[name] = content
+                self._stamps[name] = stamp
+            self.loads += len(staged)
+
+    def stamp(self, name: str) -> Optional[Tuple[int, int]]:
+        """源文件当前的 (大小, 修改时间纳秒)，文件不存在时为None"""
+        try:
+            stat = os.stat(os.path.join(self.catalog.data_dir, name))
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def changed(self) -> List[str]:
+        """已缓存的文件中，源文件在读取后被修改或删除的文件名"""
+        return sorted(name for name, stamp in list(self._stamps.items()) if self.stamp(name) != stamp)
+
+    def loaded(self) -> List[str]:
+        """已缓存的文件名"""
+        return sorted(self._content)
+
+# 全局内容注册表
+content_registry = ContentRegistry()
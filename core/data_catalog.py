@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+数据目录编译 - 把 data/ 下的全部 JSON 校验后编译为一个二进制目录文件
+
+编译产物按源文件的大小、修改时间与内容摘要记录版本，加载时逐个文件比对；
+目录文件缺失、格式版本不符或某个源文件已修改时，该文件自动退回解析JSON。
+
+用法: python -m core.data_catalog [--check]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+from typing import Any, Dict, List, Optional, Tuple
+
+# 目录文件格式版本，结构变化时递增，旧的目录文件随之失效
+CATALOG_FORMAT = 1
+DEFAULT_DATA_DIR = "data"
+DEFAULT_CATALOG_PATH = os.path.join("build", "data_catalog.pickle")
+
+# 源文件版本信息：(大小, 修改时间纳秒, 内容摘要)
+SourceInfo = Tuple[int, int, str]
+
+class CatalogError(ValueError):
+    """数据校验失败"""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("\n".join(errors))
+        self.errors = errors
+
+def _digest(raw: bytes) -> str:
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+def source_info(path: str, raw: bytes = None) -> SourceInfo:
+    """源文件的版本信息"""
+    stat = os.stat(path)
+    if raw is None:
+        with open(path, "rb") as f:
+            raw = f.read()
+    return (stat.st_size, stat.st_mtime_ns, _digest(raw))
+
+def validate(name: str, data: Any) -> List[str]:
+    """校验一份数据，返回错误列表
+
+    顶层必须是对象；以对象为值的表（顶层或下一层）中，带 id 字段的记录其 id 必须与键一致。
+    """
+    if not isinstance(data, dict):
+        return [f"{name}: 顶层应为对象"]
+
+    errors = []
+    tables = [(name, data)]
+    tables.extend((f"{name}.{key}", value) for key, value in data.items() if isinstance(value, dict))
+    for table_name, table in tables:
+        for key, record in table.items():
+            if isinstance(record, dict) and "id" in record and record["id"] != key:
+                errors.append(f"{table_name}: 记录 {key} 的 id 为 {record['id']!r}")
+    return errors
+
+def compile_catalog(data_dir: str = DEFAULT_DATA_DIR, catalog_path: str = DEFAULT_CATALOG_PATH,
+                    write: bool = True) -> List[str]:
+    """校验并编译数据目录，返回编入的文件名；存在错误时抛出 CatalogError，不写入目录文件"""
+    sources: Dict[str, SourceInfo] = {}
+    data: Dict[str, Any] = {}
+    errors = []
+    for name in sorted(os.listdir(data_dir)):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(data_dir, name)
+        with open(path, "rb") as f:
+            raw = f.read()
+        try:
+            parsed = json.loads(raw.decode("utf-8"))
+        except ValueError as e:
+            errors.append(f"{name}: {e}")
+            continue
+        errors.extend(validate(name, parsed))
+        sources[name] = source_info(path, raw)
+        data[name] = parsed
+
+    if errors:
+        raise CatalogError(errors)
+
+    if write:
+        directory = os.path.dirname(catalog_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 先写临时文件再替换，并发启动的模拟进程不会读到写了一半的目录
+        temp_path = f"{catalog_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump({"format": CATALOG_FORMAT, "sources": sources, "data": data}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, catalog_path)
+    return list(data)
+
+class DataCatalog:
+    """数据目录 - 优先从编译好的目录文件读取数据，源文件有变化时退回解析JSON
+
+    目录文件只应由 compile_catalog 生成（加载时按 pickle 反序列化）。
+    返回的数据对象在多个使用方之间共享，不应修改。
+    """
+
+    def __init__(self, data_dir: str = DEFAULT_DATA_DIR, catalog_path: str = DEFAULT_CATALOG_PATH):
+        self.data_dir = data_dir
+        self.catalog_path = catalog_path
+        self._compiled: Optional[Dict[str, Any]] = None
+        # 从目录文件读取 / 退回解析JSON 的次数
+        self.hits = 0
+        self.fallbacks = 0
+
+    def _catalog(self) -> Dict[str, Any]:
+        """编译好的目录（首次使用时读取，缺失或版本不符时为空）"""
+        if self._compiled is None:
+            compiled = None
+            try:
+                with open(self.catalog_path, "rb") as f:
+                    compiled = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+                compiled = None
+            if not isinstance(compiled, dict) or compiled.get("format") != CATALOG_FORMAT:
+                compiled = {"sources": {}, "data": {}}
+            self._compiled = compiled
+        return self._compiled
+
+    def is_fresh(self, name: str) -> bool:
+        """目录中的数据是否与源文件一致"""
+        recorded = self._catalog()["sources"].get(name)
+        if recorded is None:
+            return False
+        path = os.path.join(self.data_dir, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if (stat.st_size, stat.st_mtime_ns) == tuple(recorded[:2]):
+            return True
+        # 修改时间变了但内容未变（如重新检出）时仍可使用
+        return stat.st_size == recorded[0] and source_info(path)[2] == recorded[2]
+
+    def load(self, name: str) -> Any:
+        """读取 data/ 下的一个文件（文件名如 "spell.json"），文件不存在时抛出 OSError"""
+        if self.is_fresh(name):
+            self.hits += 1
+            return self._catalog()["data"][name]
+        self.fallbacks += 1
+        with open(os.path.join(self.data_dir, name), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def invalidate(self):
+        """丢弃已读取的目录（重新编译后调用）"""
+        self._compiled = None
+
+    def stale_sources(self) -> List[str]:
+        """目录中已过期或缺失的源文件"""
+        names = sorted(name for name in os.listdir(self.data_dir) if name.endswith(".json"))
+        return [name for name in names if not self.is_fresh(name)]
+
+# 全局数据目录
+data_catalog = DataCatalog()
+
+def main():
+    parser = argparse.ArgumentParser(description="编译数据目录")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="数据目录")
+    parser.add_argument("--output", default=DEFAULT_CATALOG_PATH, help="目录文件路径")
+    parser.add_argument("--check", action="store_true", help="只校验数据并列出过期的源文件，不写入")
+    args = parser.parse_args()
+
+    try:
+        names = compile_catalog(args.data_dir, args.output, write=not args.check)
+    except CatalogError as e:
+        print(f"=== 数据校验失败: {len(e.errors)} 处错误 ===")
+        for error in e.errors:
+            print(f"  {error}")
+        raise SystemExit(1)
+
+    if args.check:
+        stale = DataCatalog(args.data_dir, args.output).stale_sources()
+        print(f"=== 校验通过: {len(names)} 个文件 ===")
+        print(f"过期的源文件: {', '.join(stale) if stale else '无'}")
+    else:
+        print(f"=== 已编译 {len(names)} 个文件 -> {args.output} ===")
+
+if __name__ == "__main__":
+    main()
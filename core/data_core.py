@@ -33,6 +33,14 @@ class DataCore:
     def get_encounter(self, encounter_id=None):
         """获取奇遇数据"""
         return self.data_manager.get_static_data('encounters', encounter_id)
+    
+    def records(self, data_type):
+        """某类数据的全部记录"""
+        return self.data_manager.records(data_type)
+    
+    def find(self, data_type, index_name, value):
+        """按二级索引查找记录"""
+        return self.data_manager.find(data_type, index_name, value)
 
 # 全局数据核心实例
 data_core = DataCore()
\ No newline at end of file
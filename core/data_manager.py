@@ -1,77 +1,223 @@
 import json
 import os
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from .events import EventBus, event_bus
+from .data_catalog import DataCatalog
+from .content import ContentRegistry, content_registry
+
+class DataSpec:
+    """数据类型描述 - 数据文件、记录所在的键以及需要建立的二级索引"""
+
+    __slots__ = ("path", "records", "indexes")
+
+    def __init__(self, path: str, records: str = None, indexes: Dict[str, Callable[[dict], Any]] = None):
+        self.path = path
+        # 记录表所在的顶层键，None表示文件顶层即为 ID -> 记录
+        self.records = records
+        # 索引名 -> 取索引键的函数
+        self.indexes = indexes or {}
+
+def _trigger_condition(*keys):
+    """奇遇触发条件中的字段"""
+    def get(encounter):
+        value = encounter.get("trigger_conditions", {})
+        for key in keys:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+    return get
+
+DATA_SPECS = {
+    'character_template': DataSpec('data/character_template.json'),
+    'spell': DataSpec('data/spell.json', records='spells', indexes={
+        'element': lambda spell: spell.get('element'),
+        'type': lambda spell: spell.get('type'),
+    }),
+    'item': DataSpec('data/item.json', indexes={
+        'type': lambda item: item.get('type'),
+    }),
+    'realm': DataSpec('data/realm.json', indexes={
+        'level': lambda realm: realm.get('level'),
+    }),
+    'encounters': DataSpec('data/encounter.json', records='encounters', indexes={
+        'location': _trigger_condition('location'),
+        'realm': _trigger_condition('requirements', 'realm'),
+    }),
+    'gongfa': DataSpec('data/gongfa.json'),
+    'techniques': DataSpec('data/techniques.json'),
+    'skills': DataSpec('data/skills.json'),
+}
 
 class DataManager:
-    """数据管理器 - 统一管理所有游戏数据"""
-    
-    def __init__(self):
-        self.data_cache = {}
-        self.data_files = {
-            'character_template': 'data/character_template.json',
-            'spell': 'data/spell.json',
-            'item': 'data/item.json',
-            'realm': 'data/realm.json',
-            'encounters': 'data/encounter.json',
-            'gongfa': 'data/gongfa.json',
-            'techniques': 'data/techniques.json',
-            'skills': 'data/skills.json'
-        }
-        self._load_all_data()
-    
-    def _load_all_data(self):
-        """加载所有数据文件"""
-        for data_type, file_path in self.data_files.items():
-            if os.path.exists(file_path):
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        self.data_cache[data_type] = json.load(f)
-                except Exception as e:
-                    print(f"加载数据文件 {file_path} 失败: {e}")
-                    self.data_cache[data_type] = {}
-            else:
-                self.data_cache[data_type] = {}
-    
-    def get_static_data(self, data_type: str, item_id: str = None) -> Optional[Dict[str, Any]]:
-        """获取静态数据"""
-        if data_type not in self.data_cache:
+    """数据管理器 - 统一管理所有游戏数据
+
+    数据文件在首次访问对应类型时才加载，加载时一次建好 ID -> 记录 的主索引
+    和声明的二级索引，之后按ID查找只是一次字典访问。
+    数据目录下的文件经由内容注册表读取（见 content），与其他系统共享同一份只读数据。
+    reload_changed 重新读取修改过的数据文件，用于不重启游戏的热重载。
+    """
+
+    def __init__(self, specs: Dict[str, DataSpec] = None, catalog: DataCatalog = None):
+        self.specs = dict(DATA_SPECS if specs is None else specs)
+        # 指定数据目录时使用独立的注册表与事件总线，重新加载不会通知读取全局数据的系统
+        self.content = content_registry if catalog is None else ContentRegistry(catalog)
+        self.events = event_bus if catalog is None else EventBus()
+        self.catalog = self.content.catalog
+        # 重新加载失败的文件 -> 失败时的版本（同一版本只报告一次错误）
+        self.reload_errors: Dict[str, Any] = {}
+        self.data_files = {data_type: spec.path for data_type, spec in self.specs.items()}
+        # 已加载的原始数据
+        self.data_cache: Dict[str, Any] = {}
+        # 数据类型 -> (ID -> 记录)
+        self.indexes: Dict[str, Dict[str, Any]] = {}
+        # 数据类型 -> 索引名 -> 索引键 -> 记录列表
+        self.secondary_indexes: Dict[str, Dict[str, Dict[Any, List[Any]]]] = {}
+
+    def _load(self, data_type: str) -> Optional[Dict[str, Any]]:
+        """加载数据文件并建立索引，返回主索引（未知类型返回None）"""
+        if data_type not in self.specs:
             return None
-        
-        data = self.data_cache[data_type]
-        
+        data, index, secondary = self._build(data_type)
+        self.data_cache[data_type] = data
+        self.indexes[data_type] = index
+        self.secondary_indexes[data_type] = secondary
+        return index
+
+    def _build(self, data_type: str) -> Tuple[Any, Dict[str, Any], Dict[str, Dict[Any, List[Any]]]]:
+        """读取数据文件，建立 (原始数据, 主索引, 二级索引)"""
+        spec = self.specs[data_type]
+        data = {}
+        if os.path.exists(spec.path):
+            try:
+                data = self._read(spec.path)
+            except Exception as e:
+                print(f"加载数据文件 {spec.path} 失败: {e}")
+                data = {}
+        return (data,) + self._index(data_type, data)
+
+    def _index(self, data_type: str, data: Any) -> Tuple[Dict[str, Any], Dict[str, Dict[Any, List[Any]]]]:
+        """为数据建立 (主索引, 二级索引)"""
+        spec = self.specs[data_type]
+        index = data
+        if spec.records is not None and isinstance(data.get(spec.records), dict):
+            index = data[spec.records]
+
+        secondary = {}
+        for name, key in spec.indexes.items():
+            table: Dict[Any, List[Any]] = {}
+            for record in index.values():
+                if isinstance(record, dict):
+                    table.setdefault(key(record), []).append(record)
+            secondary[name] = table
+        return index, secondary
+
+    def reload_changed(self) -> List[str]:
+        """重新读取读取后被修改过的数据文件，返回这些文件名
+
+        只重新解析变化的文件；全部解析成功、受影响数据类型的新索引全部建好后才一并替换，
+        读取方不会看到建了一半的索引。之后发出 data_reloaded 事件，
+        基于这些数据建立的缓存据此只让相关部分失效。
+        任一文件解析失败（如保存到一半）时保留原有数据，下次检查时重试。
+        """
+        changed = self.content.changed()
+        if not changed:
+            return []
+        try:
+            staged = self.content.read(changed)
+        except (OSError, ValueError) as e:
+            stamps = {name: self.content.stamp(name) for name in changed}
+            if stamps != self.reload_errors:
+                print(f"重新加载数据失败，继续使用原有数据: {e}")
+            self.reload_errors = stamps
+            return []
+        self.reload_errors = {}
+
+        data_dir = os.path.normpath(self.catalog.data_dir)
+        reloaded = [data_type for data_type, spec in self.specs.items()
+                    if data_type in self.data_cache
+                    and os.path.normpath(os.path.dirname(spec.path)) == data_dir
+                    and os.path.basename(spec.path) in changed]
+        built = {}
+        for data_type in reloaded:
+            data = staged[os.path.basename(self.specs[data_type].path)][0]
+            built[data_type] = (data,) + self._index(data_type, data)
+
+        self.content.replace(staged)
+        data_cache, indexes, secondary_indexes = dict(self.data_cache), dict(self.indexes), dict(self.secondary_indexes)
+        for data_type, (data, index, secondary) in built.items():
+            data_cache[data_type] = data
+            indexes[data_type] = index
+            secondary_indexes[data_type] = secondary
+        self.data_cache, self.indexes, self.secondary_indexes = data_cache, indexes, secondary_indexes
+
+        self.events.emit("data_reloaded", {"files": changed, "data_types": reloaded})
+        return changed
+
+    def _read(self, path: str) -> Any:
+        """读取数据文件"""
+        directory, name = os.path.split(path)
+        if os.path.normpath(directory) == os.path.normpath(self.catalog.data_dir):
+            return self.content.get(name)
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _data(self, data_type: str) -> Optional[Dict[str, Any]]:
+        """原始数据（按需加载）"""
+        if data_type not in self.data_cache and self._load(data_type) is None:
+            return None
+        return self.data_cache[data_type]
+
+    def get_static_data(self, data_type: str, item_id: str = None) -> Optional[Dict[str, Any]]:
+        """获取静态数据（不指定ID时返回整份数据）"""
         if item_id is None:
-            return data
-        
-        # 处理不同的数据结构
-        if data_type == 'spell' and 'spells' in data:
-            return data['spells'].get(item_id)
-        elif data_type == 'encounters' and 'encounters' in data:
-            return data['encounters'].get(item_id)
-        else:
-            return data.get(item_id)
-    
+            return self._data(data_type)
+
+        index = self.indexes.get(data_type)
+        if index is None:
+            index = self._load(data_type)
+            if index is None:
+                return None
+        return index.get(item_id)
+
+    def records(self, data_type: str) -> List[Any]:
+        """某类数据的全部记录"""
+        index = self.indexes.get(data_type)
+        if index is None:
+            index = self._load(data_type) or {}
+        return list(index.values())
+
+    def find(self, data_type: str, index_name: str, value) -> List[Any]:
+        """按二级索引查找记录，如 find('spell', 'element', 'fire')"""
+        if data_type not in self.secondary_indexes and self._load(data_type) is None:
+            return []
+        table = self.secondary_indexes[data_type].get(index_name)
+        if table is None:
+            raise KeyError(f"数据类型 {data_type} 没有索引 {index_name}")
+        return list(table.get(value, ()))
+
     def get_character_template(self, template_type: str = 'player_template') -> Optional[Dict[str, Any]]:
         """获取角色模板"""
-        templates = self.data_cache.get('character_template', {})
+        templates = self._data('character_template') or {}
         return templates.get(template_type)
-    
+
     def get_technique(self, category: str, technique_id: str = None) -> Optional[Dict[str, Any]]:
         """获取技能/功法数据"""
         # 先尝试从techniques文件获取
-        techniques = self.data_cache.get('techniques', {})
+        techniques = self._data('techniques') or {}
         if category in techniques:
             if technique_id is None:
                 return techniques[category]
             return techniques[category].get(technique_id)
-        
+
         # 如果没有，尝试从其他文件获取
         if category == 'combat_techniques':
-            gongfa = self.data_cache.get('gongfa', {})
+            gongfa = self._data('gongfa') or {}
             if technique_id is None:
                 return gongfa
             return gongfa.get(technique_id)
-        
+
         return None
 
-# 全局数据管理器实例
-data_manager = DataManager()
\ No newline at end of file
+# 全局数据管理器实例（数据在首次访问时加载）
+data_manager = DataManager()
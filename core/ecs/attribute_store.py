@@ -0,0 +1,136 @@
+from typing import Any, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy为可选依赖，缺失时系统退回逐实体处理
+    np = None
+
+class AttributeArrays:
+    """属性数组 - 以结构数组形式连续存放 AttributeComponent 的热点字段
+
+    行号即实体句柄中的槽位下标，组件数组可以按实体直接索引。
+    绑定后的组件只作为视图，读写直接落到数组对应行；
+    回复、增龄、寿命检查都可以对整列一次完成。
+    """
+
+    FIELDS = ("health", "max_health", "mana", "max_mana", "age", "lifespan")
+
+    def __init__(self, capacity: int = 256):
+        if np is None:
+            raise ImportError("属性数组模式需要安装 numpy")
+        # size为已用行的上界，未绑定的行active为False，不参与整列运算
+        self.size = 0
+        self.columns = {name: np.zeros(capacity, dtype=np.int64) for name in self.FIELDS}
+        self.active = np.zeros(capacity, dtype=bool)
+        # 整列运算修改各行的次数，计入组件版本（见 AttributeComponent.version）
+        self.versions = np.zeros(capacity, dtype=np.int64)
+        self.components: List[Any] = [None] * capacity
+        self.entities: List[Any] = [None] * capacity
+        # 属性组件的变更集合（与实体管理器共用同一个列表）
+        self.dirty_sets: List[Any] = []
+
+    @staticmethod
+    def available() -> bool:
+        """是否可以启用属性数组模式"""
+        return np is not None
+
+    @property
+    def capacity(self) -> int:
+        return len(self.active)
+
+    def _grow(self, min_capacity: int):
+        """扩容到不小于min_capacity（按倍数增长）"""
+        capacity = self.capacity
+        while capacity < min_capacity:
+            capacity *= 2
+        for name, column in self.columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+        active = np.zeros(capacity, dtype=bool)
+        active[:self.size] = self.active[:self.size]
+        self.active = active
+        versions = np.zeros(capacity, dtype=np.int64)
+        versions[:self.size] = self.versions[:self.size]
+        self.versions = versions
+        extra = capacity - len(self.components)
+        self.components.extend([None] * extra)
+        self.entities.extend([None] * extra)
+
+    def bind(self, entity, component):
+        """把组件的热点字段迁入实体所在行，组件改为数组视图"""
+        if component._store is not None:
+            component._store.unbind(component)
+        row = entity.index
+        if row >= self.capacity:
+            self._grow(row + 1)
+
+        for name, column in self.columns.items():
+            column[row] = getattr(component, name)
+        self.active[row] = entity.active
+        self.versions[row] = 0
+
+        component._store = self
+        component._row = row
+        self.components[row] = component
+        self.entities[row] = entity
+        self.size = max(self.size, row + 1)
+
+    def unbind(self, component):
+        """把数组中的值写回组件并释放该行"""
+        row = component._row
+        values = {name: int(column[row]) for name, column in self.columns.items()}
+        # 行版本并入组件自身的版本，解绑后版本号不会回退
+        component.touch(int(self.versions[row]))
+        component._store = None
+        component._row = -1
+        for name, value in values.items():
+            setattr(component, name, value)
+
+        self.active[row] = False
+        self.components[row] = None
+        self.entities[row] = None
+
+    def set_active(self, component, active: bool):
+        """同步实体的活跃状态"""
+        self.active[component._row] = active
+
+    def regenerate(self, health: int, mana: int):
+        """所有活跃实体回复生命与法力（不超过上限）"""
+        n = self.size
+        active = self.active[:n]
+        changed = np.zeros(n, dtype=bool)
+        for name, max_name, amount in (("health", "max_health", health), ("mana", "max_mana", mana)):
+            values = self.columns[name][:n]
+            limits = self.columns[max_name][:n]
+            regenerating = active & (values < limits)
+            np.copyto(values, np.minimum(values + amount, limits), where=regenerating)
+            changed |= regenerating
+        self.versions[:n][changed] += 1
+        self._mark_dirty(changed)
+
+    def advance_age(self, years: int, warning_years: int) -> Tuple[List[Any], List[Any]]:
+        """所有活跃实体增龄，返回 (寿元耗尽的实体, 寿命将尽的实体)"""
+        n = self.size
+        active = self.active[:n]
+        ages = self.columns["age"][:n]
+        lifespans = self.columns["lifespan"][:n]
+
+        np.add(ages, years, out=ages, where=active)
+        self.versions[:n][active] += 1
+        self._mark_dirty(active)
+        expired = active & (ages >= lifespans)
+        warning = active & ~expired & (ages >= lifespans - warning_years)
+
+        entities = self.entities
+        return ([entities[row] for row in np.flatnonzero(expired)],
+                [entities[row] for row in np.flatnonzero(warning)])
+
+    def _mark_dirty(self, rows):
+        """把整列运算修改过的行记入变更集合"""
+        if not self.dirty_sets:
+            return
+        entities = self.entities
+        changed = [entities[row] for row in np.flatnonzero(rows)]
+        for dirty_set in self.dirty_sets:
+            dirty_set.entities.update(changed)
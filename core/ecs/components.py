@@ -1,13 +1,98 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from typing import Dict, List, Any
 
+class Versioned:
+    """版本化组件基类 - 字段每次赋值版本号加一，并通知所属实体记入变更集合
+
+    界面记下上次刷新时的版本，版本未变化时无需重建控件。
+    列表、字典等容器字段的原地修改无法被察觉，修改后需调用 touch()。
+    """
+
+    __slots__ = ("_version", "_owner")
+
+    def __new__(cls, *args, **kwargs):
+        component = object.__new__(cls)
+        object.__setattr__(component, "_version", 0)
+        # 所属实体，由实体管理器在添加、移除组件时维护
+        object.__setattr__(component, "_owner", None)
+        return component
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        object.__setattr__(self, "_version", self._version + 1)
+        owner = self._owner
+        if owner is not None:
+            owner._component_changed(self)
+
+    def touch(self, count: int = 1):
+        """标记组件已修改"""
+        object.__setattr__(self, "_version", self._version + count)
+        owner = self._owner
+        if owner is not None:
+            owner._component_changed(self)
+
+    @property
+    def version(self) -> int:
+        """组件版本号（只增不减）"""
+        return self._version
+
+class ArrayField:
+    """数组字段 - 组件绑定到属性数组后读写数组，否则读写实例自身"""
+    
+    def __init__(self, default: int):
+        self.default = default
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.private_name = "_" + name
+    
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self.default
+        store = instance._store
+        if store is None:
+            return getattr(instance, self.private_name)
+        return int(store.columns[self.name][instance._row])
+    
+    def __set__(self, instance, value):
+        try:
+            store = instance._store
+        except AttributeError:
+            # __init__ 期间尚未初始化绑定信息
+            store = None
+        if store is None:
+            setattr(instance, self.private_name, value)
+        else:
+            store.columns[self.name][instance._row] = value
+
+def slotted(*extra_slots):
+    """为数据类生成 __slots__，ArrayField 字段保留描述符并把数值存放在私有槽位"""
+    def wrap(cls):
+        cls_dict = dict(cls.__dict__)
+        slots = list(extra_slots)
+        for data_field in fields(cls):
+            attribute = cls_dict.get(data_field.name)
+            if isinstance(attribute, ArrayField):
+                slots.append(attribute.private_name)
+            else:
+                slots.append(data_field.name)
+                cls_dict.pop(data_field.name, None)
+        cls_dict["__slots__"] = tuple(slots)
+        cls_dict.pop("__dict__", None)
+        cls_dict.pop("__weakref__", None)
+        slotted_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+        slotted_cls.__qualname__ = cls.__qualname__
+        return slotted_cls
+    return wrap
+
+@slotted("_store", "_row")
 @dataclass
-class AttributeComponent:
+class AttributeComponent(Versioned):
     """属性组件 - 存储角色数值属性"""
-    health: int = 100
-    max_health: int = 100
-    mana: int = 50
-    max_mana: int = 50
+    health: int = ArrayField(100)
+    max_health: int = ArrayField(100)
+    mana: int = ArrayField(50)
+    max_mana: int = ArrayField(50)
     constitution: int = 5
     comprehension: int = 5
     charm: int = 5
@@ -16,11 +101,37 @@ class AttributeComponent:
     physical_attack: int = 10
     spell_attack: int = 0
     defense: int = 5
-    lifespan: int = 80
-    age: int = 16
+    lifespan: int = ArrayField(80)
+    age: int = ArrayField(16)
+    # 定力与根骨（角色创建时分配）
+    determination: int = 3
+    bone_root: int = 3
+    # 修为、天赋（由 Game 从 Character 同步）
+    power: int = 0
+    talent: int = 0
+    # 经验与等级（CharacterSystem）
+    experience: int = 0
+    level: int = 1
+    # 属性衍生加成（AttributeEffectSystem）
+    martial_bonus: int = 0
+    social_bonus: int = 0
+    luck_modifier: float = 0.0
+    
+    def __post_init__(self):
+        # 绑定的属性数组及行号（见 attribute_store.AttributeArrays）
+        self._store = None
+        self._row = -1
+    
+    @property
+    def version(self) -> int:
+        # 绑定到属性数组时，整列运算（回复、增龄）只刷新数组中的行版本
+        store = self._store
+        if store is None:
+            return self._version
+        return self._version + int(store.versions[self._row])
 
-@dataclass
-class SkillComponent:
+@dataclass(slots=True)
+class SkillComponent(Versioned):
     """技能组件 - 存储已学法术"""
     learned_spells: List[str] = None
     learned_gongfa: List[str] = None
@@ -31,8 +142,8 @@ class SkillComponent:
         if self.learned_gongfa is None:
             self.learned_gongfa = []
 
-@dataclass
-class StateComponent:
+@dataclass(slots=True)
+class StateComponent(Versioned):
     """状态组件 - 存储当前状态效果"""
     realm: str = "mortal"
     sect: str = None
@@ -45,8 +156,8 @@ class StateComponent:
         if self.debuffs is None:
             self.debuffs = {}
 
-@dataclass
-class InventoryComponent:
+@dataclass(slots=True)
+class InventoryComponent(Versioned):
     """背包组件 - 存储物品"""
     items: Dict[str, int] = None
     capacity: int = 100
@@ -61,6 +172,7 @@ class InventoryComponent:
             self.items[item_id] += count
         else:
             self.items[item_id] = count
+        self.touch()
     
     def remove_item(self, item_id: str, count: int = 1) -> bool:
         """移除物品"""
@@ -68,11 +180,12 @@ class InventoryComponent:
             self.items[item_id] -= count
             if self.items[item_id] == 0:
                 del self.items[item_id]
+            self.touch()
             return True
         return False
 
-@dataclass
-class EquipmentComponent:
+@dataclass(slots=True)
+class EquipmentComponent(Versioned):
     """装备组件 - 管理已穿戴装备"""
     weapon: str = None
     armor: str = None
@@ -88,9 +201,26 @@ class EquipmentComponent:
         if hasattr(self, slot):
             setattr(self, slot, None)
 
-@dataclass
-class PositionComponent:
+@dataclass(slots=True)
+class PositionComponent(Versioned):
     """位置组件 - 用于场景定位"""
     x: float = 0.0
     y: float = 0.0
-    scene: str = "starting_village"
\ No newline at end of file
+    scene: str = "starting_village"
+
+@dataclass(slots=True)
+class ModifierComponent(Versioned):
+    """修正组件 - 属性的修正栈（见 modifiers.py），最终值写回属性组件"""
+    # 属性名 -> 修正栈
+    stacks: Dict[str, Any] = None
+    # 属性名 -> 基础值 / 上次写回的最终值
+    bases: Dict[str, Any] = None
+    applied: Dict[str, Any] = None
+    
+    def __post_init__(self):
+        if self.stacks is None:
+            self.stacks = {}
+        if self.bases is None:
+            self.bases = {}
+        if self.applied is None:
+            self.applied = {}
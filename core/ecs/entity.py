@@ -1,62 +1,441 @@
-from typing import Dict, Any, Set
-import uuid
+from typing import Dict, Any, List, Optional, Set, Union
+from .attribute_store import AttributeArrays
+from .components import Versioned
+from .registry import component_registry, ComponentKey
+
+# 属性组件的类型ID（属性数组模式需要识别该组件）
+ATTRIBUTE_COMPONENT = component_registry.type_id("AttributeComponent")
+
+# 实体句柄 = 世代号 << INDEX_BITS | 槽位下标
+INDEX_BITS = 32
+INDEX_MASK = (1 << INDEX_BITS) - 1
+
+def make_handle(index: int, generation: int) -> int:
+    """由槽位下标和世代号组成实体句柄"""
+    return (generation << INDEX_BITS) | index
+
+def format_entity_id(handle: int) -> str:
+    """实体句柄转为字符串ID（供UI在控件间传递）"""
+    return f"{handle & INDEX_MASK}:{handle >> INDEX_BITS}"
+
+def parse_entity_id(entity_id: Union[str, int]) -> int:
+    """字符串ID转回实体句柄，句柄原样返回"""
+    if isinstance(entity_id, str):
+        index, generation = entity_id.split(":")
+        return make_handle(int(index), int(generation))
+    return entity_id
+
+class Archetype:
+    """原型表 - 组件组合相同的实体按列存放在同一张表中"""
+
+    def __init__(self, signature: int):
+        # 签名为组件类型ID的位掩码，列按类型ID索引
+        self.signature = signature
+        self.entities: List["Entity"] = []
+        self.columns: Dict[int, List[Any]] = {type_id: [] for type_id in component_registry.type_ids(signature)}
+        # 增删单个组件后的目标原型缓存
+        self.add_edges: Dict[int, "Archetype"] = {}
+        self.remove_edges: Dict[int, "Archetype"] = {}
+        # 匹配本表的查询视图
+        self.queries: List["Query"] = []
+
+    def invalidate_queries(self):
+        """表内实体集合变化时通知相关查询"""
+        for query in self.queries:
+            query.invalidate()
+
+    def append(self, entity: "Entity", components: Dict[int, Any]) -> int:
+        """追加一行，返回行号"""
+        row = len(self.entities)
+        self.entities.append(entity)
+        for type_id, column in self.columns.items():
+            column.append(components[type_id])
+        self.invalidate_queries()
+        return row
+
+    def remove(self, row: int) -> Dict[int, Any]:
+        """移除一行（末行填补空位），返回被移除行的组件"""
+        removed = {type_id: column[row] for type_id, column in self.columns.items()}
+        last = len(self.entities) - 1
+        if row != last:
+            moved = self.entities[last]
+            self.entities[row] = moved
+            for column in self.columns.values():
+                column[row] = column[last]
+            moved._row = row
+        self.entities.pop()
+        for column in self.columns.values():
+            column.pop()
+        self.invalidate_queries()
+        return removed
+
+class Query:
+    """查询视图 - 由实体管理器增量维护的组件查询结果"""
+
+    def __init__(self, required: int):
+        # 所需组件的类型ID位掩码
+        self.required = required
+        self.archetypes: List[Archetype] = []
+        self._entities = None
+
+    def invalidate(self):
+        """标记结果失效，下次访问时重建"""
+        self._entities = None
+
+    @property
+    def entities(self) -> List["Entity"]:
+        """匹配的活跃实体（实体集合未变化时直接返回缓存）"""
+        if self._entities is None:
+            self._entities = [entity for archetype in self.archetypes
+                              for entity in archetype.entities if entity.active]
+        return self._entities
+
+    def __iter__(self):
+        return iter(self.entities)
+
+    def __len__(self):
+        return len(self.entities)
+
+class DirtySet:
+    """变更集合 - 记录某类组件自上次清空以来被修改、添加或移除过的实体
+
+    由 EntityManager.track_changes 创建，每个使用方各持一份、各自清空，互不影响。
+    字段赋值由组件自动记入；容器字段原地修改后需调用组件的 touch()
+    或 EntityManager.mark_dirty。已销毁的实体会自动移出集合。
+    """
+
+    def __init__(self, manager: "EntityManager", type_id: int):
+        self._manager = manager
+        self.type_id = type_id
+        self.entities: Set["Entity"] = set()
+
+    def __iter__(self):
+        return iter(self.entities)
+
+    def __len__(self):
+        return len(self.entities)
+
+    def __contains__(self, entity) -> bool:
+        return entity in self.entities
+
+    def drain(self) -> List["Entity"]:
+        """取出全部变更并清空（处理期间产生的新变更留到下一次）"""
+        entities = list(self.entities)
+        self.entities.clear()
+        return entities
+
+    def clear(self):
+        """清空变更"""
+        self.entities.clear()
+
+    def close(self):
+        """停止记录变更"""
+        self._manager.untrack_changes(self)
+
+def _component_version(component) -> int:
+    """组件版本号（非版本化组件视为0）"""
+    return getattr(component, "version", 0)
+
+def _set_owner(component, entity):
+    """维护版本化组件的所属实体（不改变组件版本）"""
+    if isinstance(component, Versioned):
+        object.__setattr__(component, "_owner", entity)
+
+# 已销毁实体使用的空原型，不存放任何行
+_DETACHED = Archetype(0)
 
 class Entity:
     """实体 - 游戏世界中万物的唯一标识"""
-    
-    def __init__(self):
-        self.id = str(uuid.uuid4())
-        self.components: Dict[str, Any] = {}
-        self.active = True
-    
-    def add_component(self, component_type: str, component: Any):
-        """添加组件"""
-        self.components[component_type] = component
-    
-    def get_component(self, component_type: str):
+
+    def __init__(self, entity_manager: "EntityManager", handle: int):
+        self.id = handle
+        self.index = handle & INDEX_MASK
+        self._active = True
+        self._manager = entity_manager
+        self._archetype = _DETACHED
+        self._row = -1
+        # 组件增删的次数，加上被替换或移除的组件的版本（保证实体版本只增不减）
+        self._layout_version = 0
+
+    @property
+    def version(self) -> int:
+        """实体版本号 - 任一组件被修改或增删组件后变大，界面据此判断是否需要刷新"""
+        row = self._row
+        return self._layout_version + sum(_component_version(column[row])
+                                          for column in self._archetype.columns.values())
+
+    def mark_dirty(self, component_type: ComponentKey):
+        """把指定组件记入变更集合（组件的容器字段被原地修改时使用）"""
+        type_id = component_registry.lookup(component_type)
+        if type_id is not None:
+            self._manager._mark_dirty(self, type_id)
+
+    def _component_changed(self, component):
+        """组件字段被赋值（由 Versioned 组件调用）"""
+        dirty_sets = self._manager.dirty_sets
+        if dirty_sets:
+            for dirty_set in dirty_sets.get(component_registry.lookup(type(component)), ()):
+                dirty_set.entities.add(self)
+
+    @property
+    def active(self) -> bool:
+        """是否活跃（非活跃实体不参与查询）"""
+        return self._active
+
+    @active.setter
+    def active(self, value: bool):
+        if value != self._active:
+            self._active = value
+            self._archetype.invalidate_queries()
+            self._manager._on_active_changed(self)
+
+    @property
+    def components(self) -> Dict[str, Any]:
+        """组件字典（快照，以组件名为键）"""
+        row = self._row
+        names = component_registry.names
+        return {names[type_id]: column[row] for type_id, column in self._archetype.columns.items()}
+
+    def add_component(self, component_type: ComponentKey, component: Any):
+        """添加组件（组件类型可以是组件类或组件名）"""
+        self._manager._add_component(self, component_registry.type_id(component_type), component)
+
+    def get_component(self, component_type: ComponentKey):
         """获取组件"""
-        return self.components.get(component_type)
-    
-    def has_component(self, component_type: str) -> bool:
+        column = self._archetype.columns.get(component_registry.lookup(component_type))
+        if column is None:
+            return None
+        return column[self._row]
+
+    def has_component(self, component_type: ComponentKey) -> bool:
         """检查是否有指定组件"""
-        return component_type in self.components
-    
-    def remove_component(self, component_type: str):
+        type_id = component_registry.lookup(component_type)
+        return type_id is not None and self._archetype.signature >> type_id & 1 == 1
+
+    def remove_component(self, component_type: ComponentKey):
         """移除组件"""
-        if component_type in self.components:
-            del self.components[component_type]
+        type_id = component_registry.lookup(component_type)
+        if type_id is not None:
+            self._manager._remove_component(self, type_id)
+
+    def get_component_by_id(self, type_id: int):
+        """按类型ID获取组件（热点路径使用，免去类型查找）"""
+        column = self._archetype.columns.get(type_id)
+        if column is None:
+            return None
+        return column[self._row]
+
+    def has_components(self, mask: int) -> bool:
+        """是否拥有位掩码中的全部组件"""
+        return self._archetype.signature & mask == mask
 
 class EntityManager:
     """实体管理器"""
-    
-    def __init__(self):
-        self.entities: Dict[str, Entity] = {}
-    
+
+    def __init__(self, attribute_arrays: bool = False):
+        # 按槽位下标存放实体，销毁后世代号加一，下标进入空闲列表复用；
+        # 槽位0保留不用，保证句柄恒为真值（调用方普遍以 `if entity_id` 判空）
+        self._slots: List[Optional[Entity]] = [None]
+        self._generations: List[int] = [0]
+        self._free_indices: List[int] = []
+        self._empty_archetype = Archetype(0)
+        self.archetypes: Dict[int, Archetype] = {0: self._empty_archetype}
+        self.queries: Dict[int, Query] = {}
+        # 组件类型ID -> 变更集合
+        self.dirty_sets: Dict[int, List[DirtySet]] = {}
+        self.attribute_arrays = None
+        if attribute_arrays:
+            self.enable_attribute_arrays()
+
+    @property
+    def entities(self) -> Dict[int, Entity]:
+        """所有存活实体（句柄 -> 实体）"""
+        return {entity.id: entity for entity in self._slots if entity is not None}
+
+    def enable_attribute_arrays(self):
+        """启用属性结构数组模式（需要numpy），已有属性组件一并迁入"""
+        if self.attribute_arrays is not None:
+            return
+        self.attribute_arrays = AttributeArrays()
+        self.attribute_arrays.dirty_sets = self.dirty_sets.setdefault(ATTRIBUTE_COMPONENT, [])
+        for entity in self._slots:
+            attr = entity.get_component_by_id(ATTRIBUTE_COMPONENT) if entity is not None else None
+            if attr is not None:
+                self.attribute_arrays.bind(entity, attr)
+
     def create_entity(self) -> Entity:
         """创建新实体"""
-        entity = Entity()
-        self.entities[entity.id] = entity
+        if self._free_indices:
+            index = self._free_indices.pop()
+        else:
+            index = len(self._slots)
+            self._slots.append(None)
+            self._generations.append(0)
+
+        entity = Entity(self, make_handle(index, self._generations[index]))
+        entity._archetype = self._empty_archetype
+        entity._row = self._empty_archetype.append(entity, {})
+        self._slots[index] = entity
         return entity
-    
-    def get_entity(self, entity_id: str) -> Entity:
-        """获取实体"""
-        return self.entities.get(entity_id)
-    
-    def destroy_entity(self, entity_id: str):
+
+    def get_entity(self, entity_id: Union[int, str]) -> Optional[Entity]:
+        """获取实体（句柄失效时返回None）"""
+        if entity_id is None:
+            return None
+        handle = parse_entity_id(entity_id)
+        index = handle & INDEX_MASK
+        if index < len(self._slots):
+            entity = self._slots[index]
+            if entity is not None and entity.id == handle:
+                return entity
+        return None
+
+    def is_alive(self, entity_id: Union[int, str]) -> bool:
+        """句柄是否仍指向存活实体"""
+        return self.get_entity(entity_id) is not None
+
+    def destroy_entity(self, entity_id: Union[int, str]):
         """销毁实体"""
-        if entity_id in self.entities:
-            del self.entities[entity_id]
-            return True
-        return False
-    
-    def remove_entity(self, entity_id: str):
+        entity = self.get_entity(entity_id)
+        if entity is None:
+            return False
+        self._unbind_attributes(entity.get_component_by_id(ATTRIBUTE_COMPONENT))
+        for component in entity._archetype.remove(entity._row).values():
+            _set_owner(component, None)
+        for dirty_sets in self.dirty_sets.values():
+            for dirty_set in dirty_sets:
+                dirty_set.entities.discard(entity)
+        entity._archetype = _DETACHED
+        entity._row = -1
+
+        index = entity.index
+        self._slots[index] = None
+        self._generations[index] += 1
+        self._free_indices.append(index)
+        return True
+
+    def remove_entity(self, entity_id: Union[int, str]):
         """移除实体（别名）"""
         return self.destroy_entity(entity_id)
-    
+
+    def query(self, *component_types) -> Query:
+        """获取（必要时注册）拥有指定组件的查询视图"""
+        required = component_registry.mask(*component_types)
+        query = self.queries.get(required)
+        if query is None:
+            query = Query(required)
+            for signature, archetype in self.archetypes.items():
+                if signature & required == required:
+                    query.archetypes.append(archetype)
+                    archetype.queries.append(query)
+            self.queries[required] = query
+        return query
+
     def get_entities_with_components(self, *component_types) -> list:
         """获取拥有指定组件的所有实体"""
-        result = []
-        for entity in self.entities.values():
-            if entity.active and all(entity.has_component(ct) for ct in component_types):
-                result.append(entity)
-        return result
\ No newline at end of file
+        return list(self.query(*component_types).entities)
+
+    def track_changes(self, component_type: ComponentKey) -> DirtySet:
+        """开始记录指定组件的变更，返回使用方独占的变更集合"""
+        type_id = component_registry.type_id(component_type)
+        dirty_set = DirtySet(self, type_id)
+        self.dirty_sets.setdefault(type_id, []).append(dirty_set)
+        return dirty_set
+
+    def untrack_changes(self, dirty_set: DirtySet):
+        """停止记录变更（列表保留，属性数组与管理器共用）"""
+        dirty_sets = self.dirty_sets.get(dirty_set.type_id, [])
+        if dirty_set in dirty_sets:
+            dirty_sets.remove(dirty_set)
+
+    def mark_dirty(self, entity_id: Union[int, str], component_type: ComponentKey):
+        """把实体的指定组件记入变更集合"""
+        entity = self.get_entity(entity_id)
+        if entity is not None:
+            entity.mark_dirty(component_type)
+
+    def _mark_dirty(self, entity: Entity, type_id: int):
+        for dirty_set in self.dirty_sets.get(type_id, ()):
+            dirty_set.entities.add(entity)
+
+    def _get_archetype(self, signature: int) -> Archetype:
+        """获取（必要时创建）指定组件组合的原型表"""
+        archetype = self.archetypes.get(signature)
+        if archetype is None:
+            archetype = Archetype(signature)
+            self.archetypes[signature] = archetype
+            for required, query in self.queries.items():
+                if signature & required == required:
+                    query.archetypes.append(archetype)
+                    archetype.queries.append(query)
+        return archetype
+
+    def _move(self, entity: Entity, target: Archetype, components: Dict[int, Any]):
+        """把实体迁移到目标原型表"""
+        entity._archetype = target
+        entity._row = target.append(entity, components)
+
+    def _add_component(self, entity: Entity, type_id: int, component: Any):
+        """添加组件并迁移原型"""
+        archetype = entity._archetype
+        if archetype is _DETACHED:
+            return
+
+        if self.attribute_arrays is not None and type_id == ATTRIBUTE_COMPONENT:
+            self._unbind_attributes(entity.get_component_by_id(type_id))
+            self.attribute_arrays.bind(entity, component)
+
+        _set_owner(component, entity)
+        column = archetype.columns.get(type_id)
+        if column is not None:
+            replaced = column[entity._row]
+            entity._layout_version += _component_version(replaced) + 1
+            if replaced is not component:
+                _set_owner(replaced, None)
+            column[entity._row] = component
+            self._mark_dirty(entity, type_id)
+            return
+
+        target = archetype.add_edges.get(type_id)
+        if target is None:
+            target = self._get_archetype(archetype.signature | 1 << type_id)
+            archetype.add_edges[type_id] = target
+
+        components = archetype.remove(entity._row)
+        components[type_id] = component
+        entity._layout_version += 1
+        self._move(entity, target, components)
+        self._mark_dirty(entity, type_id)
+
+    def _remove_component(self, entity: Entity, type_id: int):
+        """移除组件并迁移原型"""
+        archetype = entity._archetype
+        if type_id not in archetype.columns:
+            return
+
+        if type_id == ATTRIBUTE_COMPONENT:
+            self._unbind_attributes(entity.get_component_by_id(type_id))
+
+        target = archetype.remove_edges.get(type_id)
+        if target is None:
+            target = self._get_archetype(archetype.signature & ~(1 << type_id))
+            archetype.remove_edges[type_id] = target
+
+        components = archetype.remove(entity._row)
+        removed = components.pop(type_id)
+        _set_owner(removed, None)
+        entity._layout_version += _component_version(removed) + 1
+        self._move(entity, target, components)
+        self._mark_dirty(entity, type_id)
+
+    def _unbind_attributes(self, component):
+        """属性组件离开实体时从属性数组中解绑"""
+        if component is not None and component._store is not None and component._store is self.attribute_arrays:
+            self.attribute_arrays.unbind(component)
+
+    def _on_active_changed(self, entity: Entity):
+        """实体活跃状态变化"""
+        if self.attribute_arrays is not None:
+            attr = entity.get_component_by_id(ATTRIBUTE_COMPONENT)
+            if attr is not None and attr._store is self.attribute_arrays:
+                self.attribute_arrays.set_active(attr, entity.active)
@@ -0,0 +1,146 @@
+from typing import Any, Dict, List, Optional, Tuple
+from .components import AttributeComponent, ModifierComponent
+
+# 修正类型
+FLAT = "flat"          # 固定值加成
+PERCENT = "percent"    # 百分比加成（0.2 表示 +20%），同一属性的百分比加成相加
+OVERRIDE = "override"  # 直接覆盖最终值，最近设置的覆盖生效
+
+# 上限属性变化时随之调整的当前值
+POOLS = {"max_health": "health", "max_mana": "mana"}
+
+class Modifier:
+    """属性修正 - 来自某个来源（武学、境界、门派、状态等）的一条修正"""
+
+    __slots__ = ("source", "kind", "value")
+
+    def __init__(self, source: str, kind: str, value):
+        self.source = source
+        self.kind = kind
+        self.value = value
+
+    def __repr__(self):
+        return f"Modifier({self.source!r}, {self.kind!r}, {self.value!r})"
+
+class ModifierStack:
+    """单个属性的修正栈 - 每个来源至多一条修正，汇总值在修正变化后首次使用时重算"""
+
+    __slots__ = ("modifiers", "_totals")
+
+    def __init__(self):
+        self.modifiers: Dict[str, Modifier] = {}
+        self._totals = None
+
+    def set(self, source: str, kind: str, value):
+        """设置来源的修正（同一来源再次设置时替换，重复应用结果不变）"""
+        self.modifiers.pop(source, None)
+        self.modifiers[source] = Modifier(source, kind, value)
+        self._totals = None
+
+    def remove(self, source: str) -> bool:
+        """移除来源的修正"""
+        if self.modifiers.pop(source, None) is None:
+            return False
+        self._totals = None
+        return True
+
+    def totals(self) -> Tuple[Any, float, Any]:
+        """(固定加成之和, 百分比加成之和, 覆盖值或None)"""
+        if self._totals is None:
+            flat, percent, override = 0, 0.0, None
+            for modifier in self.modifiers.values():
+                if modifier.kind == FLAT:
+                    flat += modifier.value
+                elif modifier.kind == PERCENT:
+                    percent += modifier.value
+                elif modifier.kind == OVERRIDE:
+                    override = modifier.value
+            self._totals = (flat, percent, override)
+        return self._totals
+
+    def apply(self, base):
+        """由基础值计算最终值（整数属性的结果取整）"""
+        flat, percent, override = self.totals()
+        if override is not None:
+            return override
+        value = (base + flat) * (1 + percent)
+        return int(round(value)) if isinstance(base, int) else value
+
+def add_modifier(entity, stat: str, source: str, value, kind: str = FLAT):
+    """为实体的属性添加（或替换）一条修正，并更新属性的最终值"""
+    modifiers = entity.get_component(ModifierComponent)
+    if modifiers is None:
+        modifiers = ModifierComponent()
+        entity.add_component(ModifierComponent, modifiers)
+    stack = modifiers.stacks.get(stat)
+    if stack is None:
+        stack = modifiers.stacks[stat] = ModifierStack()
+    stack.set(source, kind, value)
+    _refresh(entity, modifiers, stat)
+
+def remove_modifiers(entity, source: str) -> List[str]:
+    """移除来源的全部修正，返回受影响的属性"""
+    modifiers = entity.get_component(ModifierComponent)
+    if modifiers is None:
+        return []
+    changed = [stat for stat, stack in modifiers.stacks.items() if stack.remove(source)]
+    for stat in changed:
+        _refresh(entity, modifiers, stat)
+    return changed
+
+def get_modifiers(entity, stat: str) -> List[Modifier]:
+    """属性当前的修正"""
+    modifiers = entity.get_component(ModifierComponent)
+    if modifiers is None or stat not in modifiers.stacks:
+        return []
+    return list(modifiers.stacks[stat].modifiers.values())
+
+def base_value(entity, stat: str) -> Optional[Any]:
+    """属性未加修正时的基础值"""
+    attrs = entity.get_component(AttributeComponent)
+    if attrs is None:
+        return None
+    modifiers = entity.get_component(ModifierComponent)
+    current = getattr(attrs, stat)
+    if modifiers is None or stat not in modifiers.bases:
+        return current
+    return modifiers.bases[stat] + current - modifiers.applied[stat]
+
+def set_base_value(entity, stat: str, value):
+    """设置属性的基础值，已有修正继续作用在新的基础值上"""
+    attrs = entity.get_component(AttributeComponent)
+    if attrs is None:
+        return
+    modifiers = entity.get_component(ModifierComponent)
+    if modifiers is None or stat not in modifiers.stacks:
+        setattr(attrs, stat, value)
+        return
+    # 把基础值的变化折算为对当前值的直接修改，再统一重算
+    modifiers.bases[stat] = value + modifiers.applied[stat] - getattr(attrs, stat)
+    _refresh(entity, modifiers, stat)
+
+def _refresh(entity, modifiers: ModifierComponent, stat: str):
+    """重算属性的最终值并写回属性组件
+
+    上次写入后其他代码对属性的直接修改（升级、修炼等）计入基础值，
+    因此修正的增删不会抹掉这些修改。
+    """
+    attrs = entity.get_component(AttributeComponent)
+    if attrs is None:
+        return
+    current = getattr(attrs, stat)
+    base = modifiers.bases.get(stat)
+    base = current if base is None else base + current - modifiers.applied[stat]
+    final = modifiers.stacks[stat].apply(base)
+    modifiers.bases[stat] = base
+    modifiers.applied[stat] = final
+    modifiers.touch()
+    if final == current:
+        return
+
+    setattr(attrs, stat, final)
+    pool = POOLS.get(stat)
+    if pool is not None:
+        # 上限提高时当前值同步增加，任何情况下都不超过上限
+        pool_value = getattr(attrs, pool) + max(0, final - current)
+        setattr(attrs, pool, min(pool_value, final))
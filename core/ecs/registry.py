@@ -0,0 +1,66 @@
+from typing import Dict, List, Union
+
+ComponentKey = Union[str, type]
+
+class ComponentRegistry:
+    """组件类型注册表 - 为每种组件分配小整数ID与对应的位掩码
+
+    组件类和组件类名映射到同一个ID，原型签名与查询条件都是ID位掩码，
+    包含判断只需一次按位与。热点路径应预先取得ID，之后直接按ID访问组件。
+    """
+
+    def __init__(self):
+        # 组件类 / 组件类名 -> 类型ID
+        self.ids: Dict[ComponentKey, int] = {}
+        self.names: List[str] = []
+
+    def type_id(self, component_type: ComponentKey) -> int:
+        """获取组件类型ID（首次出现时分配）"""
+        type_id = self.ids.get(component_type)
+        if type_id is None:
+            name = component_type if isinstance(component_type, str) else component_type.__name__
+            type_id = self.ids.get(name)
+            if type_id is None:
+                type_id = len(self.names)
+                self.names.append(name)
+                self.ids[name] = type_id
+            self.ids[component_type] = type_id
+        return type_id
+
+    def lookup(self, component_type: ComponentKey):
+        """查询已注册的类型ID，未注册时返回None（不分配新ID）"""
+        type_id = self.ids.get(component_type)
+        if type_id is None and not isinstance(component_type, str):
+            type_id = self.ids.get(component_type.__name__)
+            if type_id is not None:
+                self.ids[component_type] = type_id
+        return type_id
+
+    def bit(self, component_type: ComponentKey) -> int:
+        """单个组件类型的位"""
+        return 1 << self.type_id(component_type)
+
+    def mask(self, *component_types: ComponentKey) -> int:
+        """多个组件类型的位掩码"""
+        mask = 0
+        for component_type in component_types:
+            mask |= 1 << self.type_id(component_type)
+        return mask
+
+    def type_ids(self, mask: int) -> List[int]:
+        """位掩码包含的类型ID"""
+        ids = []
+        type_id = 0
+        while mask:
+            if mask & 1:
+                ids.append(type_id)
+            mask >>= 1
+            type_id += 1
+        return ids
+
+    def name(self, type_id: int) -> str:
+        """类型ID对应的组件名"""
+        return self.names[type_id]
+
+# 全局组件注册表
+component_registry = ComponentRegistry()
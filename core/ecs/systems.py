@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
 from .entity import EntityManager
+from .registry import component_registry
+from .modifiers import remove_modifiers
 from ..events import event_bus
+from ..data_core import data_core
 
 class System(ABC):
     """系统基类"""
@@ -16,28 +19,57 @@ class System(ABC):
 class AttributeSystem(System):
     """属性系统 - 处理属性变化和计算"""
     
+    # 每个回复周期的回复量
+    HEALTH_REGEN = 1
+    MANA_REGEN = 2
+    # 回复周期（现实秒），与界面每100毫秒一帧的节奏一致；
+    # 无界面模拟一帧推进一整天时按经过的周期数一次回复
+    REGEN_INTERVAL = 0.1
+    
+    def __init__(self, entity_manager: EntityManager):
+        super().__init__(entity_manager)
+        self.query = entity_manager.query("AttributeComponent")
+        self.attribute_id = component_registry.type_id("AttributeComponent")
+        # 不足一个周期的剩余时间
+        self.regen_time = 0.0
+    
     def update(self, delta_time: float):
-        entities = self.entity_manager.get_entities_with_components("AttributeComponent")
+        self.regen_time += delta_time
+        # 留出浮点误差，0.1秒一帧时每帧恰好一个周期
+        cycles = int(self.regen_time / self.REGEN_INTERVAL + 1e-9)
+        if cycles <= 0:
+            return
+        self.regen_time = max(0.0, self.regen_time - cycles * self.REGEN_INTERVAL)
+        health_regen = self.HEALTH_REGEN * cycles
+        mana_regen = self.MANA_REGEN * cycles
         
-        for entity in entities:
-            attr = entity.get_component("AttributeComponent")
+        # 属性数组模式下整列一次完成回复
+        if self.entity_manager.attribute_arrays is not None:
+            self.entity_manager.attribute_arrays.regenerate(health_regen, mana_regen)
+            return
+        
+        for entity in self.query:
+            attr = entity.get_component_by_id(self.attribute_id)
             
             # 生命值回复
             if attr.health < attr.max_health:
-                attr.health = min(attr.max_health, attr.health + 1)
+                attr.health = min(attr.max_health, attr.health + health_regen)
             
             # 法力值回复
             if attr.mana < attr.max_mana:
-                attr.mana = min(attr.max_mana, attr.mana + 2)
+                attr.mana = min(attr.max_mana, attr.mana + mana_regen)
 
 class StateSystem(System):
     """状态系统 - 处理Buff/Debuff效果"""
     
+    def __init__(self, entity_manager: EntityManager):
+        super().__init__(entity_manager)
+        self.query = entity_manager.query("StateComponent")
+        self.state_id = component_registry.type_id("StateComponent")
+    
     def update(self, delta_time: float):
-        entities = self.entity_manager.get_entities_with_components("StateComponent")
-        
-        for entity in entities:
-            state = entity.get_component("StateComponent")
+        for entity in self.query:
+            state = entity.get_component_by_id(self.state_id)
             
             # 处理Buff持续时间
             expired_buffs = []
@@ -50,7 +82,11 @@ class StateSystem(System):
             # 移除过期Buff
             for buff_id in expired_buffs:
                 del state.buffs[buff_id]
+                # 状态附带的属性修正以 "buff:<状态ID>" 为来源，随状态一同移除
+                remove_modifiers(entity, f"buff:{buff_id}")
                 event_bus.emit("buff_expired", {"entity_id": entity.id, "buff_id": buff_id})
+            if expired_buffs:
+                state.touch()
 
 class CombatSystem(System):
     """战斗系统 - 处理战斗逻辑"""
@@ -59,7 +95,7 @@ class CombatSystem(System):
         # 处理战斗相关逻辑
         pass
     
-    def cast_spell(self, caster_id: str, spell_id: str, target_id: str = None):
+    def cast_spell(self, caster_id: int, spell_id: str, target_id: int = None):
         """施放法术"""
         caster = self.entity_manager.get_entity(caster_id)
         if not caster:
@@ -72,7 +108,6 @@ class CombatSystem(System):
             return False
         
         # 从数据核心获取法术信息
-        from ..data_core import data_core
         spell_data = data_core.get_spell(spell_id)
         
         if not spell_data or attr.mana < spell_data.get("cost", {}).get("mana", 0):
@@ -97,7 +132,7 @@ class InventorySystem(System):
     def update(self, delta_time: float):
         pass
     
-    def use_item(self, entity_id: str, item_id: str):
+    def use_item(self, entity_id: int, item_id: str):
         """使用物品"""
         entity = self.entity_manager.get_entity(entity_id)
         if not entity:
@@ -108,7 +143,6 @@ class InventorySystem(System):
             return False
         
         # 从数据核心获取物品信息
-        from ..data_core import data_core
         item_data = data_core.get_item(item_id)
         
         if item_data and "effects" in item_data:
@@ -0,0 +1,92 @@
+import csv
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+def subscriber_name(callback: Callable) -> str:
+    """订阅者的可读名称（模块.类.方法）"""
+    func = getattr(callback, "__func__", callback)
+    module = getattr(func, "__module__", None) or ""
+    name = getattr(func, "__qualname__", None) or repr(callback)
+    return f"{module}.{name}" if module else name
+
+class EventProfiler:
+    """事件分发性能统计 - 按事件类型与订阅者记录次数、耗时和嵌套深度
+
+    通过 event_bus.enable_profiling() 开启，未开启时事件总线没有任何额外开销。
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.max_depth = 0
+        # 事件类型 -> {count, total, max, max_depth}（耗时包含嵌套分发）
+        self.events: Dict[str, Dict[str, Any]] = {}
+        # (事件类型, 订阅者) -> {calls, total, max}
+        self.subscribers: Dict[tuple, Dict[str, Any]] = {}
+
+    def reset(self):
+        """清空统计"""
+        self.depth = 0
+        self.max_depth = 0
+        self.events.clear()
+        self.subscribers.clear()
+
+    def dispatch(self, event_type: str, callbacks: List[Callable], data):
+        """计时并依次调用订阅者"""
+        stats = self.events.get(event_type)
+        if stats is None:
+            stats = self.events[event_type] = {"count": 0, "total": 0.0, "max": 0.0, "max_depth": 0}
+        stats["count"] += 1
+
+        self.depth += 1
+        self.max_depth = max(self.max_depth, self.depth)
+        stats["max_depth"] = max(stats["max_depth"], self.depth)
+        start = time.perf_counter()
+        try:
+            for callback in callbacks:
+                callback_start = time.perf_counter()
+                try:
+                    callback(data)
+                finally:
+                    self._record_subscriber(event_type, callback, time.perf_counter() - callback_start)
+        finally:
+            self.depth -= 1
+            elapsed = time.perf_counter() - start
+            stats["total"] += elapsed
+            stats["max"] = max(stats["max"], elapsed)
+
+    def _record_subscriber(self, event_type: str, callback: Callable, elapsed: float):
+        key = (event_type, subscriber_name(callback))
+        stats = self.subscribers.get(key)
+        if stats is None:
+            stats = self.subscribers[key] = {"calls": 0, "total": 0.0, "max": 0.0}
+        stats["calls"] += 1
+        stats["total"] += elapsed
+        stats["max"] = max(stats["max"], elapsed)
+
+    def report(self) -> Dict[str, Any]:
+        """统计结果（按累计耗时降序）"""
+        events = [dict(event_type=event_type, **stats) for event_type, stats in self.events.items()]
+        subscribers = [dict(event_type=event_type, subscriber=name, **stats)
+                       for (event_type, name), stats in self.subscribers.items()]
+        events.sort(key=lambda row: row["total"], reverse=True)
+        subscribers.sort(key=lambda row: row["total"], reverse=True)
+        return {"max_depth": self.max_depth, "events": events, "subscribers": subscribers}
+
+    def dump(self, path: str):
+        """导出统计结果，按扩展名选择JSON或CSV"""
+        report = self.report()
+        if path.endswith(".csv"):
+            fields = ["kind", "event_type", "subscriber", "count", "total", "max", "max_depth"]
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                for row in report["events"]:
+                    writer.writerow(dict(row, kind="event"))
+                for row in report["subscribers"]:
+                    row = dict(row, kind="subscriber", count=row["calls"])
+                    del row["calls"]
+                    writer.writerow(row)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
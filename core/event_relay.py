@@ -0,0 +1,86 @@
+import threading
+from collections import deque
+from .events import event_bus
+
+class EventRelay:
+    """跨线程事件中继 - 让订阅者始终在所属线程接收事件
+
+    在所属线程发出的事件直接调用订阅者；其他线程（如模拟线程）发出的事件
+    先放入线程安全的队列，由所属线程调用 flush 批量分发。
+    事件入队时若队列原本为空会调用 _notify，子类可据此唤醒所属线程。
+    """
+
+    def __init__(self, bus=event_bus, owner_thread: int = None):
+        self.bus = bus
+        self.owner_thread = owner_thread or threading.get_ident()
+        self._queue = deque()
+        # 合并订阅：回调 -> 队列中尚未分发的条目
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._subscriptions = []
+
+    def subscribe(self, event_type, callback, coalesce=False):
+        """订阅事件，coalesce为True时同一批次内只分发最新的一次"""
+        def relay(data):
+            if threading.get_ident() == self.owner_thread:
+                callback(data)
+            else:
+                self._enqueue(callback, data, coalesce)
+        # 供性能统计显示实际的订阅者名称
+        relay.__func__ = getattr(callback, "__func__", callback)
+
+        subscription = self.bus.subscribe(event_type, relay)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def close(self):
+        """退订全部事件并丢弃未分发的事件"""
+        for subscription in self._subscriptions:
+            subscription.unsubscribe()
+        self._subscriptions = []
+        with self._lock:
+            self._queue.clear()
+            self._pending.clear()
+
+    @property
+    def queued(self) -> int:
+        """等待分发的事件数"""
+        return len(self._queue)
+
+    def _enqueue(self, callback, data, coalesce):
+        with self._lock:
+            was_empty = not self._queue
+            if coalesce:
+                entry = self._pending.get(callback)
+                if entry is not None:
+                    entry[1] = data
+                    return
+                entry = [callback, data]
+                self._pending[callback] = entry
+            else:
+                entry = [callback, data]
+            self._queue.append(entry)
+        if was_empty:
+            self._notify()
+
+    def _notify(self):
+        """队列由空变为非空（在发出事件的线程中调用）"""
+        pass
+
+    def flush(self, max_events: int = None) -> int:
+        """在所属线程分发队列中的事件，返回分发数量"""
+        count = 0
+        while max_events is None or count < max_events:
+            with self._lock:
+                if not self._queue:
+                    break
+                entry = self._queue.popleft()
+                callback, data = entry
+                if self._pending.get(callback) is entry:
+                    del self._pending[callback]
+            callback(data)
+            count += 1
+        if self._queue:
+            # 剩余事件留到下一批
+            self._notify()
+        return count
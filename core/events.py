@@ -1,16 +1,199 @@
+import inspect
+import threading
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from .event_profiler import EventProfiler
+
+class _WeakCallback:
+    """弱引用的绑定方法 - 对象被回收后自动从事件总线移除"""
+    
+    __slots__ = ("_ref", "__func__", "__weakref__")
+    
+    def __init__(self, method, on_dead):
+        self._ref = weakref.WeakMethod(method, lambda ref: on_dead(self))
+        # 供性能统计显示订阅者名称
+        self.__func__ = method.__func__
+    
+    def __call__(self, data):
+        method = self._ref()
+        if method is not None:
+            method(data)
+
+class Subscription:
+    """订阅凭据 - 用于取消订阅"""
+    
+    __slots__ = ("bus", "event_type", "callback")
+    
+    def __init__(self, bus, event_type, callback):
+        self.bus = bus
+        self.event_type = event_type
+        self.callback = callback
+    
+    def unsubscribe(self):
+        """取消订阅"""
+        self.bus.unsubscribe(self)
+
 class EventBus:
     def __init__(self):
         self._listeners = {}
+        # 被静默的事件类型（如无界面模拟时的界面消息）
+        self._muted = set()
+        # 延迟分发的事件类型：emit时只入队，在帧的固定阶段由drain统一分发
+        self._deferred = set()
+        # 需要合并的延迟事件类型：同一批次内只保留最新的一次
+        self._coalesced = set()
+        self._queue = deque()
+        self._pending = {}
+        # 界面线程与模拟线程都可能入队，队列与合并表的读写需持有此锁
+        self._queue_lock = threading.Lock()
+        # 性能统计（默认关闭）
+        self.profiler = None
+    
+    def subscribe(self, event_type, callback, weak=None):
+        """订阅事件，返回可用于取消订阅的凭据
+        
+        绑定方法默认以弱引用订阅，对象被回收后自动退订；
+        weak=False 强制强引用，普通函数和lambda始终为强引用。
+        """
+        if weak is None:
+            weak = inspect.ismethod(callback)
+        if weak:
+            callback = _WeakCallback(callback, lambda dead: self._remove(event_type, dead))
+        # 与 _remove 一样替换为新列表：正在进行的分发不会收到新订阅者，
+        # 其他线程中弱引用回收触发的退订也不会覆盖掉这次订阅
+        self._listeners[event_type] = [*self._listeners.get(event_type, ()), callback]
+        return Subscription(self, event_type, callback)
+    
+    def unsubscribe(self, subscription, callback=None):
+        """取消订阅：传入订阅凭据，或事件类型与原回调"""
+        if isinstance(subscription, Subscription):
+            self._remove(subscription.event_type, subscription.callback)
+            return
+        for listener in self._listeners.get(subscription, ()):
+            if listener == callback or (isinstance(listener, _WeakCallback) and listener._ref() == callback):
+                self._remove(subscription, listener)
+                return
+    
+    def _remove(self, event_type, listener):
+        """移除监听器（替换为新列表，不影响正在进行的分发）"""
+        listeners = self._listeners.get(event_type)
+        if listeners is None:
+            return
+        remaining = [callback for callback in listeners if callback is not listener]
+        if remaining:
+            self._listeners[event_type] = remaining
+        else:
+            del self._listeners[event_type]
     
-    def subscribe(self, event_type, callback):
-        if event_type not in self._listeners:
-            self._listeners[event_type] = []
-        self._listeners[event_type].append(callback)
+    def listener_count(self, event_type):
+        """指定事件类型的监听器数量"""
+        return len(self._listeners.get(event_type, ()))
     
     def emit(self, event_type, data=None):
+        if self._muted and event_type in self._muted:
+            return
+        if self._deferred and event_type in self._deferred:
+            self.post(event_type, data)
+            return
+        self._dispatch(event_type, data)
+    
+    def has_subscribers(self, event_type):
+        """是否有监听器会收到该事件（被静默的事件视为没有）
+        
+        高频事件的发出方可据此跳过构造消息字符串和数据字典。
+        """
+        return event_type in self._listeners and not (self._muted and event_type in self._muted)
+    
+    def emit_lazy(self, event_type, factory, *args, **kwargs):
+        """惰性发出事件：仅在有订阅者时调用 factory(*args, **kwargs) 生成事件数据
+        
+        例: event_bus.emit_lazy("message", "{} 在静心修炼".format, npc_name)
+        """
+        if event_type in self._listeners and not (self._muted and event_type in self._muted):
+            self.emit(event_type, factory(*args, **kwargs))
+    
+    def _dispatch(self, event_type, data):
+        if self.profiler is not None:
+            self.profiler.dispatch(event_type, self._listeners.get(event_type, ()), data)
+            return
         if event_type in self._listeners:
             for callback in self._listeners[event_type]:
                 callback(data)
+    
+    def enable_profiling(self):
+        """开启分发性能统计，返回统计器"""
+        if self.profiler is None:
+            self.profiler = EventProfiler()
+        return self.profiler
+    
+    def disable_profiling(self):
+        """关闭分发性能统计，返回已收集的统计器"""
+        profiler, self.profiler = self.profiler, None
+        return profiler
+    
+    def defer(self, *event_types, coalesce=False):
+        """把事件类型切换为延迟分发，coalesce为True时同一批次内合并为最新的一次"""
+        self._deferred.update(event_types)
+        if coalesce:
+            self._coalesced.update(event_types)
+    
+    def undefer(self, *event_types):
+        """恢复事件类型的同步分发（已入队的事件仍在下次drain时分发）"""
+        self._deferred.difference_update(event_types)
+        self._coalesced.difference_update(event_types)
+    
+    def post(self, event_type, data=None):
+        """事件入队，等待drain时分发"""
+        if self._muted and event_type in self._muted:
+            return
+        with self._queue_lock:
+            if event_type in self._coalesced:
+                entry = self._pending.get(event_type)
+                if entry is not None:
+                    # 保留原有排队位置，只更新为最新数据
+                    entry[1] = data
+                    return
+                entry = [event_type, data]
+                self._pending[event_type] = entry
+            else:
+                entry = [event_type, data]
+            self._queue.append(entry)
+    
+    def drain(self, max_events=None):
+        """按入队顺序分发队列中的事件，返回分发数量
+
+        分发过程中新入队的事件在同一次drain中继续处理；
+        max_events限制单次分发数量，剩余事件留到下次drain。
+        """
+        count = 0
+        queue = self._queue
+        while max_events is None or count < max_events:
+            # 出队与移出合并表在同一次持锁内完成，其他线程不会更新已出队的条目
+            with self._queue_lock:
+                if not queue:
+                    break
+                event_type, data = entry = queue.popleft()
+                if self._pending.get(event_type) is entry:
+                    del self._pending[event_type]
+            self._dispatch(event_type, data)
+            count += 1
+        return count
+    
+    @property
+    def queued(self):
+        """队列中等待分发的事件数"""
+        return len(self._queue)
+    
+    @contextmanager
+    def suppress(self, *event_types):
+        """在with块内静默指定事件类型"""
+        added = set(event_types) - self._muted
+        self._muted |= added
+        try:
+            yield
+        finally:
+            self._muted -= added
 
 # 全局事件总线
-event_bus = EventBus()
\ No newline at end of file
+event_bus = EventBus()
@@ -1,4 +1,3 @@
-import json
 import random
 from .character import Character
 from .skills import SkillManager
@@ -6,19 +5,21 @@ from .sects import SectManager
 from .events import event_bus
 from .world_manager import world_manager
 from .game_engine import game_engine
+from .ecs.modifiers import set_base_value
+from .content import content_registry
 
 class Game:
-    def __init__(self):
-        with open("data/config.json", "r", encoding="utf-8") as f:
-            self.config = json.load(f)
+    def __init__(self, character_data=None):
+        self.config = content_registry.get("config.json")
         
-        # 显示角色创建界面
-        self.character_data = self._show_character_creation()
+        # 未提供创建数据时显示角色创建界面
+        if character_data is None:
+            character_data = self._show_character_creation()
+        self.character_data = character_data
         
         self.character = Character(self.config["character"])
         self.skill_manager = SkillManager()
         self.sect_manager = SectManager()
-        self.day = 1
         
         # 启动游戏引擎
         game_engine.start()
@@ -27,6 +28,10 @@ class Game:
         # 将玩家实体ID存储到world_manager中供其他模块使用
         world_manager.player_entity_id = self.player_entity_id
         
+        # 帧末发布玩家属性快照，界面只经事件接收，不必从界面线程持锁读取
+        self._published_version = None
+        event_bus.subscribe("frame_finished", self._publish_player_attributes)
+        
         # 应用角色创建数据
         self._apply_character_creation_data()
         
@@ -36,6 +41,7 @@ class Game:
             skill_component = player_entity.get_component("SkillComponent")
             if skill_component and not skill_component.learned_spells:
                 skill_component.learned_spells.append("spirit_missile")
+                skill_component.touch()
                 event_bus.emit("message", "你天生掌握了灵力弹法术！")
         
     def train(self):
@@ -77,7 +83,7 @@ class Game:
             available_sects = self.sect_manager.get_available_sects(self.character)
             if available_sects:
                 sect_id, sect = random.choice(available_sects)
-                self.sect_manager.join_sect(sect_id, self.character)
+                self.sect_manager.join_sect(sect_id, self.player_entity_id)
     
     def _sync_learned_spells(self, skill_id):
         """同步学会的法术到ECS实体"""
@@ -93,11 +99,43 @@ class Game:
                         for spell_id in technique_data['spells']:
                             if spell_id not in skill_component.learned_spells:
                                 skill_component.learned_spells.append(spell_id)
+                                skill_component.touch()
                                 event_bus.emit("message", f"学会了法术：{spell_id}")
         
+    def player_attributes(self):
+        """玩家属性快照（界面显示用），玩家实体不存在时返回None"""
+        attr = world_manager.get_component(self.player_entity_id, "AttributeComponent")
+        if attr is None:
+            return None
+        return {
+            'power': attr.power,
+            'age': attr.age,
+            'talent': attr.talent,
+            'physical_attack': attr.physical_attack,
+            'spell_attack': attr.spell_attack,
+            'health': attr.health,
+            'max_health': attr.max_health,
+            'mana': attr.mana,
+            'max_mana': attr.max_mana
+        }
+    
+    def _publish_player_attributes(self, day):
+        """玩家属性组件版本变化时发出 player_attributes 快照（在持有模拟锁的帧末调用）"""
+        if not event_bus.has_subscribers("player_attributes"):
+            return
+        attr = world_manager.get_component(self.player_entity_id, "AttributeComponent")
+        if attr is None or attr.version == self._published_version:
+            return
+        self._published_version = attr.version
+        event_bus.emit("player_attributes", self.player_attributes())
+    
+    @property
+    def day(self):
+        """当前天数（以游戏引擎的模拟时钟为准）"""
+        return game_engine.current_day
+    
     def next_day(self):
-        self.day += 1
-        event_bus.emit("day_changed", self.day)
+        game_engine.advance_days(1)
         
     def update(self):
         """更新游戏世界"""
@@ -129,20 +167,12 @@ class Game:
                     attr.age = self.character.age
                     attr.health = self.character.health
                     attr.mana = self.character.mana
-                    attr.max_mana = self.character.max_mana
-                    attr.physical_attack = self.character.physical_attack
-                    attr.spell_attack = self.character.spell_attack
+                    # 攻击力由旧角色对象计算基础值，武学等修正继续叠加其上
+                    set_base_value(player_entity, "physical_attack", self.character.physical_attack)
+                    set_base_value(player_entity, "spell_attack", self.character.spell_attack)
                     
-                    # 如果没有power属性，添加它
-                    if not hasattr(attr, 'power'):
-                        attr.power = self.character.power
-                    else:
-                        attr.power = self.character.power
-                        
-                    if not hasattr(attr, 'talent'):
-                        attr.talent = self.character.talent
-                    else:
-                        attr.talent = self.character.talent
+                    attr.power = self.character.power
+                    attr.talent = self.character.talent
     
     def _show_character_creation(self):
         """显示角色创建界面"""
@@ -153,19 +183,24 @@ class Game:
             return creation_dialog.get_character_data()
         else:
             # 使用默认配置
-            return {
-                "attributes": {
-                    "constitution": 3,
-                    "determination": 3,
-                    "bone_root": 3,
-                    "comprehension": 3,
-                    "charm": 3,
-                    "luck": 3
-                },
-                "birthplace": None,
-                "zhuazhou": None,
-                "traits": []
-            }
+            return self.default_character_data()
+    
+    @staticmethod
+    def default_character_data():
+        """默认角色创建数据"""
+        return {
+            "attributes": {
+                "constitution": 3,
+                "determination": 3,
+                "bone_root": 3,
+                "comprehension": 3,
+                "charm": 3,
+                "luck": 3
+            },
+            "birthplace": None,
+            "zhuazhou": None,
+            "traits": []
+        }
     
     def _apply_character_creation_data(self):
         """应用角色创建数据"""
@@ -181,13 +216,13 @@ class Game:
             # 应用自定义属性
             custom_attrs = self.character_data.get("attributes", {})
             attrs.constitution = custom_attrs.get("constitution", 3)
-            if not hasattr(attrs, 'determination'):
-                attrs.determination = custom_attrs.get("determination", 3)
-            if not hasattr(attrs, 'bone_root'):
-                attrs.bone_root = custom_attrs.get("bone_root", 3)
+            attrs.determination = custom_attrs.get("determination", 3)
+            attrs.bone_root = custom_attrs.get("bone_root", 3)
             attrs.comprehension = custom_attrs.get("comprehension", 3)
             attrs.charm = custom_attrs.get("charm", 3)
             attrs.luck = custom_attrs.get("luck", 3)
+            attrs.power = self.character.power
+            attrs.talent = self.character.talent
             
             # 应用特质效果
             traits = self.character_data.get("traits", [])
@@ -207,6 +242,7 @@ class Game:
                 for trait_id, trait_data in traits:
                     if "starting_gongfa" in trait_data:
                         skills.learned_gongfa.extend(trait_data["starting_gongfa"])
+                        skills.touch()
                         event_bus.emit("message", f"由于{trait_data['name']}，获得了高级功法！")
             
             # 显示创建结果
@@ -1,14 +1,20 @@
+import threading
 import time
 from typing import Dict, Any
 from .events import event_bus
 from .world_manager import world_manager
 from .data_core import data_core
+from .scheduler import EventScheduler, ScheduledEvent
 
 class GameEngine:
     """游戏引擎 - 管理时间流逝和复杂事件循环"""
     
     def __init__(self):
         self.running = False
+        # 模拟线程运行时，每帧更新持有此锁；其他线程修改游戏世界前也应先获取
+        self.lock = threading.RLock()
+        self._thread = None
+        self._thread_stop = threading.Event()
         self.last_update_time = time.time()
         self.game_speed = 1.0
         self.paused = False
@@ -19,13 +25,28 @@ class GameEngine:
         self.day_duration = 60.0  # 现实60秒 = 游戏1天
         self.month_duration = self.day_duration * 30  # 30天 = 1月
         
+        # 定步长模拟：每帧最多补跑的天数，超出部分留到后续帧继续补跑
+        self.max_catch_up_days = 30
+        # 已推进到的模拟时间（日界线），循环事件按此时间逐个补触发
+        self.simulated_time = 0.0
+        # 每帧最多分发的延迟事件数，None表示全部分发
+        self.max_events_per_tick = None
+        # 数据文件热重载的检查间隔（现实秒），None表示不检查
+        self.data_reload_interval = None
+        self._last_data_check = 0.0
+        
+        # 每日处理耗时统计
+        self.days_processed = 0
+        self.day_cost_total = 0.0
+        self.last_day_cost = 0.0
+        
         # 当前游戏时间
         self.current_day = 1
         self.current_month = 1
         self.current_year = 1
         
         # 事件调度器
-        self.scheduled_events = []
+        self.scheduler = EventScheduler()
         self.recurring_events = {}
         
         self._setup_event_handlers()
@@ -55,52 +76,149 @@ class GameEngine:
     
     def stop(self):
         """停止游戏引擎"""
+        self.stop_thread()
         self.running = False
         world_manager.stop()
         event_bus.emit("engine_stopped", {})
     
+    def start_thread(self, interval: float = 0.1):
+        """在后台线程中以固定间隔运行主循环
+        
+        界面订阅者应通过事件中继（EventRelay）接收事件，
+        界面线程修改游戏世界时需持有 self.lock。
+        """
+        if self._thread is not None:
+            return
+        self._thread_stop.clear()
+        self._thread = threading.Thread(target=self._thread_loop, args=(interval,),
+                                        name="simulation", daemon=True)
+        self._thread.start()
+    
+    def stop_thread(self):
+        """停止后台模拟线程"""
+        if self._thread is None:
+            return
+        self._thread_stop.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+    
+    def _thread_loop(self, interval: float):
+        while not self._thread_stop.wait(interval):
+            self.update()
+    
     def update(self):
         """主更新循环"""
-        if not self.running or self.paused:
+        if not self.running:
             return
         
-        current_time = time.time()
-        delta_time = current_time - self.last_update_time
-        self.last_update_time = current_time
-        
+        with self.lock:
+            current_time = time.time()
+            delta_time = current_time - self.last_update_time
+            self.last_update_time = current_time
+            
+            if not self.paused:
+                self.step(delta_time)
+            
+            # 暂停时也检查数据文件，便于边改数据边查看效果
+            if (self.data_reload_interval is not None
+                    and current_time - self._last_data_check >= self.data_reload_interval):
+                self._last_data_check = current_time
+                self._reload_data_files()
+            
+            # 帧末通知（持锁状态下），供发布本帧最终状态的快照
+            event_bus.emit("frame_finished", self.current_day)
+            
+            # 暂停时不推进模拟，界面操作产生的延迟事件在此分发
+            if self.paused:
+                event_bus.drain(self.max_events_per_tick)
+    
+    def _reload_data_files(self):
+        """重新读取修改过的数据文件"""
+        changed = data_core.data_manager.reload_changed()
+        if changed:
+            event_bus.emit("message", f"已重新加载数据: {', '.join(changed)}")
+    
+    def step(self, delta_time: float):
+        """按给定的现实时间间隔推进一帧（不读取系统时钟，供无界面模拟使用）"""
         # 更新时间
         self._update_time(delta_time)
         
         # 更新世界管理器
-        world_manager.update()
+        world_manager.update(delta_time)
         
         # 处理调度事件
         self._process_scheduled_events()
         
-        # 处理循环事件
-        self._process_recurring_events()
+        # 帧末统一分发延迟事件
+        event_bus.drain(self.max_events_per_tick)
     
     def _update_time(self, delta_time):
         """更新游戏时间"""
         self.real_time_elapsed += delta_time
         self.game_time_elapsed += delta_time * self.game_speed
+        self._run_simulation()
+    
+    def _run_simulation(self):
+        """按日推进模拟时钟，依次补跑所有错过的日/月/年与循环事件
+        
+        高倍速或卡顿后一帧可能跨过多天，每天都会按顺序完整处理；
+        单帧最多处理max_catch_up_days天，剩余天数留到后续帧，避免界面线程卡死。
+        """
+        target_day = int(self.game_time_elapsed / self.day_duration) + 1
+        backlog = target_day - self.current_day
+        catching_up = backlog > 1
+        
+        steps = min(backlog, self.max_catch_up_days)
+        for _ in range(steps):
+            self._advance_day(catching_up)
         
-        # 计算新的游戏时间
-        new_day = int(self.game_time_elapsed / self.day_duration) + 1
-        new_month = int((new_day - 1) / 30) + 1
-        new_year = int((new_month - 1) / 12) + 1
+        if self.current_day >= target_day:
+            # 已追上当前时间，非整日间隔的循环事件按实际时间处理
+            self.simulated_time = self.game_time_elapsed
+            self._process_recurring_events()
         
-        # 检查日期变化
-        if new_day > self.current_day:
-            self._trigger_day_change(new_day)
+        if catching_up:
+            # 批量补跑结束后只通知一次，界面据此统一刷新
+            event_bus.emit("time_catch_up", {
+                "days": steps,
+                "remaining_days": target_day - self.current_day,
+                "day": self.current_day
+            })
+    
+    def advance_days(self, days: int = 1):
+        """立即推进若干天（修炼、冒险等行动消耗的时间）"""
+        self.game_time_elapsed += days * self.day_duration
+        for _ in range(days):
+            self._advance_day()
+    
+    def _advance_day(self, catching_up: bool = False):
+        """推进一天，依次处理日期变化与到期的循环事件
+        
+        这是游戏中唯一的日期推进入口，世界管理器的每日处理也由此驱动。
+        """
+        start = time.perf_counter()
+        new_day = self.current_day + 1
+        self._trigger_day_change(new_day, catching_up)
+        world_manager.process_day(new_day)
         
-        if new_month > self.current_month:
-            self._trigger_month_change(new_month, new_year)
+        # 每30天为一月、每12月为一年
+        if (new_day - 1) % 30 == 0:
+            total_months = (new_day - 1) // 30 + 1
+            new_year = (total_months - 1) // 12 + 1
+            old_year = self.current_year
+            self._trigger_month_change(total_months, new_year)
+            if new_year > old_year:
+                self._trigger_year_change(new_year, old_year)
         
-        if new_year > self.current_year:
-            self._trigger_year_change(new_year)
+        self.simulated_time = (new_day - 1) * self.day_duration
+        self._process_recurring_events()
+        
+        self.last_day_cost = time.perf_counter() - start
+        self.day_cost_total += self.last_day_cost
+        self.days_processed += 1
     
-    def _trigger_day_change(self, new_day):
+    def _trigger_day_change(self, new_day, catching_up: bool = False):
         """触发日期变化"""
         old_day = self.current_day
         self.current_day = new_day
@@ -108,7 +226,8 @@ class GameEngine:
         event_bus.emit("day_changed", {
             "old_day": old_day,
             "new_day": new_day,
-            "total_days": new_day
+            "total_days": new_day,
+            "catching_up": catching_up
         })
     
     def _trigger_month_change(self, new_month, new_year):
@@ -136,9 +255,10 @@ class GameEngine:
                 "total_months": total_months
             })
     
-    def _trigger_year_change(self, new_year):
+    def _trigger_year_change(self, new_year, old_year=None):
         """触发年份变化"""
-        old_year = self.current_year
+        if old_year is None:
+            old_year = self.current_year
         self.current_year = new_year
         
         event_bus.emit("year_changed", {
@@ -147,26 +267,24 @@ class GameEngine:
         })
     
     def _process_scheduled_events(self):
-        """处理调度事件"""
+        """处理调度事件（只取出已到期的事件）"""
         current_time = self.game_time_elapsed
-        events_to_remove = []
         
-        for i, event_data in enumerate(self.scheduled_events):
-            if current_time >= event_data["trigger_time"]:
-                event_bus.emit(event_data["event_type"], event_data["data"])
-                events_to_remove.append(i)
-        
-        # 移除已触发的事件
-        for i in reversed(events_to_remove):
-            self.scheduled_events.pop(i)
+        # 触发过程中新调度的零延迟事件在同一帧内继续处理
+        due = self.scheduler.pop_due(current_time)
+        while due:
+            for event in due:
+                event_bus.emit(event.event_type, event.data)
+            due = self.scheduler.pop_due(current_time)
     
     def _process_recurring_events(self):
-        """处理循环事件"""
-        current_time = self.game_time_elapsed
+        """处理循环事件（错过的每个周期都会补触发）"""
+        current_time = self.simulated_time
         
         for event_type, event_info in self.recurring_events.items():
-            if current_time - event_info["last_trigger"] >= event_info["interval"]:
-                event_info["last_trigger"] = current_time
+            while current_time - event_info["last_trigger"] >= event_info["interval"]:
+                # 按周期累加，不因帧间隔抖动而漂移
+                event_info["last_trigger"] += event_info["interval"]
                 self._trigger_recurring_event(event_type)
     
     def _trigger_recurring_event(self, event_type):
@@ -194,20 +312,19 @@ class GameEngine:
     
     def _handle_schedule_event(self, event_data):
         """处理事件调度"""
-        trigger_time = self.game_time_elapsed + event_data.get("delay", 0)
-        self.scheduled_events.append({
-            "trigger_time": trigger_time,
-            "event_type": event_data["event_type"],
-            "data": event_data.get("data", {})
-        })
+        self.schedule_event(event_data["event_type"], event_data.get("delay", 0), event_data.get("data", {}))
     
-    def schedule_event(self, event_type: str, delay: float, data: Dict[str, Any] = None):
-        """调度事件"""
-        event_bus.emit("schedule_event", {
-            "event_type": event_type,
-            "delay": delay,
-            "data": data or {}
-        })
+    def schedule_event(self, event_type: str, delay: float, data: Dict[str, Any] = None) -> ScheduledEvent:
+        """调度事件，返回可取消/改期的句柄"""
+        return self.scheduler.schedule(self.game_time_elapsed + delay, event_type, data)
+    
+    def cancel_event(self, event: ScheduledEvent) -> bool:
+        """取消调度事件"""
+        return self.scheduler.cancel(event)
+    
+    def reschedule_event(self, event: ScheduledEvent, delay: float) -> ScheduledEvent:
+        """把调度事件改到从现在起delay之后触发"""
+        return self.scheduler.reschedule(event, self.game_time_elapsed + delay)
     
     def set_game_speed(self, speed: float):
         """设置游戏速度"""
@@ -228,6 +345,15 @@ class GameEngine:
             "game_speed": self.game_speed,
             "paused": self.paused
         }
+    
+    def get_day_cost_info(self) -> Dict[str, Any]:
+        """获取每日处理耗时统计（秒）"""
+        return {
+            "days": self.days_processed,
+            "total": self.day_cost_total,
+            "average": self.day_cost_total / self.days_processed if self.days_processed else 0.0,
+            "last": self.last_day_cost
+        }
 
 # 全局游戏引擎实例
 game_engine = GameEngine()
\ No newline at end of file
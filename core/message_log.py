@@ -0,0 +1,82 @@
+from collections import deque
+from typing import Optional
+
+class Message(str):
+    """带来源标签的消息文本 - 订阅者仍可把它当作普通字符串使用"""
+
+    def __new__(cls, text: str, source: str = "general"):
+        message = super().__new__(cls, text)
+        message.source = source
+        return message
+
+    @staticmethod
+    def factory(source: str):
+        """生成指定来源的消息构造函数：make(text) 或 make(template, *args)
+
+        可直接作为 emit_lazy 的工厂：event_bus.emit_lazy("message", npc_message, "{} 在修炼", name)
+        """
+        def make(text, *args):
+            return Message(text.format(*args) if args else text, source)
+        return make
+
+def message_source(message) -> str:
+    """消息来源（普通字符串视为general）"""
+    return getattr(message, "source", "general")
+
+class LogEntry:
+    """消息日志条目"""
+
+    __slots__ = ("seq", "source", "text")
+
+    def __init__(self, seq: int, source: str, text: str):
+        self.seq = seq
+        self.source = source
+        self.text = text
+
+class MessageLog:
+    """消息日志 - 容量固定的环形缓冲，超出容量时丢弃最早的消息
+
+    每条消息带递增序号，界面据此增量同步：只处理上次同步后新增与被挤出的条目。
+    """
+
+    SOURCES = ("general", "combat", "npc", "encounter")
+
+    def __init__(self, capacity: int = 5000):
+        self.entries = deque(maxlen=capacity)
+        self._next_seq = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.entries.maxlen
+
+    def set_capacity(self, capacity: int):
+        """调整容量（保留最新的消息）"""
+        self.entries = deque(self.entries, maxlen=capacity)
+
+    def append(self, message):
+        """记录一条消息"""
+        self.entries.append(LogEntry(self._next_seq, message_source(message), str(message)))
+        self._next_seq += 1
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def first_seq(self) -> int:
+        """最早一条仍保留的消息序号"""
+        return self.entries[0].seq if self.entries else self._next_seq
+
+    @property
+    def next_seq(self) -> int:
+        """下一条消息的序号"""
+        return self._next_seq
+
+    def get(self, seq: int) -> Optional[LogEntry]:
+        """按序号获取消息（已被挤出时返回None）"""
+        index = seq - self.first_seq
+        if 0 <= index < len(self.entries):
+            return self.entries[index]
+        return None
+
+    def clear(self):
+        self.entries.clear()
@@ -1,107 +1,177 @@
+from typing import Callable, Dict, List, Optional, Tuple
 from ..events import event_bus
 from ..ecs.components import AttributeComponent
+from ..ecs.entity import parse_entity_id
+from ..ecs.modifiers import add_modifier, set_base_value
+
+class DerivedStat:
+    """衍生属性声明 - 由若干输入字段经公式得到的属性
+
+    base为None时公式结果直接写入目标字段；否则首次计算时目标字段的基础值设为base，
+    公式结果作为来源为 "attribute:<输入字段>" 的固定值修正进入属性修正栈，
+    与武学、境界、门派等修正一起计算，百分比修正同样作用于这部分加成，结果与先后顺序无关。
+    """
+
+    __slots__ = ("name", "inputs", "formula", "base", "source")
+
+    def __init__(self, name: str, inputs: Tuple[str, ...], formula: Callable, base: int = None):
+        self.name = name
+        self.inputs = inputs
+        self.formula = formula
+        self.base = base
+        self.source = "attribute:" + "+".join(inputs)
+
+    def apply(self, entity, attrs, value, previous):
+        """把新的计算结果写入实体（previous为上次的结果，首次计算为None）"""
+        if self.base is None:
+            if getattr(attrs, self.name) != value:
+                setattr(attrs, self.name, value)
+            return
+
+        if previous is None:
+            set_base_value(entity, self.name, self.base)
+        add_modifier(entity, self.name, self.source, value)
+
+class DerivedStatGraph:
+    """衍生属性图 - 按输入字段记忆每个实体的计算结果
+
+    每个衍生属性记下上次使用的输入值，只有输入变化的属性才重新计算。
+    声明按依赖顺序排列：衍生属性写入的字段可以作为后续属性的输入。
+    """
+
+    def __init__(self, stats):
+        self.stats: List[DerivedStat] = list(stats)
+        # 实体句柄 -> 衍生属性名 -> (输入值, 计算结果)
+        self.memo: Dict[int, Dict[str, tuple]] = {}
+
+    def dependents(self, field: str) -> List[str]:
+        """直接依赖某字段的衍生属性"""
+        return [stat.name for stat in self.stats if field in stat.inputs]
+
+    def update(self, entity) -> List[str]:
+        """重新计算实体输入发生变化的衍生属性，返回更新过的属性名"""
+        attrs = entity.get_component(AttributeComponent)
+        if attrs is None:
+            return []
+        memo = self.memo.setdefault(entity.id, {})
+        updated = []
+        for stat in self.stats:
+            inputs = tuple(getattr(attrs, field) for field in stat.inputs)
+            cached = memo.get(stat.name)
+            if cached is not None and cached[0] == inputs:
+                continue
+            value = stat.formula(*inputs)
+            stat.apply(entity, attrs, value, None if cached is None else cached[1])
+            memo[stat.name] = (inputs, value)
+            updated.append(stat.name)
+        return updated
+
+    def forget(self, entity_id: int):
+        """丢弃实体的计算记录"""
+        self.memo.pop(entity_id, None)
+
+# 六维属性对角色的影响
+DERIVED_STATS = (
+    # 体质影响生命上限：每点体质增加15点生命
+    DerivedStat("max_health", ("constitution",), lambda constitution: (constitution - 3) * 15, base=100),
+    # 定力影响真气上限：每点定力增加10点真气
+    DerivedStat("max_mana", ("determination",), lambda determination: (determination - 3) * 10, base=50),
+    # 根骨影响功法发挥：每点根骨增加2点武学威力
+    DerivedStat("martial_bonus", ("bone_root",), lambda bone_root: max(0, (bone_root - 3) * 2)),
+    # 魅力影响社交：每点魅力增加5%社交成功率
+    DerivedStat("social_bonus", ("charm",), lambda charm: (charm - 3) * 5),
+    # 幸运影响随机事件：每点幸运增加5%好运概率
+    DerivedStat("luck_modifier", ("luck",), lambda luck: (luck - 3) * 0.05),
+)
 
 class AttributeEffectSystem:
-    """属性效果系统 - 处理六维属性对角色的影响"""
-    
-    def __init__(self):
+    """属性效果系统 - 处理六维属性对角色的影响
+
+    角色创建后由衍生属性图维护其衍生属性；每日结算只比较本系统维护的角色
+    （通常只有玩家）的属性组件版本，版本未变的角色不重新计算。
+    """
+
+    def __init__(self, entity_manager=None):
+        self.graph = DerivedStatGraph(DERIVED_STATS)
+        self.entity_manager = entity_manager
+        # 由本系统维护衍生属性的实体句柄 -> 上次计算后属性组件的版本
+        self.entities: Dict[int, int] = {}
         self._setup_event_handlers()
-    
+
     def _setup_event_handlers(self):
         event_bus.subscribe("day_changed", self._handle_daily_recovery)
         event_bus.subscribe("character_created", self._apply_initial_effects)
         event_bus.subscribe("attribute_changed", self._apply_attribute_effects)
-    
+
     def _handle_daily_recovery(self, day):
         """处理每日恢复"""
         from ..world_manager import world_manager
+        self._update_changed_entities()
         if hasattr(world_manager, 'player_entity_id'):
             self._apply_constitution_recovery(world_manager.player_entity_id)
-    
+
+    def _update_changed_entities(self):
+        """属性组件有变更的角色重新计算衍生属性"""
+        for entity_id, version in list(self.entities.items()):
+            entity = self._get_entity(entity_id)
+            attrs = entity.get_component(AttributeComponent) if entity is not None else None
+            if attrs is None:
+                self._forget(entity_id)
+            elif attrs.version != version:
+                self._update(entity, attrs)
+
     def _apply_constitution_recovery(self, entity_id):
         """应用体质的每日生命恢复"""
         from ..world_manager import world_manager
         if world_manager.has_component(entity_id, AttributeComponent):
             attrs = world_manager.get_component(entity_id, AttributeComponent)
-            
+
             # 体质影响每日生命恢复
-            constitution = getattr(attrs, 'constitution', 3)
+            constitution = attrs.constitution
             recovery_rate = max(1, constitution // 2)  # 体质每2点提供1点恢复
-            
+
             if attrs.health < attrs.max_health:
                 old_health = attrs.health
                 attrs.health = min(attrs.max_health, attrs.health + recovery_rate)
-                
+
                 if attrs.health > old_health:
                     event_bus.emit("message", f"体质强健，恢复了 {attrs.health - old_health} 点生命值")
-    
+
     def _apply_initial_effects(self, event_data):
         """应用初始属性效果"""
         entity_id = event_data.get("entity_id")
         if entity_id:
             self._calculate_attribute_effects(entity_id)
-    
+
     def _apply_attribute_effects(self, event_data):
         """应用属性变化效果"""
         entity_id = event_data.get("entity_id")
         if entity_id:
             self._calculate_attribute_effects(entity_id)
-    
-    def _calculate_attribute_effects(self, entity_id):
-        """计算属性对角色的影响"""
+
+    def _calculate_attribute_effects(self, entity_id) -> Optional[List[str]]:
+        """计算属性对角色的影响（只重新计算输入变化的衍生属性）"""
+        entity_id = parse_entity_id(entity_id)
+        entity = self._get_entity(entity_id)
+        attrs = entity.get_component(AttributeComponent) if entity is not None else None
+        if attrs is None:
+            self._forget(entity_id)
+            return None
+        return self._update(entity, attrs)
+
+    def _update(self, entity, attrs) -> List[str]:
+        """重新计算衍生属性并记下计算后的组件版本"""
+        updated = self.graph.update(entity)
+        self.entities[entity.id] = attrs.version
+        return updated
+
+    def _get_entity(self, entity_id):
+        if self.entity_manager is not None:
+            return self.entity_manager.get_entity(entity_id)
         from ..world_manager import world_manager
-        if not world_manager.has_component(entity_id, AttributeComponent):
-            return
-        
-        attrs = world_manager.get_component(entity_id, AttributeComponent)
-        
-        # 体质影响生命值和内外伤上限
-        constitution = getattr(attrs, 'constitution', 3)
-        base_health = 100
-        health_bonus = (constitution - 3) * 15  # 每点体质增加15点生命
-        new_max_health = base_health + health_bonus
-        
-        # 更新最大生命值
-        if attrs.max_health != new_max_health:
-            health_diff = new_max_health - attrs.max_health
-            attrs.max_health = new_max_health
-            attrs.health = min(attrs.health + health_diff, attrs.max_health)
-        
-        # 定力影响真气上限
-        determination = getattr(attrs, 'determination', 3)
-        base_mana = 50
-        mana_bonus = (determination - 3) * 10  # 每点定力增加10点真气
-        new_max_mana = base_mana + mana_bonus
-        
-        if attrs.max_mana != new_max_mana:
-            mana_diff = new_max_mana - attrs.max_mana
-            attrs.max_mana = new_max_mana
-            attrs.mana = min(attrs.mana + mana_diff, attrs.max_mana)
-        
-        # 根骨影响功法发挥
-        bone_root = getattr(attrs, 'bone_root', 3)
-        martial_bonus = max(0, (bone_root - 3) * 2)  # 每点根骨增加2点武学威力
-        
-        # 魅力影响社交
-        charm = attrs.charm
-        social_bonus = (charm - 3) * 5  # 每点魅力增加5%社交成功率
-        
-        # 幸运影响随机事件
-        luck = attrs.luck
-        luck_modifier = (luck - 3) * 0.05  # 每点幸运增加5%好运概率
-        
-        # 存储计算结果到属性中
-        if not hasattr(attrs, 'martial_bonus'):
-            attrs.martial_bonus = martial_bonus
-        else:
-            attrs.martial_bonus = martial_bonus
-            
-        if not hasattr(attrs, 'social_bonus'):
-            attrs.social_bonus = social_bonus
-        else:
-            attrs.social_bonus = social_bonus
-            
-        if not hasattr(attrs, 'luck_modifier'):
-            attrs.luck_modifier = luck_modifier
-        else:
-            attrs.luck_modifier = luck_modifier
\ No newline at end of file
+        return world_manager.get_entity(entity_id)
+
+    def _forget(self, entity_id):
+        """角色失去属性组件或被销毁后不再维护"""
+        self.entities.pop(entity_id, None)
+        self.graph.forget(entity_id)
@@ -1,5 +1,8 @@
 import random
 from ..events import event_bus
+from ..message_log import Message
+
+combat_message = Message.factory("combat")
 
 class AutoCombatSystem:
     """半自动战斗系统"""
@@ -205,11 +208,11 @@ class AutoCombatSystem:
             "stats": self.combat_stats.copy()
         })
         
-        event_bus.emit("message", message)
+        event_bus.emit("message", combat_message(message))
     
     def _handle_combat_start(self, event_data):
         """处理战斗开始"""
-        event_bus.emit("message", "战斗开始！")
+        event_bus.emit("message", combat_message("战斗开始！"))
     
     def _handle_combat_turn(self, event_data):
         """处理战斗回合"""
@@ -219,17 +222,17 @@ class AutoCombatSystem:
         """处理玩家干预"""
         action = event_data.get("action")
         if action:
-            event_bus.emit("message", f"玩家选择：{action}")
+            event_bus.emit("message", combat_message(f"玩家选择：{action}"))
     
     def set_auto_combat(self, enabled):
         """设置自动战斗"""
         self.auto_combat_enabled = enabled
-        event_bus.emit("message", f"半自动战斗{'开启' if enabled else '关闭'}")
+        event_bus.emit("message", combat_message(f"半自动战斗{'开启' if enabled else '关闭'}"))
     
     def set_intervention(self, enabled):
         """设置干预模式"""
         self.intervention_enabled = enabled
-        event_bus.emit("message", f"关键时刻干预{'开启' if enabled else '关闭'}")
+        event_bus.emit("message", combat_message(f"关键时刻干预{'开启' if enabled else '关闭'}"))
     
     def set_strategy(self, strategy):
         """设置战斗策略"""
@@ -241,7 +244,7 @@ class AutoCombatSystem:
             "technical": "技巧流"
         }
         name = strategy_names.get(strategy, strategy)
-        event_bus.emit("message", f"战斗策略设为：{name}")
+        event_bus.emit("message", combat_message(f"战斗策略设为：{name}"))
     
     def get_combat_stats(self):
         """获取战斗统计"""
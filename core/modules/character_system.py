@@ -1,5 +1,6 @@
 from ..events import event_bus
 from ..data_core import data_core
+from ..ecs.modifiers import add_modifier, remove_modifiers, PERCENT
 
 class CharacterSystem:
     """角色系统 - 管理角色成长和生命周期"""
@@ -29,10 +30,6 @@ class CharacterSystem:
             return
         
         # 增加经验
-        if not hasattr(attr, 'experience'):
-            attr.experience = 0
-            attr.level = 1
-        
         attr.experience += exp_amount
         
         # 检查升级
@@ -80,11 +77,15 @@ class CharacterSystem:
             # 从数据核心获取境界信息
             realm_data = data_core.get_realm(new_realm)
             if realm_data:
-                # 应用境界加成
-                multipliers = realm_data["attribute_multipliers"]
-                attr.max_health = int(attr.max_health * multipliers["health"])
-                attr.max_mana = int(attr.max_mana * multipliers["mana"])
-                attr.lifespan += realm_data["lifespan_bonus"]
+                # 境界加成作为修正：新境界的加成替换旧境界的加成
+                remove_modifiers(entity, "realm")
+                multipliers = realm_data.get("attribute_multipliers", {})
+                if "health" in multipliers:
+                    add_modifier(entity, "max_health", "realm", multipliers["health"] - 1, PERCENT)
+                if "mana" in multipliers:
+                    add_modifier(entity, "max_mana", "realm", multipliers["mana"] - 1, PERCENT)
+                if realm_data.get("lifespan_bonus"):
+                    add_modifier(entity, "lifespan", "realm", realm_data["lifespan_bonus"])
                 
                 event_bus.emit("message", f"突破到 {realm_data['name']} 境界！")
     
@@ -1,7 +1,10 @@
 import random
 from ..events import event_bus
+from ..message_log import Message
 from ..data_core import data_core
 
+combat_message = Message.factory("combat")
+
 class DamageCalculator:
     """伤害计算器 - 可配置的伤害公式"""
     
@@ -70,7 +73,7 @@ class CombatSystem:
             "round": 1
         }
         
-        event_bus.emit("message", "战斗开始！")
+        event_bus.emit("message", combat_message("战斗开始！"))
     
     def _handle_attack_request(self, event_data):
         """处理攻击请求"""
@@ -106,17 +109,19 @@ class CombatSystem:
         # 应用伤害
         target_attr.health = max(0, target_attr.health - damage)
         
-        # 发布伤害事件
-        event_bus.emit("damage_dealt", {
-            "attacker_id": attacker_id,
-            "target_id": target_id,
-            "damage": damage,
-            "is_crit": is_crit,
-            "damage_type": "physical"
-        })
+        # 发布伤害事件（无人订阅时跳过构造数据）
+        if event_bus.has_subscribers("damage_dealt"):
+            event_bus.emit("damage_dealt", {
+                "attacker_id": attacker_id,
+                "target_id": target_id,
+                "damage": damage,
+                "is_crit": is_crit,
+                "damage_type": "physical"
+            })
         
-        crit_text = " (暴击!)" if is_crit else ""
-        event_bus.emit("message", f"造成 {damage} 点物理伤害{crit_text}")
+        if event_bus.has_subscribers("message"):
+            crit_text = " (暴击!)" if is_crit else ""
+            event_bus.emit("message", combat_message(f"造成 {damage} 点物理伤害{crit_text}"))
         
         # 检查死亡
         if target_attr.health <= 0:
@@ -155,18 +160,20 @@ class CombatSystem:
             # 应用伤害
             target_attr.health = max(0, target_attr.health - damage)
             
-            # 发布伤害事件
-            event_bus.emit("damage_dealt", {
-                "attacker_id": caster_id,
-                "target_id": target_id,
-                "damage": damage,
-                "is_crit": is_crit,
-                "damage_type": "spell",
-                "element": element
-            })
+            # 发布伤害事件（无人订阅时跳过构造数据）
+            if event_bus.has_subscribers("damage_dealt"):
+                event_bus.emit("damage_dealt", {
+                    "attacker_id": caster_id,
+                    "target_id": target_id,
+                    "damage": damage,
+                    "is_crit": is_crit,
+                    "damage_type": "spell",
+                    "element": element
+                })
             
-            crit_text = " (暴击!)" if is_crit else ""
-            event_bus.emit("message", f"法术造成 {damage} 点{element}伤害{crit_text}")
+            if event_bus.has_subscribers("message"):
+                crit_text = " (暴击!)" if is_crit else ""
+                event_bus.emit("message", combat_message(f"法术造成 {damage} 点{element}伤害{crit_text}"))
             
             # 检查死亡
             if target_attr.health <= 0:
@@ -186,7 +193,7 @@ class CombatSystem:
             del self.active_combats[combat_id]
             event_bus.emit("combat_end", {"combat_id": combat_id})
         
-        event_bus.emit("message", "战斗结束！")
+        event_bus.emit("message", combat_message("战斗结束！"))
     
     def handle_encounter_combat(self, entity_id, enemy_data):
         """处理奇遇战斗"""
@@ -217,7 +224,7 @@ class CombatSystem:
         player_attr = player.get_component("AttributeComponent")
         enemy_attr = enemy.get_component("AttributeComponent")
         
-        event_bus.emit("message", f"与{enemy_name}展开激战！")
+        event_bus.emit("message", combat_message(f"与{enemy_name}展开激战！"))
         
         # 简单的回合制战斗
         rounds = 0
@@ -229,7 +236,7 @@ class CombatSystem:
             enemy_attr.health = max(0, enemy_attr.health - player_damage)
             
             if enemy_attr.health <= 0:
-                event_bus.emit("message", f"击败了{enemy_name}！")
+                event_bus.emit("message", combat_message(f"击败了{enemy_name}！"))
                 event_bus.emit("combat_victory", {"player_id": player_id, "enemy_name": enemy_name})
                 break
             
@@ -238,7 +245,7 @@ class CombatSystem:
             player_attr.health = max(0, player_attr.health - enemy_damage)
             
             if player_attr.health <= 0:
-                event_bus.emit("message", f"被{enemy_name}击败了...")
+                event_bus.emit("message", combat_message(f"被{enemy_name}击败了..."))
                 event_bus.emit("combat_defeat", {"player_id": player_id, "enemy_name": enemy_name})
                 break
         
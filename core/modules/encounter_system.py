@@ -1,8 +1,11 @@
 import random
 from abc import ABC, abstractmethod
 from ..events import event_bus
+from ..message_log import Message
 from ..data_core import data_core
 
+encounter_message = Message.factory("encounter")
+
 class Trigger(ABC):
     """触发器基类"""
     
@@ -71,6 +74,7 @@ class EncounterSystem:
         self.world_manager = world_manager
         self.active_encounters = {}
         self.triggers = []
+        self.character_query = world_manager.entity_manager.query("AttributeComponent", "StateComponent")
         self._setup_event_handlers()
         self._initialize_triggers()
     
@@ -98,9 +102,7 @@ class EncounterSystem:
         }
         
         # 获取玩家实体（假设只有一个玩家）
-        player_entities = self.world_manager.entity_manager.get_entities_with_components("AttributeComponent", "StateComponent")
-        
-        for entity in player_entities:
+        for entity in self.character_query:
             self._check_encounters_for_entity(entity.id, context)
     
     def _check_location_encounters(self, event_data):
@@ -125,12 +127,11 @@ class EncounterSystem:
     
     def _try_trigger_encounter(self, entity_id, context):
         """尝试触发奇遇"""
-        encounters_data = data_core.get_encounter()
-        if not encounters_data:
+        encounter_list = data_core.records('encounters')
+        if not encounter_list:
             return
         
         # 随机选择一个奇遇
-        encounter_list = list(encounters_data["encounters"].values())
         available_encounters = []
         
         for encounter in encounter_list:
@@ -172,12 +173,12 @@ class EncounterSystem:
             "encounter": encounter
         })
         
-        event_bus.emit("message", f"奇遇：{encounter['name']}")
-        event_bus.emit("message", encounter["description"])
+        event_bus.emit("message", encounter_message(f"奇遇：{encounter['name']}"))
+        event_bus.emit("message", encounter_message(encounter["description"]))
         
         # 显示选择项
         for i, choice in enumerate(encounter.get("choices", [])):
-            event_bus.emit("message", f"{i+1}. {choice['text']}")
+            event_bus.emit("message", encounter_message(f"{i+1}. {choice['text']}"))
     
     def _handle_encounter_choice(self, event_data):
         """处理奇遇选择"""
@@ -225,11 +226,11 @@ class EncounterSystem:
             self.world_manager.combat_system.handle_encounter_combat(entity_id, enemy_data)
         else:
             # 备用简单战斗
-            event_bus.emit("message", f"与{enemy_data['name']}展开激战！")
+            event_bus.emit("message", encounter_message(f"与{enemy_data['name']}展开激战！"))
             if random.random() < 0.7:  # 70%胜率
-                event_bus.emit("message", "胜利！")
+                event_bus.emit("message", encounter_message("胜利！"))
             else:
-                event_bus.emit("message", "失败...")
+                event_bus.emit("message", encounter_message("失败..."))
                 entity = self.world_manager.get_entity(entity_id)
                 if entity:
                     attr = entity.get_component("AttributeComponent")
@@ -257,7 +258,7 @@ class EncounterSystem:
             if inventory:
                 for item in rewards["items"]:
                     inventory.add_item(item["id"], item["count"])
-                    event_bus.emit("message", f"获得 {item['id']} x{item['count']}")
+                    event_bus.emit("message", encounter_message(f"获得 {item['id']} x{item['count']}"))
         
         # 应用经验奖励
         if "experience" in rewards:
@@ -273,15 +274,16 @@ class EncounterSystem:
                 gongfa_id = rewards["gongfa"]
                 if gongfa_id not in skills.learned_gongfa:
                     skills.learned_gongfa.append(gongfa_id)
-                    event_bus.emit("message", f"学会了功法：{gongfa_id}")
+                    skills.touch()
+                    event_bus.emit("message", encounter_message(f"学会了功法：{gongfa_id}"))
         
         # 显示结果消息
         if result == "treasure_found":
-            event_bus.emit("message", "你发现了宝物！")
+            event_bus.emit("message", encounter_message("你发现了宝物！"))
         elif result == "ancient_inheritance":
-            event_bus.emit("message", "你获得了古代传承！")
+            event_bus.emit("message", encounter_message("你获得了古代传承！"))
         elif result == "safe_retreat":
-            event_bus.emit("message", "你安全地离开了。")
+            event_bus.emit("message", encounter_message("你安全地离开了。"))
     
     def make_choice(self, entity_id, choice_index):
         """玩家做出选择"""
@@ -1,7 +1,7 @@
 import random
-import json
 from ..events import event_bus
 from ..data_core import data_core
+from ..content import content_registry
 
 class MartialSystem:
     """武学体系 - 太吾传人武学管理"""
@@ -13,11 +13,8 @@ class MartialSystem:
         self._setup_event_handlers()
     
     def _load_config(self):
-        try:
-            with open("data/martial_system.json", "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            return self._get_default_config()
+        config = content_registry.get("martial_system.json", None)
+        return config if config is not None else self._get_default_config()
     
     def _get_default_config(self):
         return {
@@ -53,6 +50,12 @@ class MartialSystem:
         event_bus.subscribe("auto_training_toggle", self._handle_auto_training)
         event_bus.subscribe("training_focus_change", self._handle_focus_change)
         event_bus.subscribe("martial_learn_request", self._handle_learn_request)
+        event_bus.subscribe("data_reloaded", self._handle_data_reloaded)
+    
+    def _handle_data_reloaded(self, event_data):
+        """武学配置文件修改后重新读取"""
+        if "martial_system.json" in event_data["files"]:
+            self.config = self._load_config()
     
     def get_available_martials(self, character_id):
         """获取可学习的武学"""
@@ -176,6 +179,7 @@ class MartialSystem:
         
         # 学习成功
         skills.learned_gongfa.append(martial_id)
+        skills.touch()
         
         # 应用效果
         self._apply_martial_effects(character_id, martial)
@@ -188,31 +192,23 @@ class MartialSystem:
         
         return True
     
+    # 武学效果中作为属性修正的字段
+    MODIFIED_STATS = ("max_mana", "max_health", "physical_attack", "spell_attack", "defense")
+    
     def _apply_martial_effects(self, character_id, martial):
-        """应用武学效果"""
+        """应用武学效果（每门武学一个修正来源，重复应用不会叠加）"""
         from ..world_manager import world_manager
         from ..ecs.components import AttributeComponent
+        from ..ecs.modifiers import add_modifier
         
-        if not world_manager.has_component(character_id, AttributeComponent):
+        entity = world_manager.get_entity(character_id)
+        if not entity or not entity.has_component(AttributeComponent):
             return
         
-        attrs = world_manager.get_component(character_id, AttributeComponent)
-        effects = martial.get("effects", {})
-        
-        # 应用属性加成
-        for effect, value in effects.items():
-            if effect == "max_mana":
-                attrs.max_mana += value
-                attrs.mana = min(attrs.mana + value, attrs.max_mana)
-            elif effect == "max_health":
-                attrs.max_health += value
-                attrs.health = min(attrs.health + value, attrs.max_health)
-            elif effect == "physical_attack":
-                attrs.physical_attack += value
-            elif effect == "spell_attack":
-                attrs.spell_attack += value
-            elif effect == "defense":
-                attrs.defense += value
+        source = f"martial:{martial['id']}"
+        for effect, value in martial.get("effects", {}).items():
+            if effect in self.MODIFIED_STATS:
+                add_modifier(entity, effect, source, value)
     
     def auto_train_martials(self, character_id):
         """自动修炼武学"""
@@ -1,8 +1,12 @@
 import random
-import json
 from ..events import event_bus
+from ..message_log import Message
 from ..data_core import data_core
+from ..content import content_registry
 from ..ecs.components import AttributeComponent, SkillComponent, StateComponent, InventoryComponent
+from ..ecs.entity import parse_entity_id
+
+npc_message = Message.factory("npc")
 
 class NPCSystem:
     """NPC系统 - 管理NPC生成、行为和互动"""
@@ -16,16 +20,18 @@ class NPCSystem:
     
     def _load_npc_templates(self):
         """加载NPC模板"""
-        try:
-            with open("data/npc_templates.json", "r", encoding="utf-8") as f:
-                return json.load(f)["npc_templates"]
-        except:
-            return {}
+        return content_registry.section("npc_templates.json", "npc_templates")
     
     def _setup_event_handlers(self):
         """设置事件处理器"""
         event_bus.subscribe("day_changed", self._handle_daily_npc_actions)
         event_bus.subscribe("npc_interaction", self._handle_npc_interaction)
+        event_bus.subscribe("data_reloaded", self._handle_data_reloaded)
+    
+    def _handle_data_reloaded(self, event_data):
+        """NPC模板文件修改后重新读取（已生成的NPC不受影响）"""
+        if "npc_templates.json" in event_data["files"]:
+            self.npc_templates = self._load_npc_templates()
     
     def _spawn_initial_npcs(self):
         """生成初始NPC"""
@@ -87,7 +93,7 @@ class NPCSystem:
         
         self.npc_entities.append(entity.id)
         
-        event_bus.emit("message", f"{npc_name} 来到了这个世界")
+        event_bus.emit("message", npc_message(f"{npc_name} 来到了这个世界"))
         return entity.id
     
     def _handle_daily_npc_actions(self, current_day):
@@ -128,7 +134,7 @@ class NPCSystem:
         
         npc_name = npc_entity.npc_data["name"]
         if random.random() < 0.3:  # 30%概率显示消息
-            event_bus.emit("message", f"{npc_name} 在静心修炼")
+            event_bus.emit_lazy("message", npc_message, "{} 在静心修炼", npc_name)
     
     def _npc_adventure(self, npc_entity):
         """NPC历练"""
@@ -152,22 +158,22 @@ class NPCSystem:
         if outcome["type"] == "gain_item":
             inventory.add_item(outcome["item"], outcome["count"])
             if random.random() < 0.2:
-                event_bus.emit("message", f"{npc_name} 历练归来，收获颇丰")
+                event_bus.emit_lazy("message", npc_message, "{} 历练归来，收获颇丰", npc_name)
         
         elif outcome["type"] == "gain_power":
             npc_entity.npc_data["power"] += outcome["amount"]
             if random.random() < 0.2:
-                event_bus.emit("message", f"{npc_name} 历练中有所感悟")
+                event_bus.emit_lazy("message", npc_message, "{} 历练中有所感悟", npc_name)
         
         elif outcome["type"] == "injury":
             attr.health = max(1, attr.health - outcome["damage"])
             if random.random() < 0.3:
-                event_bus.emit("message", f"{npc_name} 历练时受了些伤")
+                event_bus.emit_lazy("message", npc_message, "{} 历练时受了些伤", npc_name)
         
         elif outcome["type"] == "breakthrough":
             npc_entity.npc_data["power"] += outcome["power_gain"]
             if random.random() < 0.5:
-                event_bus.emit("message", f"{npc_name} 历练中突破了境界！")
+                event_bus.emit_lazy("message", npc_message, "{} 历练中突破了境界！", npc_name)
     
     def _npc_interact_with_player(self, npc_entity):
         """NPC与玩家互动"""
@@ -187,32 +193,32 @@ class NPCSystem:
         npc_name = npc_entity.npc_data["name"]
         
         interactions = [
-            f"{npc_name}: 年轻人，修仙之路漫漫，切勿急躁。",
-            f"{npc_name}: 我观你骨骼清奇，是个修仙的好苗子。",
-            f"{npc_name}: 修炼不仅要勤奋，更要有悟性。"
+            "{}: 年轻人，修仙之路漫漫，切勿急躁。",
+            "{}: 我观你骨骼清奇，是个修仙的好苗子。",
+            "{}: 修炼不仅要勤奋，更要有悟性。"
         ]
         
         # 有小概率传授技能
         if random.random() < 0.1:
-            event_bus.emit("message", f"{npc_name} 传授了你一些修炼心得")
+            event_bus.emit_lazy("message", npc_message, "{} 传授了你一些修炼心得", npc_name)
             event_bus.emit("experience_gained", {
                 "entity_id": self.world_manager.player_entity_id,
                 "amount": random.randint(20, 50)
             })
         else:
-            event_bus.emit("message", random.choice(interactions))
+            event_bus.emit_lazy("message", npc_message, random.choice(interactions), npc_name)
     
     def _disciple_interaction(self, npc_entity):
         """弟子互动 - 可能切磋或交流"""
         npc_name = npc_entity.npc_data["name"]
         
         interactions = [
-            f"{npc_name}: 道友，可愿与我切磋一二？",
-            f"{npc_name}: 最近修炼遇到了瓶颈，不知道友有何见解？",
-            f"{npc_name}: 听闻道友天赋异禀，久仰大名！"
+            "{}: 道友，可愿与我切磋一二？",
+            "{}: 最近修炼遇到了瓶颈，不知道友有何见解？",
+            "{}: 听闻道友天赋异禀，久仰大名！"
         ]
         
-        event_bus.emit("message", random.choice(interactions))
+        event_bus.emit_lazy("message", npc_message, random.choice(interactions), npc_name)
         
         # 有概率发生切磋
         if random.random() < 0.2:
@@ -223,12 +229,12 @@ class NPCSystem:
         npc_name = npc_entity.npc_data["name"]
         
         interactions = [
-            f"{npc_name}: 道友，修仙路上多保重。",
-            f"{npc_name}: 这世道，修仙不易啊。",
-            f"{npc_name}: 道友面相不凡，必有大成就。"
+            "{}: 道友，修仙路上多保重。",
+            "{}: 这世道，修仙不易啊。",
+            "{}: 道友面相不凡，必有大成就。"
         ]
         
-        event_bus.emit("message", random.choice(interactions))
+        event_bus.emit_lazy("message", npc_message, random.choice(interactions), npc_name)
     
     def _sparring_match(self, npc_entity):
         """切磋比试"""
@@ -244,10 +250,13 @@ class NPCSystem:
         if not player_attr:
             return
         
-        player_power = getattr(player_attr, 'power', 20)
+        player_power = player_attr.power
         
-        event_bus.emit("message", f"=== 与 {npc_name} 开始切磋 ===")  
-        event_bus.emit("message", f"你的修为: {player_power}, {npc_name}的修为: {npc_power}")
+        # 没有人接收消息时（无界面模拟）跳过逐回合的战报拼接
+        verbose = event_bus.has_subscribers("message")
+        if verbose:
+            event_bus.emit("message", npc_message(f"=== 与 {npc_name} 开始切磋 ==="))  
+            event_bus.emit("message", npc_message(f"你的修为: {player_power}, {npc_name}的修为: {npc_power}"))
         
         # 模拟战斗过程
         rounds = random.randint(3, 6)
@@ -255,50 +264,55 @@ class NPCSystem:
         npc_damage_taken = 0
         
         for round_num in range(1, rounds + 1):
-            event_bus.emit("message", f"--- 第{round_num}回合 ---")
+            if verbose:
+                event_bus.emit("message", npc_message(f"--- 第{round_num}回合 ---"))
             
             # 玩家攻击
             player_attack = random.randint(5, 15) + player_power // 10
             npc_defense = random.randint(3, 8) + npc_power // 15
             damage_to_npc = max(1, player_attack - npc_defense)
             npc_damage_taken += damage_to_npc
-            event_bus.emit("message", f"你对 {npc_name} 造成了 {damage_to_npc} 点伤害")
+            if verbose:
+                event_bus.emit("message", npc_message(f"你对 {npc_name} 造成了 {damage_to_npc} 点伤害"))
             
             # NPC攻击
             npc_attack = random.randint(5, 15) + npc_power // 10
             player_defense = random.randint(3, 8) + player_power // 15
             damage_to_player = max(1, npc_attack - player_defense)
             player_damage_taken += damage_to_player
-            event_bus.emit("message", f"{npc_name} 对你造成了 {damage_to_player} 点伤害")
+            if verbose:
+                event_bus.emit("message", npc_message(f"{npc_name} 对你造成了 {damage_to_player} 点伤害"))
         
         # 判定胜负
         if npc_damage_taken > player_damage_taken:
-            event_bus.emit("message", f"你获得了胜利！")
+            event_bus.emit("message", npc_message(f"你获得了胜利！"))
             exp_gain = random.randint(15, 30)
         elif player_damage_taken > npc_damage_taken * 1.5:
-            event_bus.emit("message", f"你败下阵来")
+            event_bus.emit("message", npc_message(f"你败下阵来"))
             exp_gain = random.randint(5, 15)
         else:
-            event_bus.emit("message", f"势均力敌")
+            event_bus.emit("message", npc_message(f"势均力敌"))
             exp_gain = random.randint(10, 20)
         
         # 应用伤害（减少伤害避免死亡）
         actual_damage = min(player_damage_taken // 5, player_attr.health - 5)
         if actual_damage > 0:
             player_attr.health -= actual_damage
-            event_bus.emit("message", f"你的生命值减少 {actual_damage} 点")
+            if verbose:
+                event_bus.emit("message", npc_message(f"你的生命值减少 {actual_damage} 点"))
         
         # 经验奖励
         event_bus.emit("experience_gained", {
             "entity_id": self.world_manager.player_entity_id,
             "amount": exp_gain
         })
-        event_bus.emit("message", f"获得 {exp_gain} 点修炼经验")
-        event_bus.emit("message", "=== 切磋结束 ===")
+        if verbose:
+            event_bus.emit("message", npc_message(f"获得 {exp_gain} 点修炼经验"))
+            event_bus.emit("message", npc_message("=== 切磋结束 ==="))
     
     def _handle_npc_interaction(self, event_data):
         """处理NPC互动事件"""
-        npc_id = event_data.get("npc_id")
+        npc_id = parse_entity_id(event_data.get("npc_id"))
         if npc_id in self.npc_entities:
             npc_entity = self.world_manager.get_entity(npc_id)
             if npc_entity:
@@ -71,6 +71,7 @@ class ApplyStateEffect(EffectProcessor):
         
         if state_id:
             state.debuffs[state_id] = {"duration": duration, "data": effect_data}
+            state.touch()
             
             event_bus.emit("state_applied", {
                 "target_id": target_entity.id,
@@ -1,6 +1,6 @@
-import json
 import random
 from ..events import event_bus
+from ..content import content_registry
 from ..data_core import data_core
 
 class TaiwuTimeSystem:
@@ -9,15 +9,12 @@ class TaiwuTimeSystem:
     def __init__(self):
         self.current_month = 1
         self.current_year = 1
-        self.config = self._load_config()
         self._setup_event_handlers()
     
-    def _load_config(self):
-        try:
-            with open("data/taiwu_system.json", "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            return {}
+    @property
+    def config(self):
+        # 每次从内容注册表读取，数据文件热重载后即使用新数据
+        return content_registry.get("taiwu_system.json", {})
     
     def _setup_event_handlers(self):
         event_bus.subscribe("month_passed", self._handle_month_change)
@@ -62,16 +59,12 @@ class StanceSystem:
     """立场系统"""
     
     def __init__(self):
-        self.config = self._load_config()
         self.player_stance = "neutral"
         self.stance_points = {"righteous": 0, "benevolent": 0, "neutral": 50, "rebellious": 0, "selfish": 0}
     
-    def _load_config(self):
-        try:
-            with open("data/taiwu_system.json", "r", encoding="utf-8") as f:
-                return json.load(f)["stances"]
-        except:
-            return {}
+    @property
+    def config(self):
+        return content_registry.section("taiwu_system.json", "stances")
     
     def adjust_stance(self, stance_type, points):
         """调整立场点数"""
@@ -103,15 +96,11 @@ class AptitudeSystem:
     """资质系统"""
     
     def __init__(self):
-        self.config = self._load_config()
         self.aptitudes = self._generate_random_aptitudes()
     
-    def _load_config(self):
-        try:
-            with open("data/taiwu_system.json", "r", encoding="utf-8") as f:
-                return json.load(f)["aptitudes"]
-        except:
-            return {}
+    @property
+    def config(self):
+        return content_registry.section("taiwu_system.json", "aptitudes")
     
     def _generate_random_aptitudes(self):
         """生成随机资质"""
@@ -139,16 +128,12 @@ class RegionSystem:
     """地区系统"""
     
     def __init__(self):
-        self.config = self._load_config()
         self.current_region = "central_plains"
         self.discovered_regions = ["central_plains"]
     
-    def _load_config(self):
-        try:
-            with open("data/taiwu_system.json", "r", encoding="utf-8") as f:
-                return json.load(f)["regions"]
-        except:
-            return {}
+    @property
+    def config(self):
+        return content_registry.section("taiwu_system.json", "regions")
     
     def travel_to_region(self, region_id):
         """前往地区"""
@@ -184,17 +169,13 @@ class XiangshuSystem:
     """相枢入侵系统"""
     
     def __init__(self):
-        self.config = self._load_config()
         self.current_phase = 0
         self.invasion_effects = {}
         self._setup_event_handlers()
     
-    def _load_config(self):
-        try:
-            with open("data/taiwu_system.json", "r", encoding="utf-8") as f:
-                return json.load(f)["xiangshu_invasion"]
-        except:
-            return {}
+    @property
+    def config(self):
+        return content_registry.section("taiwu_system.json", "xiangshu_invasion")
     
     def _setup_event_handlers(self):
         event_bus.subscribe("xiangshu_phase_change", self._handle_phase_change)
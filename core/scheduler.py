@@ -0,0 +1,114 @@
+import heapq
+import itertools
+from typing import Any, Dict, List, Optional
+
+class ScheduledEvent:
+    """调度事件句柄 - 可用于取消或重新调度"""
+
+    __slots__ = ("trigger_time", "event_type", "data", "cancelled", "_seq", "_scheduler")
+
+    def __init__(self, scheduler: "EventScheduler", trigger_time: float, event_type: str, data: Dict[str, Any]):
+        self.trigger_time = trigger_time
+        self.event_type = event_type
+        self.data = data
+        self.cancelled = False
+        self._seq = -1
+        self._scheduler = scheduler
+
+    @property
+    def pending(self) -> bool:
+        """是否仍在等待触发"""
+        return self._seq >= 0 and not self.cancelled
+
+    def cancel(self) -> bool:
+        """取消事件"""
+        return self._scheduler.cancel(self)
+
+    def reschedule(self, trigger_time: float) -> "ScheduledEvent":
+        """改期到新的触发时间"""
+        return self._scheduler.reschedule(self, trigger_time)
+
+class EventScheduler:
+    """事件调度器 - 按触发时间排列的最小堆
+
+    每次只弹出到期的事件，不再遍历全部等待中的事件。
+    取消和改期采用惰性删除：堆中旧条目的序号与句柄不符时直接丢弃，
+    失效条目过多时整体重建一次堆。
+    """
+
+    def __init__(self):
+        self._heap: List[tuple] = []
+        self._counter = itertools.count()
+        self._pending = 0
+
+    def __len__(self):
+        return self._pending
+
+    def schedule(self, trigger_time: float, event_type: str, data: Dict[str, Any] = None) -> ScheduledEvent:
+        """在指定时间调度事件，返回句柄"""
+        event = ScheduledEvent(self, trigger_time, event_type, data or {})
+        self._push(event)
+        self._pending += 1
+        return event
+
+    def cancel(self, event: ScheduledEvent) -> bool:
+        """取消事件（已触发或已取消时返回False）"""
+        if not event.pending:
+            return False
+        event.cancelled = True
+        event._seq = -1
+        self._pending -= 1
+        self._compact()
+        return True
+
+    def reschedule(self, event: ScheduledEvent, trigger_time: float) -> ScheduledEvent:
+        """改期事件，已触发或已取消的事件重新加入调度"""
+        if not event.pending:
+            event.cancelled = False
+            self._pending += 1
+        event.trigger_time = trigger_time
+        self._push(event)
+        self._compact()
+        return event
+
+    def next_time(self) -> Optional[float]:
+        """最近一个事件的触发时间"""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, current_time: float) -> List[ScheduledEvent]:
+        """取出所有到期的事件（按触发时间、调度先后排序）"""
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= current_time:
+            _, seq, event = heapq.heappop(heap)
+            if seq == event._seq:
+                event._seq = -1
+                self._pending -= 1
+                due.append(event)
+        return due
+
+    def clear(self):
+        """清空所有事件"""
+        for _, seq, event in self._heap:
+            if seq == event._seq:
+                event.cancelled = True
+                event._seq = -1
+        self._heap.clear()
+        self._pending = 0
+
+    def _push(self, event: ScheduledEvent):
+        event._seq = next(self._counter)
+        heapq.heappush(self._heap, (event.trigger_time, event._seq, event))
+
+    def _discard_stale(self):
+        """丢弃堆顶的失效条目"""
+        heap = self._heap
+        while heap and heap[0][1] != heap[0][2]._seq:
+            heapq.heappop(heap)
+
+    def _compact(self):
+        """失效条目超过一半时重建堆"""
+        if len(self._heap) > 64 and len(self._heap) > 2 * self._pending:
+            self._heap = [entry for entry in self._heap if entry[1] == entry[2]._seq]
+            heapq.heapify(self._heap)
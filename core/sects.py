@@ -1,12 +1,17 @@
-import json
 import random
 from .events import event_bus
+from .content import content_registry
 
 class SectManager:
     def __init__(self):
-        with open("data/sects.json", "r", encoding="utf-8") as f:
-            self.sects_data = json.load(f)
+        self.sects_data = content_registry.get("sects.json")
         self.current_sect = None
+        event_bus.subscribe("data_reloaded", self._handle_data_reloaded)
+
+    def _handle_data_reloaded(self, event_data):
+        """门派数据文件修改后重新读取"""
+        if "sects.json" in event_data["files"]:
+            self.sects_data = content_registry.get("sects.json")
         
     def get_available_sects(self, character):
         available = []
@@ -17,25 +22,33 @@ class SectManager:
                 available.append((sect_id, sect))
         return available
     
-    def join_sect(self, sect_id, character):
+    def join_sect(self, sect_id, entity_id):
         if sect_id in self.sects_data["sects"]:
             self.current_sect = sect_id
             sect = self.sects_data["sects"][sect_id]
             
             # 应用门派加成
-            self._apply_sect_bonus(sect, character)
+            self._apply_sect_bonus(sect, entity_id)
             
             event_bus.emit("sect_joined", {"sect_id": sect_id, "sect": sect})
             event_bus.emit("message", f"加入了 {sect['name']}！")
             return True
         return False
     
-    def _apply_sect_bonus(self, sect, character):
+    def _apply_sect_bonus(self, sect, entity_id):
+        """门派加成作为角色实体的属性修正（更换门派时替换）"""
+        from .world_manager import world_manager
+        from .ecs.modifiers import add_modifier, remove_modifiers, PERCENT
+        entity = world_manager.get_entity(entity_id)
+        if not entity:
+            return
+        
+        remove_modifiers(entity, "sect")
         bonus = sect.get("bonus", {})
         if "health_regen" in bonus:
-            character.max_health = int(100 * bonus["health_regen"])
+            add_modifier(entity, "max_health", "sect", bonus["health_regen"] - 1, PERCENT)
         if "mana_regen" in bonus:
-            character.max_mana = int(50 * bonus["mana_regen"])
+            add_modifier(entity, "max_mana", "sect", bonus["mana_regen"] - 1, PERCENT)
     
     def get_sect_skills(self, sect_id):
         if not sect_id or sect_id not in self.sects_data["sects"]:
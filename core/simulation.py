@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+无界面快进模拟 - 不依赖Qt，按日推进游戏世界，用于数值平衡与吞吐量测试
+
+用法: python -m core.simulation --years 10 [--seed 42]
+"""
+
+import argparse
+import random
+import time
+from typing import Any, Dict
+from .events import event_bus
+from .game import Game
+from .game_engine import game_engine
+from .world_manager import world_manager
+
+class HeadlessSimulation:
+    """无界面模拟 - 构建完整世界后以CPU允许的最快速度推进时间"""
+
+    # 只供界面显示的事件，模拟期间静默
+    UI_EVENTS = ("message",)
+
+    def __init__(self, character_data: Dict[str, Any] = None, seed: int = None):
+        if seed is not None:
+            random.seed(seed)
+        with event_bus.suppress(*self.UI_EVENTS):
+            self.game = Game(character_data or Game.default_character_data())
+        self.engine = game_engine
+        self.world = world_manager
+        # 快进时按一倍速逐帧推进，每帧恰好一天
+        self.engine.game_speed = 1.0
+        self.days_simulated = 0
+        self.elapsed_seconds = 0.0
+
+    def advance_days(self, days: int) -> Dict[str, Any]:
+        """推进指定天数，返回本次运行统计"""
+        start = time.perf_counter()
+        with event_bus.suppress(*self.UI_EVENTS):
+            for _ in range(days):
+                self.engine.step(self.engine.day_duration)
+        elapsed = time.perf_counter() - start
+
+        self.days_simulated += days
+        self.elapsed_seconds += elapsed
+        return {
+            "days": days,
+            "seconds": elapsed,
+            "days_per_second": days / elapsed if elapsed > 0 else float("inf"),
+            "time": self.engine.get_current_time_info(),
+            "day_cost": self.engine.get_day_cost_info(),
+        }
+
+    def advance_months(self, months: int) -> Dict[str, Any]:
+        """推进指定月数（每月30天）"""
+        return self.advance_days(months * 30)
+
+    def advance_years(self, years: int) -> Dict[str, Any]:
+        """推进指定年数（每年12个月）"""
+        return self.advance_months(years * 12)
+
+def main():
+    parser = argparse.ArgumentParser(description="无界面快进模拟")
+    parser.add_argument("--days", type=int, default=0, help="推进天数")
+    parser.add_argument("--months", type=int, default=0, help="推进月数")
+    parser.add_argument("--years", type=int, default=0, help="推进年数")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    parser.add_argument("--profile", default=None, help="导出事件分发统计（.json/.csv）")
+    args = parser.parse_args()
+
+    days = args.days + args.months * 30 + args.years * 360
+    simulation = HeadlessSimulation(seed=args.seed)
+    if args.profile:
+        event_bus.enable_profiling()
+    stats = simulation.advance_days(days or 360)
+
+    time_info = stats["time"]
+    print(f"=== 模拟完成: {stats['days']} 天 ===")
+    print(f"游戏时间: 第{time_info['year']}年 第{time_info['month']}月 第{time_info['day']}天")
+    print(f"耗时: {stats['seconds']:.2f} 秒  ({stats['days_per_second']:.0f} 天/秒)")
+    print(f"每日处理: 平均 {stats['day_cost']['average'] * 1000:.3f} 毫秒")
+    print(f"存活实体: {len(simulation.world.entity_manager.entities)}")
+
+    if args.profile:
+        event_bus.disable_profiling().dump(args.profile)
+        print(f"事件统计已导出: {args.profile}")
+
+if __name__ == "__main__":
+    main()
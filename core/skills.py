@@ -1,27 +1,41 @@
-import json
+from bisect import bisect_right
 from .events import event_bus
+from .content import content_registry
 
 class SkillManager:
+    """技能管理器
+
+    技能目录（基础技能与门派技能合并而成）首次使用时建立一次，同时按修为需求排序，
+    查询可学技能只需一次二分查找；已学技能的攻击加成在学习时累加。
+    """
+
     def __init__(self):
-        with open("data/skills.json", "r", encoding="utf-8") as f:
-            self.skills_data = json.load(f)
+        self.skills_data = content_registry.get("skills.json")
         self.learned_skills = []
+        self._learned = set()
+        # 技能ID -> 技能数据
+        self._catalog = None
+        # 按修为需求升序排列的需求值与对应技能ID
+        self._requirements = []
+        self._by_requirement = []
+        # 已学技能的 [物理攻击, 法术攻击]，None表示需要重新累计
+        self._attack = [0, 0]
+        event_bus.subscribe("data_reloaded", self._handle_data_reloaded)
         
     def get_available_skills(self, character_power):
-        available = []
+        """修为足够且尚未学会的技能（按修为需求升序）"""
         all_skills = self._get_all_skills()
-        
-        for skill_id, skill in all_skills.items():
-            if (skill_id not in self.learned_skills and 
-                character_power >= skill.get("power_requirement", 0)):
-                available.append((skill_id, skill))
-        return available
+        end = bisect_right(self._requirements, character_power)
+        return [(skill_id, all_skills[skill_id]) for skill_id in self._by_requirement[:end]
+                if skill_id not in self._learned]
     
     def learn_skill(self, skill_id):
-        if skill_id not in self.learned_skills:
+        if skill_id not in self._learned:
             self.learned_skills.append(skill_id)
-            all_skills = self._get_all_skills()
-            skill = all_skills.get(skill_id, {})
+            self._learned.add(skill_id)
+            skill = self._get_all_skills().get(skill_id, {})
+            if self._attack is not None:
+                self._add_attack(self._attack, skill)
             event_bus.emit("skill_learned", {"id": skill_id, "skill": skill})
             return True
         return False
@@ -36,22 +50,28 @@ class SkillManager:
         return result
         
     def get_total_attack_power(self):
-        physical_attack = 0
-        spell_attack = 0
-        all_skills = self._get_all_skills()
-        
-        for skill_id in self.learned_skills:
-            if skill_id in all_skills:
-                skill = all_skills[skill_id]
-                if skill.get("type") == "physical":
-                    physical_attack += skill.get("physical_attack", 0)
-                elif skill.get("type") == "spell":
-                    spell_attack += skill.get("spell_attack", 0)
-                    
-        return physical_attack, spell_attack
+        """已学技能的 (物理攻击, 法术攻击) 之和"""
+        if self._attack is None:
+            attack = [0, 0]
+            all_skills = self._get_all_skills()
+            for skill_id in self.learned_skills:
+                if skill_id in all_skills:
+                    self._add_attack(attack, all_skills[skill_id])
+            self._attack = attack
+        return self._attack[0], self._attack[1]
+
+    @staticmethod
+    def _add_attack(attack, skill):
+        if skill.get("type") == "physical":
+            attack[0] += skill.get("physical_attack", 0)
+        elif skill.get("type") == "spell":
+            attack[1] += skill.get("spell_attack", 0)
     
     def _get_all_skills(self):
-        """获取所有技能数据"""
+        """获取所有技能数据（共享的只读目录，不应修改）"""
+        if self._catalog is not None:
+            return self._catalog
+
         all_skills = {}
         
         # 加载基础技能
@@ -67,11 +87,21 @@ class SkillManager:
             all_skills.update(self.skills_data["spells"])
         
         # 加载门派技能
-        try:
-            with open("data/sects.json", "r", encoding="utf-8") as f:
-                sects_data = json.load(f)
-                all_skills.update(sects_data.get("sect_skills", {}))
-        except:
-            pass
-            
-        return all_skills
\ No newline at end of file
+        all_skills.update(content_registry.section("sects.json", "sect_skills"))
+
+        ordered = sorted(all_skills, key=lambda skill_id: all_skills[skill_id].get("power_requirement", 0))
+        self._requirements = [all_skills[skill_id].get("power_requirement", 0) for skill_id in ordered]
+        self._by_requirement = ordered
+        self._catalog = all_skills
+        return all_skills
+
+    def _handle_data_reloaded(self, event_data):
+        """只有技能或门派数据变化时才丢弃技能目录"""
+        if {"skills.json", "sects.json"} & set(event_data["files"]):
+            self.invalidate()
+
+    def invalidate(self):
+        """技能数据变化后丢弃目录，下次使用时重建并重新累计攻击加成"""
+        self.skills_data = content_registry.get("skills.json")
+        self._catalog = None
+        self._attack = None
@@ -1,6 +1,7 @@
 import time
 from typing import List
-from .ecs.entity import EntityManager
+from .ecs.entity import EntityManager, ATTRIBUTE_COMPONENT
+from .ecs.attribute_store import AttributeArrays
 from .ecs.systems import System, AttributeSystem, StateSystem, CombatSystem, InventorySystem
 from .ecs.components import AttributeComponent, SkillComponent, StateComponent, InventoryComponent, EquipmentComponent
 from .events import event_bus
@@ -19,15 +20,19 @@ from .modules.attribute_system import AttributeEffectSystem
 class WorldManager:
     """游戏世界管理器 - 管理ECS和游戏主循环"""
     
-    def __init__(self):
-        self.entity_manager = EntityManager()
+    LIFESPAN_WARNING_YEARS = 10
+    
+    def __init__(self, attribute_arrays: bool = None):
+        # attribute_arrays为None时，安装了numpy即启用属性结构数组模式
+        if attribute_arrays is None:
+            attribute_arrays = AttributeArrays.available()
+        self.entity_manager = EntityManager(attribute_arrays=attribute_arrays)
+        self.attribute_query = self.entity_manager.query("AttributeComponent")
         self.systems: List[System] = []
         self.running = False
         self.last_update_time = time.time()
-        self.game_time = 0.0
-        self.day_length = 60.0  # 一天60秒
+        # 日期由游戏引擎的模拟时钟统一推进，见 process_day
         self.current_day = 1
-        self.month_length = 30.0 * 60.0  # 一月30天，每天60秒
         
         self._initialize_systems()
         self._initialize_modules()
@@ -60,14 +65,14 @@ class WorldManager:
         self.martial_system = MartialSystem()
         self.combat_strategy = CombatStrategy()
         self.auto_combat_system = AutoCombatSystem()
-        self.attribute_system = AttributeEffectSystem()
+        self.attribute_system = AttributeEffectSystem(self.entity_manager)
     
     def _setup_event_handlers(self):
         """设置事件处理器"""
         event_bus.subscribe("spell_cast", self._handle_spell_cast)
         event_bus.subscribe("item_used", self._handle_item_used)
     
-    def create_player_entity(self) -> str:
+    def create_player_entity(self) -> int:
         """创建玩家实体"""
         entity = self.entity_manager.create_entity()
         
@@ -101,25 +106,13 @@ class WorldManager:
         
         return entity.id
     
-    def update(self):
-        """更新游戏世界"""
+    def update(self, delta_time: float = None):
+        """更新游戏世界（delta_time为None时按系统时钟计算）"""
         current_time = time.time()
-        delta_time = current_time - self.last_update_time
+        if delta_time is None:
+            delta_time = current_time - self.last_update_time
         self.last_update_time = current_time
         
-        # 更新游戏时间
-        self.game_time += delta_time
-        new_day = int(self.game_time / self.day_length) + 1
-        
-        if new_day > self.current_day:
-            self.current_day = new_day
-            event_bus.emit("day_changed", self.current_day)
-            self._process_daily_events()
-            
-            # 检查是否进入新月
-            if self.current_day % 30 == 1:
-                self.time_system.advance_month()
-        
         # 更新所有系统
         for system in self.systems:
             system.update(delta_time)
@@ -127,22 +120,41 @@ class WorldManager:
         # 模块不需要更新，它们通过事件响应
         # NPC系统会自动响应day_changed事件
     
+    def process_day(self, day: int):
+        """新的一天（由游戏引擎的模拟时钟在发出day_changed后调用）"""
+        self.current_day = day
+        self._process_daily_events()
+    
     def _process_daily_events(self):
         """处理每日事件"""
         # 角色老化（每30天老化一次）
         if self.current_day % 30 == 0:
-            entities = self.entity_manager.get_entities_with_components("AttributeComponent")
-            for entity in entities:
-                attr = entity.get_component("AttributeComponent")
-                attr.age += 1
-                
-                # 检查寿命（给予更多缓冲）
-                if attr.age >= attr.lifespan - 10:
-                    if attr.age >= attr.lifespan:
-                        event_bus.emit("character_death", {"entity_id": entity.id})
-                    else:
-                        remaining_years = attr.lifespan - attr.age
-                        event_bus.emit("message", f"你感到寿命将尽，还剩 {remaining_years} 年寿命")
+            self._age_entities()
+    
+    def _age_entities(self):
+        """所有角色增龄一岁并检查寿命（给予更多缓冲）"""
+        arrays = self.entity_manager.attribute_arrays
+        if arrays is not None:
+            # 属性数组模式下增龄与寿命检查各是一次整列运算
+            expired, warning = arrays.advance_age(1, self.LIFESPAN_WARNING_YEARS)
+            for entity in expired:
+                event_bus.emit("character_death", {"entity_id": entity.id})
+            for entity in warning:
+                attr = entity.get_component_by_id(ATTRIBUTE_COMPONENT)
+                remaining_years = attr.lifespan - attr.age
+                event_bus.emit("message", f"你感到寿命将尽，还剩 {remaining_years} 年寿命")
+            return
+        
+        for entity in self.attribute_query:
+            attr = entity.get_component_by_id(ATTRIBUTE_COMPONENT)
+            attr.age += 1
+            
+            if attr.age >= attr.lifespan - self.LIFESPAN_WARNING_YEARS:
+                if attr.age >= attr.lifespan:
+                    event_bus.emit("character_death", {"entity_id": entity.id})
+                else:
+                    remaining_years = attr.lifespan - attr.age
+                    event_bus.emit("message", f"你感到寿命将尽，还剩 {remaining_years} 年寿命")
     
     def _handle_spell_cast(self, event_data):
         """处理施法事件"""
@@ -164,7 +176,7 @@ class WorldManager:
         """处理物品使用事件"""
         pass
     
-    def get_entity(self, entity_id: str):
+    def get_entity(self, entity_id: int):
         """获取实体"""
         return self.entity_manager.get_entity(entity_id)
     
@@ -172,27 +184,24 @@ class WorldManager:
         """创建新实体"""
         return self.entity_manager.create_entity().id
     
-    def add_component(self, entity_id: str, component):
+    def add_component(self, entity_id: int, component):
         """为实体添加组件"""
         entity = self.entity_manager.get_entity(entity_id)
         if entity:
-            component_name = component.__class__.__name__
-            entity.add_component(component_name, component)
+            entity.add_component(component.__class__, component)
     
-    def has_component(self, entity_id: str, component_class):
+    def has_component(self, entity_id: int, component_class):
         """检查实体是否有指定组件"""
         entity = self.entity_manager.get_entity(entity_id)
         if entity:
-            component_name = component_class.__name__
-            return entity.has_component(component_name)
+            return entity.has_component(component_class)
         return False
     
-    def get_component(self, entity_id: str, component_class):
+    def get_component(self, entity_id: int, component_class):
         """获取实体的指定组件"""
         entity = self.entity_manager.get_entity(entity_id)
         if entity:
-            component_name = component_class.__name__
-            return entity.get_component(component_name)
+            return entity.get_component(component_class)
         return None
     
     def start(self):
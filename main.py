@@ -1,11 +1,16 @@
 import sys
 from PySide6.QtWidgets import QApplication
 from core.game import Game
+from core.game_engine import game_engine
 from ui.main_window import MainWindow
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     game = Game()
-    window = MainWindow(game)
+    # --hot-reload: 每秒检查 data/*.json，修改后无需重启即可生效
+    if "--hot-reload" in sys.argv:
+        game_engine.data_reload_interval = 1.0
+    # --threaded: 模拟在后台线程运行，界面通过事件桥接收事件
+    window = MainWindow(game, threaded_simulation="--threaded" in sys.argv)
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
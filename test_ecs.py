@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+ECS存储测试脚本 - 不依赖GUI
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.ecs.entity import EntityManager, format_entity_id, parse_entity_id
+from core.ecs.components import (AttributeComponent, SkillComponent, StateComponent, InventoryComponent,
+                                 EquipmentComponent, PositionComponent, ModifierComponent)
+from core.ecs.attribute_store import AttributeArrays
+from core.ecs.systems import AttributeSystem
+from core.ecs.registry import component_registry
+from core.ecs.modifiers import (add_modifier, remove_modifiers, get_modifiers, base_value,
+                                set_base_value, PERCENT, OVERRIDE)
+
+def test_archetype_storage():
+    """测试原型表存储"""
+    print("=== 测试原型表存储 ===")
+
+    manager = EntityManager()
+    npc = manager.create_entity()
+    npc.add_component("AttributeComponent", AttributeComponent())
+    npc.add_component("StateComponent", StateComponent())
+
+    player = manager.create_entity()
+    player.add_component("AttributeComponent", AttributeComponent(health=50))
+    player.add_component("SkillComponent", SkillComponent())
+    player.add_component("StateComponent", StateComponent())
+
+    # 组件组合相同的实体落在同一张表
+    assert npc._archetype is not player._archetype
+    assert player.get_component("AttributeComponent").health == 50
+
+    both = manager.get_entities_with_components("AttributeComponent", "StateComponent")
+    assert {e.id for e in both} == {npc.id, player.id}
+    skilled = manager.get_entities_with_components("SkillComponent")
+    assert [e.id for e in skilled] == [player.id]
+
+    # 移除组件后迁移到新表，组件保持不变
+    attr = player.get_component("AttributeComponent")
+    player.remove_component("SkillComponent")
+    assert player._archetype is npc._archetype
+    assert player.get_component("AttributeComponent") is attr
+    assert not player.has_component("SkillComponent")
+
+    # 非活跃实体不参与查询
+    npc.active = False
+    both = manager.get_entities_with_components("AttributeComponent", "StateComponent")
+    assert [e.id for e in both] == [player.id]
+
+    # 销毁实体后末行补位
+    manager.destroy_entity(npc.id)
+    assert player.get_component("AttributeComponent") is attr
+    assert npc.get_component("AttributeComponent") is None
+    print(f"原型表数量: {len(manager.archetypes)}")
+
+def test_query_views():
+    """测试增量维护的查询视图"""
+    print("\n=== 测试查询视图 ===")
+
+    manager = EntityManager()
+    query = manager.query("AttributeComponent", "StateComponent")
+    assert manager.query("StateComponent", "AttributeComponent") is query
+    assert len(query) == 0
+
+    entity = manager.create_entity()
+    entity.add_component("AttributeComponent", AttributeComponent())
+    assert len(query) == 0
+    entity.add_component("StateComponent", StateComponent())
+    assert [e.id for e in query] == [entity.id]
+
+    # 实体集合不变时直接复用缓存结果
+    cached = query.entities
+    entity.get_component("AttributeComponent").health -= 10
+    assert query.entities is cached
+
+    entity.active = False
+    assert len(query) == 0
+    entity.active = True
+    assert len(query) == 1
+
+    entity.remove_component("StateComponent")
+    assert len(query) == 0
+    entity.add_component("StateComponent", StateComponent())
+    manager.destroy_entity(entity.id)
+    assert len(query) == 0
+    print(f"已注册查询: {len(manager.queries)}")
+
+def test_attribute_arrays():
+    """测试属性结构数组模式"""
+    print("\n=== 测试属性结构数组 ===")
+    if not AttributeArrays.available():
+        print("未安装numpy，跳过")
+        return
+
+    manager = EntityManager(attribute_arrays=True)
+    wounded = manager.create_entity()
+    wounded.add_component("AttributeComponent", AttributeComponent(health=50, mana=49, age=69, lifespan=70))
+    healthy = manager.create_entity()
+    healthy.add_component("AttributeComponent", AttributeComponent(age=59, lifespan=70))
+
+    # 组件作为数组视图，读写直接落到数组
+    attr = wounded.get_component("AttributeComponent")
+    attr.health -= 10
+    assert manager.attribute_arrays.columns["health"][attr._row] == 40
+
+    AttributeSystem(manager).update(0.1)
+    assert attr.health == 41 and attr.mana == 50
+    assert healthy.get_component("AttributeComponent").health == 100
+
+    expired, warning = manager.attribute_arrays.advance_age(1, 10)
+    assert [e.id for e in expired] == [wounded.id]
+    assert [e.id for e in warning] == [healthy.id]
+
+    # 非活跃实体不参与整列运算
+    healthy.active = False
+    manager.attribute_arrays.advance_age(1, 10)
+    assert healthy.get_component("AttributeComponent").age == 60
+
+    # 销毁后组件恢复为普通对象，所在行不再参与整列运算
+    manager.destroy_entity(wounded.id)
+    assert attr._store is None and attr.age == 71
+    assert healthy.get_component("AttributeComponent")._row == healthy.index
+    assert not manager.attribute_arrays.active[wounded.index]
+    print(f"数组行数: {manager.attribute_arrays.size}")
+
+def test_slotted_components():
+    """测试组件的槽位布局"""
+    print("\n=== 测试组件槽位 ===")
+    for component_type in (AttributeComponent, SkillComponent, StateComponent, InventoryComponent,
+                           EquipmentComponent, PositionComponent, ModifierComponent):
+        component = component_type()
+        assert not hasattr(component, "__dict__"), component_type.__name__
+        try:
+            component.undeclared = 1
+            assert False, f"{component_type.__name__} 不应接受未声明的属性"
+        except AttributeError:
+            pass
+
+    # 未绑定时数组字段存放在私有槽位
+    attr = AttributeComponent(health=37, age=20)
+    assert attr.health == 37 and attr._health == 37 and attr.max_health == 100
+    if not AttributeArrays.available():
+        print("未安装numpy，跳过绑定检查")
+        return
+
+    # 绑定后读写数组，解绑时数组中的值写回组件
+    manager = EntityManager(attribute_arrays=True)
+    entity = manager.create_entity()
+    entity.add_component(AttributeComponent, attr)
+    assert attr._store is not None and attr.health == 37 and attr.age == 20
+    attr.health = 45
+    attr.constitution = 8
+    assert manager.attribute_arrays.columns["health"][attr._row] == 45
+    entity.remove_component(AttributeComponent)
+    assert attr._store is None
+    assert (attr.health, attr.age, attr.constitution, attr.max_health) == (45, 20, 8, 100)
+    print(f"槽位: {len(AttributeComponent.__slots__)}")
+
+def test_generational_handles():
+    """测试世代句柄"""
+    print("\n=== 测试世代句柄 ===")
+
+    manager = EntityManager()
+    first = manager.create_entity()
+    handle = first.id
+    assert manager.get_entity(handle) is first
+
+    # 销毁后槽位复用，旧句柄失效
+    manager.destroy_entity(handle)
+    second = manager.create_entity()
+    assert second.index == first.index and second.id != handle
+    assert manager.get_entity(handle) is None
+    assert not manager.is_alive(handle)
+    assert not manager.destroy_entity(handle)
+
+    # 字符串ID适配
+    text_id = format_entity_id(second.id)
+    assert parse_entity_id(text_id) == second.id
+    assert manager.get_entity(text_id) is second
+    print(f"句柄: {second.id} -> {text_id}")
+
+def test_component_registry():
+    """测试组件类型注册表"""
+    print("\n=== 测试组件类型注册表 ===")
+
+    # 组件类与组件名共用同一个类型ID
+    attr_id = component_registry.type_id(AttributeComponent)
+    assert component_registry.type_id("AttributeComponent") == attr_id
+    assert component_registry.mask(AttributeComponent, "StateComponent") == \
+        component_registry.bit(AttributeComponent) | component_registry.bit(StateComponent)
+
+    manager = EntityManager()
+    entity = manager.create_entity()
+    entity.add_component(AttributeComponent, AttributeComponent(health=30))
+    entity.add_component("StateComponent", StateComponent())
+
+    # 按类、按名、按ID访问同一个组件
+    attr = entity.get_component("AttributeComponent")
+    assert entity.get_component(AttributeComponent) is attr
+    assert entity.get_component_by_id(attr_id) is attr
+    assert entity.has_component(StateComponent)
+    assert entity.has_components(component_registry.mask(AttributeComponent, StateComponent))
+    assert not entity.has_component(SkillComponent)
+    assert manager.query(AttributeComponent, "StateComponent") is manager.query("AttributeComponent", StateComponent)
+    assert set(entity.components) == {"AttributeComponent", "StateComponent"}
+
+    # 未注册过的组件类型查询不会分配新ID
+    count = len(component_registry.names)
+    assert entity.get_component("UnknownComponent") is None
+    assert not entity.has_component("UnknownComponent")
+    assert len(component_registry.names) == count
+    print(f"已注册组件类型: {component_registry.names}")
+
+def test_component_versions():
+    """测试组件版本戳"""
+    print("\n=== 测试组件版本戳 ===")
+    manager = EntityManager()
+    entity = manager.create_entity()
+    entity.add_component(AttributeComponent, AttributeComponent())
+    entity.add_component(SkillComponent, SkillComponent())
+    attr = entity.get_component(AttributeComponent)
+    skills = entity.get_component(SkillComponent)
+
+    # 字段赋值刷新版本，读取不改变版本
+    seen = attr.version
+    assert attr.health == 100 and attr.version == seen
+    attr.health -= 10
+    assert attr.version > seen
+
+    # 容器原地修改需显式 touch
+    seen = entity.version
+    skills.learned_gongfa.append("basic_sword")
+    assert entity.version == seen
+    skills.touch()
+    assert entity.version > seen
+
+    # 增删组件刷新实体版本
+    seen = entity.version
+    entity.add_component(StateComponent, StateComponent())
+    assert entity.version > seen
+
+    if AttributeArrays.available():
+        # 整列运算只刷新被修改的行
+        manager.enable_attribute_arrays()
+        full = manager.create_entity()
+        full.add_component(AttributeComponent, AttributeComponent())
+        full_attr = full.get_component(AttributeComponent)
+        seen, full_seen = attr.version, full_attr.version
+        manager.attribute_arrays.regenerate(1, 1)
+        assert attr.version > seen and full_attr.version == full_seen
+        manager.attribute_arrays.advance_age(1, 10)
+        assert full_attr.version > full_seen
+    print(f"实体版本: {entity.version}")
+
+def test_dirty_sets():
+    """测试组件变更集合"""
+    print("\n=== 测试组件变更集合 ===")
+    manager = EntityManager()
+    first = manager.create_entity()
+    first.add_component(AttributeComponent, AttributeComponent())
+    second = manager.create_entity()
+    second.add_component(AttributeComponent, AttributeComponent())
+    second.add_component(SkillComponent, SkillComponent())
+
+    # 每个使用方各持一份变更集合
+    attr_changes = manager.track_changes(AttributeComponent)
+    snapshot_changes = manager.track_changes("AttributeComponent")
+    skill_changes = manager.track_changes(SkillComponent)
+    assert not attr_changes
+
+    first.get_component(AttributeComponent).health -= 5
+    assert set(attr_changes) == {first} and set(snapshot_changes) == {first}
+    assert attr_changes.drain() == [first]
+    assert not attr_changes and first in snapshot_changes
+
+    # 容器字段原地修改需显式标记；增删组件也记为变更
+    skills = second.get_component(SkillComponent)
+    skills.learned_spells.append("spirit_missile")
+    assert not skill_changes
+    skills.touch()
+    assert second in skill_changes
+    skill_changes.clear()
+    manager.mark_dirty(second.id, SkillComponent)
+    assert second in skill_changes
+    first.add_component(SkillComponent, SkillComponent())
+    assert first in skill_changes
+
+    # 移除后的组件不再属于实体，销毁的实体移出集合
+    removed = second.get_component(SkillComponent)
+    second.remove_component(SkillComponent)
+    skill_changes.clear()
+    removed.learned_spells = []
+    assert not skill_changes
+    manager.destroy_entity(first.id)
+    assert first not in snapshot_changes and first not in skill_changes
+
+    # 停止记录后不再收到变更
+    attr_changes.close()
+    second.get_component(AttributeComponent).health -= 5
+    assert not attr_changes and second in snapshot_changes
+
+    if AttributeArrays.available():
+        # 整列运算修改的行同样记入变更集合
+        manager.enable_attribute_arrays()
+        snapshot_changes.clear()
+        manager.attribute_arrays.regenerate(1, 1)
+        assert set(snapshot_changes) == {second}
+    print(f"变更实体数: {len(snapshot_changes)}")
+
+def test_modifier_stacks():
+    """测试属性修正栈"""
+    print("\n=== 测试属性修正栈 ===")
+    manager = EntityManager()
+    entity = manager.create_entity()
+    entity.add_component(AttributeComponent, AttributeComponent(max_health=100, health=80, physical_attack=10))
+    attr = entity.get_component(AttributeComponent)
+
+    # 固定值与百分比修正叠加，上限提高时当前生命同步增加
+    add_modifier(entity, "max_health", "martial:basic_external", 20)
+    add_modifier(entity, "max_health", "realm", 0.5, PERCENT)
+    assert attr.max_health == 180 and attr.health == 160
+
+    # 同一来源重复应用只替换，不会叠加
+    add_modifier(entity, "max_health", "martial:basic_external", 20)
+    assert attr.max_health == 180 and len(get_modifiers(entity, "max_health")) == 2
+
+    # 其他代码的直接修改计入基础值，移除修正后得以保留
+    attr.max_health += 10
+    assert base_value(entity, "max_health") == 110
+    assert remove_modifiers(entity, "realm") == ["max_health"]
+    assert attr.max_health == 130 and attr.health == 130
+    remove_modifiers(entity, "martial:basic_external")
+    assert attr.max_health == 110 and attr.health == 110
+
+    # 覆盖修正与基础值设置
+    add_modifier(entity, "physical_attack", "martial:basic_external", 5)
+    set_base_value(entity, "physical_attack", 20)
+    assert attr.physical_attack == 25
+    add_modifier(entity, "physical_attack", "buff:petrified", 0, OVERRIDE)
+    assert attr.physical_attack == 0
+    remove_modifiers(entity, "buff:petrified")
+    assert attr.physical_attack == 25 and base_value(entity, "physical_attack") == 20
+    print(f"生命上限: {attr.max_health}, 物理攻击: {attr.physical_attack}")
+
+def test_regeneration_timing():
+    """测试回复量按经过的时间计算"""
+    print("\n=== 测试回复节奏 ===")
+    manager = EntityManager()
+    entity = manager.create_entity()
+    entity.add_component(AttributeComponent, AttributeComponent(health=10, max_health=1000, mana=0, max_mana=50))
+    attr = entity.get_component(AttributeComponent)
+    system = AttributeSystem(manager)
+
+    # 界面逐帧推进：不足一个周期的时间累积到下一帧
+    system.update(0.05)
+    assert attr.health == 10
+    system.update(0.05)
+    assert attr.health == 11 and attr.mana == 2
+
+    # 一帧推进一整天与逐帧推进的回复量相同（不超过上限）
+    system.update(60.0)
+    assert attr.health == 611 and attr.mana == 50
+    print(f"生命: {attr.health}, 法力: {attr.mana}")
+
+if __name__ == "__main__":
+    test_archetype_storage()
+    test_query_views()
+    test_attribute_arrays()
+    test_slotted_components()
+    test_generational_handles()
+    test_component_registry()
+    test_component_versions()
+    test_dirty_sets()
+    test_modifier_stacks()
+    test_regeneration_timing()
+    print("\n=== 所有测试完成 ===")
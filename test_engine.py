@@ -0,0 +1,719 @@
+#!/usr/bin/env python3
+"""
+游戏引擎测试脚本 - 不依赖GUI
+"""
+
+import sys
+import os
+import gc
+import json
+import tempfile
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.scheduler import EventScheduler
+from core.events import event_bus, EventBus
+from core.game_engine import GameEngine
+from core.world_manager import world_manager
+from core.simulation import HeadlessSimulation
+from core.event_relay import EventRelay
+from core.message_log import Message, MessageLog
+from core.ecs.components import AttributeComponent
+from core.ecs.entity import EntityManager
+from core.ecs.modifiers import PERCENT, add_modifier, get_modifiers
+from core.modules.attribute_system import AttributeEffectSystem, DerivedStatGraph, DERIVED_STATS
+from core.data_manager import DataManager, DataSpec
+from core.data_catalog import DataCatalog, CatalogError, compile_catalog
+from core.content import ContentRegistry, content_registry
+from core.sects import SectManager
+from core.skills import SkillManager
+from core.modules.taiwu_system import StanceSystem, RegionSystem
+
+def test_event_scheduler():
+    """测试事件调度器"""
+    print("=== 测试事件调度器 ===")
+
+    scheduler = EventScheduler()
+    late = scheduler.schedule(30.0, "late")
+    early = scheduler.schedule(10.0, "early", {"value": 1})
+    same_time = scheduler.schedule(10.0, "same_time")
+    cancelled = scheduler.schedule(5.0, "cancelled")
+    assert len(scheduler) == 4
+
+    # 未到期时不触发任何事件
+    assert scheduler.pop_due(1.0) == []
+
+    # 取消后不再触发，重复取消返回False
+    assert cancelled.cancel()
+    assert not cancelled.cancel()
+    assert len(scheduler) == 3
+    assert scheduler.next_time() == 10.0
+
+    # 同一时间按调度先后触发
+    due = scheduler.pop_due(10.0)
+    assert [event.event_type for event in due] == ["early", "same_time"]
+    assert due[0].data == {"value": 1}
+    assert not early.pending
+
+    # 改期后按新时间触发
+    late.reschedule(15.0)
+    assert [event.event_type for event in scheduler.pop_due(20.0)] == ["late"]
+    assert scheduler.pop_due(100.0) == []
+    assert len(scheduler) == 0
+
+    # 已触发的事件可以重新调度
+    same_time.reschedule(120.0)
+    assert [event.event_type for event in scheduler.pop_due(120.0)] == ["same_time"]
+
+    # 大量取消后堆会被压缩
+    handles = [scheduler.schedule(float(i), "npc_timer") for i in range(1000)]
+    for handle in handles[:900]:
+        handle.cancel()
+    assert len(scheduler) == 100
+    assert len(scheduler._heap) <= 2 * len(scheduler)
+    assert len(scheduler.pop_due(1000.0)) == 100
+    print(f"剩余调度事件: {len(scheduler)}")
+
+def test_headless_simulation():
+    """测试无界面快进模拟"""
+    print("\n=== 测试无界面快进 ===")
+
+    messages = []
+    event_bus.subscribe("message", messages.append)
+
+    simulation = HeadlessSimulation(seed=7)
+    start_day = simulation.engine.current_day
+    stats = simulation.advance_months(2)
+
+    # 逐日推进且界面消息被静默
+    assert stats["days"] == 60
+    assert simulation.engine.current_day == start_day + 60
+    assert messages == []
+
+    # 每天只发出一次day_changed，世界管理器随引擎时钟推进
+    days = []
+    event_bus.subscribe("day_changed", days.append)
+    simulation.advance_days(3)
+    assert [data["new_day"] for data in days] == [start_day + 61, start_day + 62, start_day + 63]
+    assert simulation.world.current_day == simulation.engine.current_day
+    assert simulation.engine.get_day_cost_info()["days"] >= 63
+
+    # 延迟分发的事件在每帧末分发
+    handled = []
+    event_bus.subscribe("simulation_probe", handled.append)
+    event_bus.defer("simulation_probe")
+    try:
+        event_bus.emit("simulation_probe", 1)
+        assert handled == []
+        simulation.advance_days(1)
+        assert handled == [1]
+    finally:
+        event_bus.undefer("simulation_probe")
+
+    # 模拟结束后消息恢复正常
+    event_bus.emit("message", "模拟结束")
+    assert messages == ["模拟结束"]
+    print(f"快进速度: {stats['days_per_second']:.0f} 天/秒")
+
+def test_player_attribute_snapshots():
+    """测试帧末发布的玩家属性快照"""
+    print("\n=== 测试玩家属性快照 ===")
+
+    simulation = HeadlessSimulation(seed=3)
+    game, engine = simulation.game, simulation.engine
+    frames, snapshots = [], []
+    frame_subscription = event_bus.subscribe("frame_finished", frames.append)
+    subscription = event_bus.subscribe("player_attributes", snapshots.append)
+    try:
+        # 引擎每帧末（包括暂停时）发出 frame_finished
+        engine.pause_game(True)
+        engine.update()
+        assert frames == [engine.current_day]
+        engine.pause_game(False)
+
+        # 只有属性组件版本变化时才发布新的快照
+        game._publish_player_attributes(engine.current_day)
+        assert len(snapshots) == 1 and snapshots[0] == game.player_attributes()
+        game._publish_player_attributes(engine.current_day)
+        assert len(snapshots) == 1
+        attr = world_manager.get_component(game.player_entity_id, "AttributeComponent")
+        attr.health -= 1
+        game._publish_player_attributes(engine.current_day)
+        assert len(snapshots) == 2 and snapshots[-1]["health"] == attr.health
+    finally:
+        frame_subscription.unsubscribe()
+        subscription.unsubscribe()
+    print(f"快照: {snapshots[-1]}")
+
+def test_catch_up_simulation():
+    """测试定步长模拟时钟的补跑"""
+    print("\n=== 测试定步长补跑 ===")
+
+    # 日期事件会驱动各模块，需要先创建玩家
+    world_manager.player_entity_id = world_manager.create_player_entity()
+    engine = GameEngine()
+    engine.max_catch_up_days = 40
+    days, months, years, daily_cycles, monthly_cycles = [], [], [], [], []
+    batches = []
+    handlers = {
+        "day_changed": lambda data: days.append(data["new_day"]),
+        "month_changed": lambda data: months.append(data["total_months"]),
+        "year_changed": lambda data: years.append((data["old_year"], data["new_year"])),
+        "daily_cycle": lambda data: daily_cycles.append(data["day"]),
+        "monthly_cycle": lambda data: monthly_cycles.append(data["month"]),
+        "time_catch_up": batches.append,
+    }
+    for event_type, handler in handlers.items():
+        event_bus.subscribe(event_type, handler)
+
+    # 10倍速下一帧跨过100天：每帧补跑40天，其余留到后续帧
+    engine.game_speed = 10.0
+    engine._update_time(engine.day_duration * 10)
+    assert days == list(range(2, 42))
+    assert batches[-1]["remaining_days"] == 60
+    engine._update_time(0)
+    engine._update_time(0)
+    assert days == list(range(2, 102))
+    assert daily_cycles == list(range(2, 102))
+    assert months == [2, 3, 4]
+    assert monthly_cycles == [2, 3, 4]
+
+    # 跨年时年份变化携带正确的旧年份
+    engine.max_catch_up_days = 1000
+    engine.game_speed = 1.0
+    engine._update_time(engine.month_duration * 12)
+    assert years == [(1, 2)]
+    assert engine.current_day == 461 and engine.current_month == 4
+    print(f"模拟到: 第{engine.current_year}年 第{engine.current_month}月 第{engine.current_day}天")
+
+def test_deferred_events():
+    """测试延迟分发与合并"""
+    print("\n=== 测试延迟事件队列 ===")
+
+    bus = EventBus()
+    received = []
+    bus.subscribe("character_updated", lambda data: received.append(("character_updated", data)))
+    bus.subscribe("message", lambda data: received.append(("message", data)))
+    bus.subscribe("day_changed", lambda data: received.append(("day_changed", data)))
+    bus.defer("character_updated", coalesce=True)
+    bus.defer("message")
+
+    # 延迟事件入队，同步事件立即分发
+    bus.emit("character_updated", {"power": 1})
+    bus.emit("message", "第一条")
+    bus.emit("character_updated", {"power": 2})
+    bus.emit("message", "第二条")
+    bus.emit("day_changed", 2)
+    assert received == [("day_changed", 2)]
+    assert bus.queued == 3
+
+    # 合并后的事件保留首次入队的位置，数据为最新一次
+    assert bus.drain(max_events=2) == 2
+    assert received[1:] == [("character_updated", {"power": 2}), ("message", "第一条")]
+    assert bus.drain() == 1
+    assert received[-1] == ("message", "第二条")
+
+    # 分发完成后再次更新会重新入队
+    bus.emit("character_updated", {"power": 3})
+    bus.undefer("character_updated")
+    bus.emit("character_updated", {"power": 4})
+    assert received[-1] == ("character_updated", {"power": 4})
+    bus.drain()
+    assert received[-1] == ("character_updated", {"power": 3})
+
+    # 另一线程持续入队合并事件时，最后一次更新不会丢失
+    bus.defer("character_updated", coalesce=True)
+    done = threading.Event()
+    def post_updates():
+        for power in range(2000):
+            bus.emit("character_updated", {"power": power})
+        done.set()
+    poster = threading.Thread(target=post_updates)
+    poster.start()
+    while not done.is_set():
+        bus.drain()
+    poster.join()
+    bus.drain()
+    assert received[-1] == ("character_updated", {"power": 1999}) and bus.queued == 0
+    print(f"分发事件: {len(received)}")
+
+def test_event_profiling():
+    """测试事件分发性能统计"""
+    print("\n=== 测试事件分发统计 ===")
+
+    bus = EventBus()
+
+    def on_day(data):
+        bus.emit("message", f"第{data}天")
+
+    bus.subscribe("day_changed", on_day)
+    bus.subscribe("message", lambda data: None)
+
+    # 未开启时不记录
+    bus.emit("day_changed", 1)
+    assert bus.profiler is None
+
+    profiler = bus.enable_profiling()
+    for day in range(2, 5):
+        bus.emit("day_changed", day)
+    bus.emit("unheard_event")
+
+    report = profiler.report()
+    events = {row["event_type"]: row for row in report["events"]}
+    assert events["day_changed"]["count"] == 3
+    assert events["message"]["count"] == 3 and events["message"]["max_depth"] == 2
+    assert events["unheard_event"]["count"] == 1
+    assert report["max_depth"] == 2
+    subscribers = {row["subscriber"]: row for row in report["subscribers"]}
+    assert subscribers[f"{__name__}.test_event_profiling.<locals>.on_day"]["calls"] == 3
+
+    # 经事件中继订阅的回调按实际的订阅者统计
+    def on_relayed(data):
+        pass
+    relay_bus = EventBus()
+    relay = EventRelay(relay_bus)
+    relay.subscribe("day_changed", on_relayed)
+    relay_profiler = relay_bus.enable_profiling()
+    relay_bus.emit("day_changed", 5)
+    relayed = [row["subscriber"] for row in relay_profiler.report()["subscribers"]]
+    assert relayed == [f"{__name__}.test_event_profiling.<locals>.on_relayed"]
+    relay.close()
+
+    # 导出JSON与CSV
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "events.json")
+        csv_path = os.path.join(directory, "events.csv")
+        profiler.dump(json_path)
+        profiler.dump(csv_path)
+        with open(json_path, encoding="utf-8") as f:
+            assert json.load(f)["max_depth"] == 2
+        with open(csv_path, encoding="utf-8") as f:
+            assert len(f.read().splitlines()) == 1 + len(report["events"]) + len(report["subscribers"])
+
+    assert bus.disable_profiling() is profiler and bus.profiler is None
+    print(f"统计事件类型: {len(report['events'])}")
+
+def test_weak_subscriptions():
+    """测试弱引用订阅与退订"""
+    print("\n=== 测试弱引用订阅 ===")
+
+    class Listener:
+        def __init__(self):
+            self.received = []
+
+        def on_event(self, data):
+            self.received.append(data)
+
+    bus = EventBus()
+    listener = Listener()
+    bus.subscribe("npc_action", listener.on_event)
+    received = []
+    token = bus.subscribe("npc_action", received.append)
+    bus.emit("npc_action", 1)
+    assert listener.received == [1] and received == [1]
+
+    # 对象被回收后自动移除
+    del listener
+    gc.collect()
+    assert bus.listener_count("npc_action") == 1
+
+    # 凭据退订
+    token.unsubscribe()
+    bus.emit("npc_action", 2)
+    assert received == [1]
+    assert bus.listener_count("npc_action") == 0
+
+    # 按事件类型与原回调退订；强引用订阅不随对象回收
+    kept = Listener()
+    bus.subscribe("npc_action", kept.on_event)
+    bus.unsubscribe("npc_action", kept.on_event)
+    bus.subscribe("npc_action", Listener().on_event, weak=False)
+    gc.collect()
+    assert bus.listener_count("npc_action") == 1
+
+    # 分发过程中退订不影响本次分发的其余监听器
+    calls = []
+    tokens = []
+    bus.subscribe("day_changed", lambda data: (calls.append("first"), tokens[0].unsubscribe()))
+    tokens.append(bus.subscribe("day_changed", lambda data: calls.append("second")))
+    bus.emit("day_changed")
+    bus.emit("day_changed")
+    assert calls == ["first", "second", "first"]
+
+    # 分发过程中新增的订阅者从下一次事件开始接收
+    late = []
+    bus.subscribe("month_changed", lambda data: bus.subscribe("month_changed", late.append))
+    bus.emit("month_changed", 1)
+    assert late == []
+    bus.emit("month_changed", 2)
+    assert late == [2]
+    print(f"监听器数量: {bus.listener_count('day_changed')}")
+
+def test_event_relay():
+    """测试跨线程事件中继"""
+    print("\n=== 测试跨线程事件中继 ===")
+
+    bus = EventBus()
+    relay = EventRelay(bus)
+    notified = []
+    relay._notify = lambda: notified.append(threading.get_ident())
+    received = []
+    relay.subscribe("message", lambda data: received.append((threading.get_ident(), data)))
+    relay.subscribe("character_updated", lambda data: received.append((threading.get_ident(), data)), coalesce=True)
+
+    # 所属线程发出的事件直接分发
+    owner = threading.get_ident()
+    bus.emit("message", "主线程")
+    assert received == [(owner, "主线程")]
+
+    # 其他线程发出的事件入队，由所属线程批量分发
+    def simulate():
+        for day in range(3):
+            bus.emit("message", f"第{day}天")
+            bus.emit("character_updated", {"day": day})
+
+    worker = threading.Thread(target=simulate)
+    worker.start()
+    worker.join()
+    assert len(received) == 1 and relay.queued == 4
+    assert len(notified) == 1 and notified[0] != owner
+
+    assert relay.flush(max_events=2) == 2
+    assert relay.flush() == 2
+    assert received[1:] == [(owner, "第0天"), (owner, {"day": 2}), (owner, "第1天"), (owner, "第2天")]
+
+    relay.close()
+    bus.emit("message", "已关闭")
+    assert len(received) == 5
+    print(f"中继事件: {len(received)}")
+
+def test_lazy_payloads():
+    """测试惰性事件数据"""
+    print("\n=== 测试惰性事件数据 ===")
+
+    bus = EventBus()
+    built = []
+
+    def build(name):
+        built.append(name)
+        return f"{name} 在静心修炼"
+
+    # 无订阅者时不构造数据
+    assert not bus.has_subscribers("message")
+    bus.emit_lazy("message", build, "张三")
+    assert built == []
+
+    received = []
+    token = bus.subscribe("message", received.append)
+    assert bus.has_subscribers("message")
+    bus.emit_lazy("message", build, "张三")
+    bus.emit_lazy("message", "{} 历练归来".format, "李四")
+    assert built == ["张三"]
+    assert received == ["张三 在静心修炼", "李四 历练归来"]
+
+    # 被静默或退订后视为没有订阅者
+    with bus.suppress("message"):
+        assert not bus.has_subscribers("message")
+        bus.emit_lazy("message", build, "王五")
+    token.unsubscribe()
+    assert not bus.has_subscribers("message")
+    assert built == ["张三"]
+    print(f"构造次数: {len(built)}")
+
+def test_message_log():
+    """测试消息日志环形缓冲"""
+    print("\n=== 测试消息日志 ===")
+
+    log = MessageLog(capacity=3)
+    npc_message = Message.factory("npc")
+    log.append("普通消息")
+    log.append(npc_message("{} 在静心修炼", "张三"))
+    log.append(Message("造成 10 点物理伤害", "combat"))
+
+    # 带来源的消息仍是字符串
+    assert npc_message("{} 在静心修炼", "张三") == "张三 在静心修炼"
+    assert [entry.source for entry in log.entries] == ["general", "npc", "combat"]
+
+    # 超出容量时丢弃最早的消息，序号保持递增
+    log.append(Message("奇遇：山洞", "encounter"))
+    assert len(log) == 3 and log.first_seq == 1 and log.next_seq == 4
+    assert log.get(0) is None and log.get(3).text == "奇遇：山洞"
+
+    log.set_capacity(2)
+    assert [entry.seq for entry in log.entries] == [2, 3]
+    print(f"日志条数: {len(log)}")
+
+def test_derived_stats():
+    """测试衍生属性图"""
+    print("\n=== 测试衍生属性图 ===")
+
+    graph = DerivedStatGraph(DERIVED_STATS)
+    manager = EntityManager()
+    entity = manager.create_entity()
+    attrs = AttributeComponent(constitution=5, determination=3, bone_root=6, charm=4, luck=3)
+    entity.add_component(AttributeComponent, attrs)
+    assert graph.dependents("constitution") == ["max_health"]
+
+    # 首次计算全部衍生属性
+    assert len(graph.update(entity)) == len(DERIVED_STATS)
+    assert attrs.max_health == 130 and attrs.health == 130
+    assert attrs.max_mana == 50 and attrs.martial_bonus == 6 and attrs.social_bonus == 5
+    assert [m.source for m in get_modifiers(entity, "max_health")] == ["attribute:constitution"]
+
+    # 输入未变化时不重新计算
+    assert graph.update(entity) == []
+
+    # 只重新计算依赖体质的属性，其他来源叠加的生命上限得以保留
+    attrs.max_health += 20
+    attrs.health = 100
+    attrs.constitution = 6
+    assert graph.update(entity) == ["max_health"]
+    assert attrs.max_health == 165 and attrs.health == 115
+
+    graph.forget(entity.id)
+    assert entity.id not in graph.memo
+
+    # 衍生加成与百分比修正的结果与应用顺序无关
+    results = []
+    for realm_first in (True, False):
+        graph = DerivedStatGraph(DERIVED_STATS)
+        entity = manager.create_entity()
+        attrs = AttributeComponent(constitution=3)
+        entity.add_component(AttributeComponent, attrs)
+        graph.update(entity)
+        if realm_first:
+            add_modifier(entity, "max_health", "realm", 0.5, PERCENT)
+        attrs.constitution = 5
+        graph.update(entity)
+        assert attrs.max_health == (195 if realm_first else 130)
+        add_modifier(entity, "max_health", "realm", 0.5, PERCENT)
+        add_modifier(entity, "max_health", "sect", 0.0, PERCENT)
+        results.append(attrs.max_health)
+    assert results == [195, 195]
+
+    # 每日结算只比较维护中角色的组件版本，不记录其他实体的变更
+    system = AttributeEffectSystem(manager)
+    assert not any(manager.dirty_sets.values())
+    player = manager.create_entity()
+    player.add_component(AttributeComponent, AttributeComponent(constitution=3))
+    other = manager.create_entity()
+    other.add_component(AttributeComponent, AttributeComponent(constitution=3))
+    system._calculate_attribute_effects(player.id)
+    assert set(system.entities) == {player.id}
+    player_attrs = player.get_component(AttributeComponent)
+    player_attrs.constitution = 4
+    other.get_component(AttributeComponent).constitution = 9
+    system._update_changed_entities()
+    assert player_attrs.max_health == 115 and other.get_component(AttributeComponent).max_health == 100
+    assert system.entities[player.id] == player_attrs.version
+    manager.destroy_entity(player.id)
+    system._update_changed_entities()
+    assert system.entities == {}
+    print(f"生命上限: {results[0]}")
+
+def test_lazy_data_manager():
+    """测试按需加载的数据管理器"""
+    print("\n=== 测试数据管理器 ===")
+
+    data = DataManager()
+    assert data.data_cache == {}
+
+    # 只加载被访问的数据类型
+    assert data.get_static_data('spell', 'fire_snake')['element'] == 'fire'
+    assert set(data.data_cache) == {'spell'}
+    assert data.get_static_data('spell', 'missing') is None
+    assert 'spells' in data.get_static_data('spell')
+
+    # 二级索引
+    assert [spell['id'] for spell in data.find('spell', 'element', 'fire')] == ['fire_snake']
+    assert [e['id'] for e in data.find('encounters', 'location', 'mountain')] == ['mysterious_cave']
+    assert data.find('item', 'type', 'no_such_type') == []
+    assert len(data.records('encounters')) == len(data.get_static_data('encounters')['encounters'])
+
+    assert data.get_static_data('unknown', 'x') is None
+    assert data.get_character_template() is not None
+    print(f"已加载: {sorted(data.data_cache)}")
+
+def test_data_catalog():
+    """测试编译数据目录"""
+    print("\n=== 测试数据目录 ===")
+
+    with tempfile.TemporaryDirectory() as root:
+        data_dir = os.path.join(root, "data")
+        os.makedirs(data_dir)
+        catalog_path = os.path.join(root, "build", "catalog.pickle")
+        for name, content in (("spell.json", {"spells": {"fire_snake": {"id": "fire_snake"}}}),
+                              ("config.json", {"character": {"initial_power": 0}})):
+            with open(os.path.join(data_dir, name), "w", encoding="utf-8") as f:
+                json.dump(content, f)
+
+        # 未编译时退回解析JSON
+        catalog = DataCatalog(data_dir, catalog_path)
+        assert catalog.load("spell.json")["spells"]["fire_snake"]["id"] == "fire_snake"
+        assert catalog.fallbacks == 1 and catalog.stale_sources() == ["config.json", "spell.json"]
+
+        assert compile_catalog(data_dir, catalog_path) == ["config.json", "spell.json"]
+        catalog = DataCatalog(data_dir, catalog_path)
+        assert catalog.load("config.json") == {"character": {"initial_power": 0}}
+        assert catalog.hits == 1 and catalog.stale_sources() == []
+
+        # 源文件修改后该文件退回解析JSON，其余文件仍读目录
+        with open(os.path.join(data_dir, "config.json"), "w", encoding="utf-8") as f:
+            json.dump({"character": {"initial_power": 10}}, f)
+        assert catalog.load("config.json")["character"]["initial_power"] == 10
+        assert catalog.stale_sources() == ["config.json"]
+        assert "fire_snake" in catalog.load("spell.json")["spells"]
+
+        # 校验失败时不写入目录
+        with open(os.path.join(data_dir, "spell.json"), "w", encoding="utf-8") as f:
+            json.dump({"spells": {"fire_snake": {"id": "ice_prison"}}}, f)
+        try:
+            compile_catalog(data_dir, catalog_path)
+            assert False, "应当校验失败"
+        except CatalogError as e:
+            assert len(e.errors) == 1
+        catalog.invalidate()
+        assert catalog.stale_sources() == ["config.json", "spell.json"]
+    print("目录编译、过期检测与校验正常")
+
+def test_content_registry():
+    """测试共享内容注册表"""
+    print("\n=== 测试内容注册表 ===")
+
+    # 各系统读取的是同一份只读数据
+    stances, regions = StanceSystem().config, RegionSystem().config
+    taiwu = content_registry.get("taiwu_system.json")
+    assert stances is taiwu["stances"] and regions is taiwu["regions"]
+    assert SectManager().sects_data is content_registry.get("sects.json")
+    assert SkillManager().skills_data is content_registry.get("skills.json")
+    try:
+        taiwu["stances"]["neutral"] = {}
+        assert False, "共享数据应为只读"
+    except TypeError:
+        pass
+    assert dict(taiwu["regions"]) == regions
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = os.path.join(data_dir, "config.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"events": {"train": [1, 2]}}, f)
+        registry = ContentRegistry(DataCatalog(data_dir, os.path.join(data_dir, "missing.pickle")))
+
+        # 每个文件只解析一次
+        config = registry.get("config.json")
+        assert registry.get("config.json") is config and registry.loads == 1
+        assert registry.section("config.json", "events")["train"] == [1, 2]
+        assert registry.section("config.json", "missing") == {}
+        assert registry.get("missing.json", None) is None
+
+        # 显式失效后重新读取
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"events": {}}, f)
+        assert registry.get("config.json") is config
+        registry.invalidate("config.json")
+        assert registry.get("config.json") == {"events": {}} and registry.loads == 2
+    print(f"已缓存: {content_registry.loaded()}")
+
+def test_skill_catalog():
+    """测试技能目录与攻击加成"""
+    print("\n=== 测试技能目录 ===")
+
+    skills = SkillManager()
+    all_skills = skills._get_all_skills()
+    assert skills._get_all_skills() is all_skills
+    assert set(content_registry.get("sects.json")["sect_skills"]) <= set(all_skills)
+
+    # 可学技能与逐个比较修为需求的结果一致
+    for power in (0, 10, 40, 100, 10 ** 6):
+        expected = {skill_id for skill_id, skill in all_skills.items()
+                    if power >= skill.get("power_requirement", 0)}
+        assert {skill_id for skill_id, _ in skills.get_available_skills(power)} == expected
+
+    # 攻击加成随学习累加，目录失效后重新累计结果不变
+    learned = [skill_id for skill_id, _ in skills.get_available_skills(10 ** 6)[:4]]
+    for skill_id in learned:
+        assert skills.learn_skill(skill_id)
+    assert not skills.learn_skill(learned[0])
+    physical = sum(all_skills[s].get("physical_attack", 0) for s in learned if all_skills[s].get("type") == "physical")
+    spell = sum(all_skills[s].get("spell_attack", 0) for s in learned if all_skills[s].get("type") == "spell")
+    assert skills.get_total_attack_power() == (physical, spell)
+    assert not set(learned) & {skill_id for skill_id, _ in skills.get_available_skills(10 ** 6)}
+    skills.invalidate()
+    assert skills.get_total_attack_power() == (physical, spell)
+    print(f"技能: {len(all_skills)}，攻击加成: {(physical, spell)}")
+
+def test_data_hot_reload():
+    """测试数据文件热重载"""
+    print("\n=== 测试数据热重载 ===")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        def write(name, content):
+            with open(os.path.join(data_dir, name), "w", encoding="utf-8") as f:
+                json.dump(content, f)
+
+        write("spell.json", {"spells": {"fire_snake": {"id": "fire_snake", "element": "fire"}}})
+        write("item.json", {"herb": {"id": "herb", "type": "consumable"}})
+        specs = {
+            "spell": DataSpec(os.path.join(data_dir, "spell.json"), records="spells",
+                              indexes={"element": lambda spell: spell.get("element")}),
+            "item": DataSpec(os.path.join(data_dir, "item.json")),
+        }
+        data = DataManager(specs, DataCatalog(data_dir, os.path.join(data_dir, "missing.pickle")))
+        old_spell = data.get_static_data("spell", "fire_snake")
+        herb = data.get_static_data("item", "herb")
+        assert data.reload_changed() == []
+
+        # 独立数据目录的重新加载事件不发到全局事件总线
+        assert data.events is not event_bus
+        reloads = []
+        data.events.subscribe("data_reloaded", reloads.append)
+
+        # 只重新读取修改过的文件，新索引整体替换
+        write("spell.json", {"spells": {"fire_snake": {"id": "fire_snake", "element": "wood"},
+                                        "ice_prison": {"id": "ice_prison", "element": "water"}}})
+        assert data.reload_changed() == ["spell.json"]
+        assert reloads == [{"files": ["spell.json"], "data_types": ["spell"]}]
+        assert data.get_static_data("spell", "ice_prison")["element"] == "water"
+        assert data.find("spell", "element", "fire") == []
+        assert [spell["id"] for spell in data.find("spell", "element", "wood")] == ["fire_snake"]
+        assert old_spell["element"] == "fire"
+        assert data.get_static_data("item", "herb") is herb
+        assert data.reload_changed() == []
+
+        # 保存到一半的文件不会替换原有数据，修好后下次检查时重新加载
+        with open(os.path.join(data_dir, "spell.json"), "w", encoding="utf-8") as f:
+            f.write('{"spells": {"fire_snake": ')
+        assert data.reload_changed() == [] and len(reloads) == 1
+        assert len(data.records("spell")) == 2 and "spell.json" in data.reload_errors
+        write("spell.json", {"spells": {"fire_snake": {"id": "fire_snake", "element": "fire"}}})
+        assert data.reload_changed() == ["spell.json"] and data.reload_errors == {}
+        assert [spell["id"] for spell in data.find("spell", "element", "fire")] == ["fire_snake"]
+        assert len(reloads) == 2
+
+    # 技能目录只在技能或门派数据变化时失效
+    skills = SkillManager()
+    catalog = skills._get_all_skills()
+    event_bus.emit("data_reloaded", {"files": ["spell.json"], "data_types": ["spell"]})
+    assert skills._get_all_skills() is catalog
+    event_bus.emit("data_reloaded", {"files": ["sects.json"], "data_types": []})
+    assert skills._get_all_skills() is not catalog and skills._get_all_skills() == catalog
+    print(f"重新加载: {reloads[0]['files']}")
+
+if __name__ == "__main__":
+    test_event_scheduler()
+    test_message_log()
+    test_derived_stats()
+    test_lazy_data_manager()
+    test_data_catalog()
+    test_content_registry()
+    test_skill_catalog()
+    test_data_hot_reload()
+    test_lazy_payloads()
+    test_event_relay()
+    test_weak_subscriptions()
+    test_event_profiling()
+    test_deferred_events()
+    test_headless_simulation()
+    test_player_attribute_snapshots()
+    test_catch_up_simulation()
+    print("\n=== 所有测试完成 ===")
@@ -4,7 +4,7 @@ from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                                QCheckBox, QTabWidget, QWidget)
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
-import json
+from core.content import content_registry
 
 class CharacterCreationWindow(QDialog):
     """角色创建界面"""
@@ -165,8 +165,7 @@ class CharacterCreationWindow(QDialog):
     def load_config(self):
         """加载配置"""
         try:
-            with open("data/character_creation.json", "r", encoding="utf-8") as f:
-                self.config = json.load(f)
+            self.config = content_registry.get("character_creation.json")
             
             # 加载出生地
             for bp_id, bp_data in self.config["birthplaces"].items():
@@ -0,0 +1,28 @@
+from PySide6.QtCore import QObject, Signal, Qt
+from core.events import event_bus
+from core.event_relay import EventRelay
+
+class _BatchNotifier(QObject):
+    """在界面线程中接收“有新事件”通知"""
+
+    pending = Signal()
+
+class QtEventBridge(EventRelay):
+    """Qt事件桥 - 模拟线程发出的事件批量转交到界面主线程分发
+
+    需在界面线程中创建。每批事件只发出一次排队信号，
+    由Qt事件循环在主线程调用 flush，界面控件不会被其他线程直接访问。
+    """
+
+    def __init__(self, bus=event_bus, max_events_per_batch: int = 200):
+        super().__init__(bus)
+        self.max_events_per_batch = max_events_per_batch
+        self._notifier = _BatchNotifier()
+        self._notifier.pending.connect(self._on_pending, Qt.QueuedConnection)
+
+    def _notify(self):
+        self._notifier.pending.emit()
+
+    def _on_pending(self):
+        # 单批数量有上限，剩余事件在下一轮事件循环中继续分发，避免界面卡顿
+        self.flush(self.max_events_per_batch)
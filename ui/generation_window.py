@@ -4,6 +4,7 @@ from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
 from core.events import event_bus
+from core.ecs.entity import format_entity_id, parse_entity_id
 from .character_creation_window import CharacterCreationWindow
 
 class GenerationWindow(QDialog):
@@ -131,11 +132,20 @@ class GenerationWindow(QDialog):
     
     def _setup_event_handlers(self):
         """设置事件处理"""
-        event_bus.subscribe("character_created", self._on_character_created)
-        event_bus.subscribe("marriage_success", self._on_marriage_success)
-        event_bus.subscribe("child_born", self._on_child_born)
-        event_bus.subscribe("generation_changed", self._on_generation_changed)
-        event_bus.subscribe("marriage_candidates_found", self._on_candidates_found)
+        self._subscriptions = [
+            event_bus.subscribe("character_created", self._on_character_created),
+            event_bus.subscribe("marriage_success", self._on_marriage_success),
+            event_bus.subscribe("child_born", self._on_child_born),
+            event_bus.subscribe("generation_changed", self._on_generation_changed),
+            event_bus.subscribe("marriage_candidates_found", self._on_candidates_found),
+        ]
+    
+    def done(self, result):
+        """关闭对话框时退订事件，已关闭的窗口不再处理事件"""
+        for subscription in self._subscriptions:
+            subscription.unsubscribe()
+        self._subscriptions = []
+        super().done(result)
     
     def showEvent(self, event):
         """窗口显示时初始化"""
@@ -202,7 +212,7 @@ class GenerationWindow(QDialog):
                 item_text += f" (子女: {len(info['children'])}人)"
             
             item = QListWidgetItem(item_text)
-            item.setData(Qt.UserRole, char_id)
+            item.setData(Qt.UserRole, format_entity_id(char_id))
             self.family_tree_list.addItem(item)
     
     def _update_marriage_status(self):
@@ -236,7 +246,7 @@ class GenerationWindow(QDialog):
                 child_info = self.generation_system.family_tree.get(child_id)
                 if child_info:
                     item = QListWidgetItem(child_info['name'])
-                    item.setData(Qt.UserRole, child_id)
+                    item.setData(Qt.UserRole, format_entity_id(child_id))
                     self.children_list.addItem(item)
     
     def find_marriage_candidates(self):
@@ -260,7 +270,7 @@ class GenerationWindow(QDialog):
         """切换世代"""
         current_item = self.children_list.currentItem()
         if current_item and self.generation_system:
-            child_id = current_item.data(Qt.UserRole)
+            child_id = parse_entity_id(current_item.data(Qt.UserRole))
             
             # 确认对话框
             reply = QMessageBox.question(self, "确认传承", 
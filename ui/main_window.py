@@ -1,8 +1,12 @@
-from PySide6.QtWidgets import QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QLabel, QPushButton, QTextEdit, QProgressBar, QMenuBar, QMenu, QListWidget
+from PySide6.QtWidgets import QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QLabel, QPushButton, QProgressBar, QMenuBar, QMenu, QListWidget, QComboBox
 from PySide6.QtCore import Qt, QTimer, QSize
 from PySide6.QtGui import QFont, QIcon, QAction
 from core.events import event_bus
+from core.game_engine import game_engine
 from core.encounter_ui import EncounterDialog
+from core.message_log import MessageLog
+from .event_bridge import QtEventBridge
+from .message_view import MessageLogView
 from .theme_manager import theme_manager
 from .inventory_window import InventoryWindow
 from .skills_window import SkillsWindow
@@ -14,11 +18,28 @@ from .martial_window import MartialWindow
 
 
 class MainWindow(QMainWindow):
-    def __init__(self, game):
+    # 消息日志最多保留的条数
+    MESSAGE_LOG_CAPACITY = 5000
+    # 消息筛选项：显示名 -> 来源（None为全部）
+    MESSAGE_FILTERS = [
+        ("全部消息", None),
+        ("战斗", ["combat"]),
+        ("人物", ["npc"]),
+        ("奇遇", ["encounter"]),
+        ("其他", ["general"]),
+    ]
+    
+    def __init__(self, game, threaded_simulation=False):
         super().__init__()
         self.game = game
+        # 模拟在后台线程运行时，界面只通过事件桥在主线程接收事件
+        self.threaded_simulation = threaded_simulation
+        # 上次刷新时的时间显示，未变化时跳过重绘
+        self._time_display = None
         self.setup_ui()
         self.setup_events()
+        if self.threaded_simulation:
+            game_engine.start_thread(0.1)
         
     def setup_ui(self):
         self.setWindowTitle("The Path to Divinity")
@@ -206,46 +227,57 @@ class MainWindow(QMainWindow):
         # 游戏主循环定时器
         self.game_timer = QTimer()
         self.game_timer.timeout.connect(self.game.update)
-        self.game_timer.start(100)  # 100ms更新一次
-        
-        # 消息区域
-        self.message_area = QTextEdit()
-        self.message_area.setReadOnly(True)
+        if not self.threaded_simulation:
+            self.game_timer.start(100)  # 100ms更新一次
+        
+        # 消息区域：环形缓冲 + 只绘制可见行的列表视图，每帧批量追加
+        self.message_log = MessageLog(self.MESSAGE_LOG_CAPACITY)
+        self.message_filter = QComboBox()
+        for label, _ in self.MESSAGE_FILTERS:
+            self.message_filter.addItem(label)
+        self.message_filter.currentIndexChanged.connect(
+            lambda index: self.message_area.set_sources(self.MESSAGE_FILTERS[index][1]))
+        layout.addWidget(self.message_filter)
+        self.message_area = MessageLogView(self.message_log)
         layout.addWidget(self.message_area)
         
-        # 初始化时同步ECS实体数据
-        self.sync_character_data()
+        # 初始化时同步ECS实体数据（模拟线程尚未启动）
+        player_attributes = self.game.player_attributes()
+        if player_attributes:
+            self.update_character_info(player_attributes)
         
         # 添加测试按钮（仅在开发阶段）
         test_layout = QHBoxLayout()
         self.test_encounter_btn = QPushButton("测试奇遇")
         self.test_spell_btn = QPushButton("测试法术")
-        self.test_encounter_btn.clicked.connect(self.test_encounter)
-        self.test_spell_btn.clicked.connect(self.test_spell)
+        self.test_encounter_btn.clicked.connect(lambda: self._run_locked(self.test_encounter))
+        self.test_spell_btn.clicked.connect(lambda: self._run_locked(self.test_spell))
         test_layout.addWidget(self.test_encounter_btn)
         test_layout.addWidget(self.test_spell_btn)
         layout.addLayout(test_layout)
         
     def setup_events(self):
-        event_bus.subscribe("character_updated", self.update_character_info)
-        event_bus.subscribe("message", self.add_message)
-        event_bus.subscribe("day_changed", self.update_day)
-        event_bus.subscribe("skill_learned", self.update_skills)
-        event_bus.subscribe("sect_joined", self.update_sect)
-        event_bus.subscribe("month_changed", self.update_month)
-        event_bus.subscribe("stance_changed", self.update_stance)
-        event_bus.subscribe("xiangshu_phase_change", self.update_xiangshu)
-        event_bus.subscribe("encounter_started", self.show_encounter_dialog)
-        
-        # 定期同步数据
-        self.sync_timer = QTimer()
-        self.sync_timer.timeout.connect(self.sync_character_data)
-        self.sync_timer.start(1000)  # 每秒同步一次
-        
-        # 时间更新定时器
-        self.time_timer = QTimer()
-        self.time_timer.timeout.connect(self.update_time_display)
-        self.time_timer.start(500)  # 每0.5秒更新一次
+        # 界面订阅都经过事件桥：无论事件在哪个线程发出，回调都在界面主线程执行
+        self.event_bridge = QtEventBridge()
+        self.event_bridge.subscribe("character_updated", self.update_character_info, coalesce=True)
+        # 玩家属性由模拟线程在帧末发布快照，界面线程无需持锁读取
+        self.event_bridge.subscribe("player_attributes", self.update_character_info, coalesce=True)
+        self.event_bridge.subscribe("message", self.add_message)
+        self.event_bridge.subscribe("day_changed", self.update_day)
+        self.event_bridge.subscribe("skill_learned", self.update_skills)
+        self.event_bridge.subscribe("sect_joined", self.update_sect)
+        self.event_bridge.subscribe("month_changed", self.update_month)
+        self.event_bridge.subscribe("stance_changed", self.update_stance)
+        self.event_bridge.subscribe("xiangshu_phase_change", self.update_xiangshu)
+        self.event_bridge.subscribe("encounter_started", self.show_encounter_dialog)
+        
+        # 角色面板只需反映每帧的最终状态：延迟到帧末分发，同一帧内多次更新合并为一次
+        event_bus.defer("character_updated", coalesce=True)
+        
+        # 每帧检查时间显示，只有变化时才重绘
+        self.refresh_timer = QTimer()
+        self.refresh_timer.timeout.connect(self.refresh_if_changed)
+        self.refresh_timer.start(100)
         
         # 游戏速度状态
         self.current_speed_index = 0
@@ -290,7 +322,8 @@ class MainWindow(QMainWindow):
             return "状态: 正常"
         
     def add_message(self, message):
-        self.message_area.append(message)
+        # 只写入日志，视图在下一帧统一刷新
+        self.message_log.append(message)
         
     def start_action(self, action, duration):
         if self.remaining_time > 0:
@@ -312,10 +345,11 @@ class MainWindow(QMainWindow):
             self.set_buttons_enabled(True)
             
     def execute_action(self):
-        if self.current_action == "train":
-            self.game.train()
-        elif self.current_action == "adventure":
-            self.game.adventure()
+        with game_engine.lock:
+            if self.current_action == "train":
+                self.game.train()
+            elif self.current_action == "adventure":
+                self.game.adventure()
         self.current_action = None
         
     def set_buttons_enabled(self, enabled):
@@ -326,9 +360,18 @@ class MainWindow(QMainWindow):
         # 旧的日期更新方法，保留兼容性
         pass
         
+    def refresh_if_changed(self):
+        """时间变化时刷新界面"""
+        self.update_time_display()
+        
     def update_time_display(self):
-        """更新时间显示"""
+        """更新时间显示（时间、速度和暂停状态都未变化时跳过）"""
         time_info = self.game.get_time_info()
+        display = (time_info['year'], time_info['month'], time_info['day'],
+                   time_info['game_speed'], time_info['paused'])
+        if display == self._time_display:
+            return
+        self._time_display = display
         self.time_label.setText(f"第{time_info['year']}年 第{time_info['month']}月 第{time_info['day']}天")
         self.speed_label.setText(f"{time_info['game_speed']:.1f}x")
         
@@ -357,59 +400,39 @@ class MainWindow(QMainWindow):
             self.pause_btn.setText("暂停")
     
     def toggle_pause(self):
-        """切换暂停状态"""
-        self.game.pause_game()
+        """切换暂停状态（修改引擎状态，需持有模拟锁）"""
+        self._run_locked(self.game.pause_game)
     
     def cycle_speed(self):
-        """循环切换游戏速度"""
+        """循环切换游戏速度（修改引擎状态，需持有模拟锁）"""
         self.current_speed_index = (self.current_speed_index + 1) % len(self.speed_options)
         new_speed = self.speed_options[self.current_speed_index]
-        self.game.set_game_speed(new_speed)
+        self._run_locked(lambda: self.game.set_game_speed(new_speed))
         
     def update_skills(self, skill_data):
-        self.skills_list.clear()
-        learned = self.game.skill_manager.get_learned_skills()
+        # 技能管理器与角色对象属于游戏世界，持锁读取和修改
+        with game_engine.lock:
+            learned = self.game.skill_manager.get_learned_skills()
+            
+            # 更新攻击力
+            physical, spell = self.game.skill_manager.get_total_attack_power()
+            char = self.game.character
+            char.physical_attack = 5 + physical
+            char.spell_attack = spell
+            event_bus.emit("character_updated", dict(char.__dict__))
         
+        self.skills_list.clear()
         if learned:
             for skill_id, skill in learned:
                 skill_text = f"{skill['name']} ({skill.get('realm', skill.get('grade', '未知'))})"
                 self.skills_list.addItem(skill_text)
         else:
             self.skills_list.addItem("尚未学会任何功法")
-            
-        # 更新攻击力
-        physical, spell = self.game.skill_manager.get_total_attack_power()
-        char = self.game.character
-        char.physical_attack = 5 + physical
-        char.spell_attack = spell
-        event_bus.emit("character_updated", char.__dict__)
-        
-    def sync_character_data(self):
-        """同步角色数据从 ECS 实体到主界面"""
-        from core.world_manager import world_manager
-        if hasattr(self.game, 'player_entity_id'):
-            player_entity = world_manager.get_entity(self.game.player_entity_id)
-            if player_entity:
-                attr = player_entity.get_component("AttributeComponent")
-                if attr:
-                    # 更新主界面显示的数据
-                    char_data = {
-                        'power': getattr(attr, 'power', self.game.character.power),
-                        'age': attr.age,
-                        'talent': getattr(attr, 'talent', self.game.character.talent),
-                        'physical_attack': attr.physical_attack,
-                        'spell_attack': attr.spell_attack,
-                        'health': attr.health,
-                        'max_health': attr.max_health,
-                        'mana': attr.mana,
-                        'max_mana': attr.max_mana
-                    }
-                    self.update_character_info(char_data)
         
     def closeEvent(self, event):
         """窗口关闭事件"""
-        from core.game_engine import game_engine
         game_engine.stop()
+        self.event_bridge.close()
         event.accept()
         
     def update_sect(self, sect_data):
@@ -458,40 +481,50 @@ class MainWindow(QMainWindow):
         theme_action.triggered.connect(self.toggle_theme)
         settings_menu.addAction(theme_action)
     
+    def _run_locked(self, action):
+        """持有模拟锁执行会修改游戏世界的界面操作"""
+        with game_engine.lock:
+            return action()
+    
+    def _exec_dialog(self, dialog):
+        """模态显示对话框，期间持有模拟锁（后台模拟线程暂停推进）"""
+        with game_engine.lock:
+            return dialog.exec()
+    
     def open_character_window(self):
         """打开角色界面"""
         dialog = CharacterWindow(self.game, self)
-        dialog.exec()
+        self._exec_dialog(dialog)
     
     def open_inventory_window(self):
         """打开背包界面"""
         dialog = InventoryWindow(self.game, self)
-        dialog.exec()
+        self._exec_dialog(dialog)
     
     def open_skills_window(self):
         """打开技能界面"""
         dialog = SkillsWindow(self.game, self)
-        dialog.exec()
+        self._exec_dialog(dialog)
     
     def open_npc_window(self):
         """打开NPC互动界面"""
         dialog = NPCWindow(self.game, self)
-        dialog.exec()
+        self._exec_dialog(dialog)
     
     def open_taiwu_window(self):
         """打开太吾系统界面"""
         dialog = TaiwuWindow(self.game, self)
-        dialog.exec()
+        self._exec_dialog(dialog)
     
     def open_generation_window(self):
         """打开世代传承界面"""
         dialog = GenerationWindow(self.game, self)
-        dialog.exec()
+        self._exec_dialog(dialog)
     
     def open_martial_window(self):
         """打开武学体系界面"""
         dialog = MartialWindow(self.game, self)
-        dialog.exec()
+        self._exec_dialog(dialog)
     
     def update_month(self, month_data):
         """更新月份信息"""
@@ -574,4 +607,4 @@ class MainWindow(QMainWindow):
         entity_id = event_data["entity_id"]
         
         dialog = EncounterDialog(encounter, entity_id, self)
-        dialog.exec()
\ No newline at end of file
+        self._exec_dialog(dialog)
\ No newline at end of file
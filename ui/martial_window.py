@@ -6,7 +6,6 @@ from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QFont, QColor
 from core.events import event_bus
 import random
-import json
 
 class MartialWindow(QDialog):
     """武学系统界面"""
@@ -16,6 +15,8 @@ class MartialWindow(QDialog):
         self.game = game
         self.martial_system = None
         self.combat_strategy = None
+        # 上次刷新武学列表时玩家实体的版本戳
+        self._player_version = None
         self.setup_ui()
         self._setup_event_handlers()
         
@@ -321,9 +322,18 @@ class MartialWindow(QDialog):
     
     def _setup_event_handlers(self):
         """设置事件处理"""
-        event_bus.subscribe("martial_learned", self._on_martial_learned)
-        event_bus.subscribe("training_completed", self._on_training_completed)
-        event_bus.subscribe("combat_result", self._on_combat_result)
+        self._subscriptions = [
+            event_bus.subscribe("martial_learned", self._on_martial_learned),
+            event_bus.subscribe("training_completed", self._on_training_completed),
+            event_bus.subscribe("combat_result", self._on_combat_result),
+        ]
+    
+    def done(self, result):
+        """关闭对话框时退订事件，已关闭的窗口不再处理事件"""
+        for subscription in self._subscriptions:
+            subscription.unsubscribe()
+        self._subscriptions = []
+        super().done(result)
     
     def showEvent(self, event):
         """窗口显示时初始化"""
@@ -333,12 +343,22 @@ class MartialWindow(QDialog):
         self.refresh_all_data()
     
     def refresh_all_data(self):
-        """刷新所有数据"""
-        self.refresh_martial_lists()
+        """刷新所有数据（玩家实体版本未变化时保留已有的武学列表）"""
+        player_version = self._current_player_version()
+        if player_version is None or player_version != self._player_version:
+            self.refresh_martial_lists()
+            self.refresh_synergy_effects()
         self.refresh_builds_list()
-        self.refresh_synergy_effects()
         self.update_training_progress()
     
+    def _current_player_version(self):
+        """玩家实体的版本戳（玩家实体不存在时返回None）"""
+        from core.world_manager import world_manager
+        if not hasattr(world_manager, 'player_entity_id'):
+            return None
+        player = world_manager.get_entity(world_manager.player_entity_id)
+        return player.version if player else None
+    
     def refresh_martial_lists(self):
         """刷新武学列表"""
         from core.world_manager import world_manager
@@ -348,6 +368,7 @@ class MartialWindow(QDialog):
         # 清空列表
         self.learned_list.clear()
         self.available_list.clear()
+        self._player_version = self._current_player_version()
         
         # 获取已学武学
         from core.ecs.components import SkillComponent
@@ -376,10 +397,7 @@ class MartialWindow(QDialog):
         self.builds_list.clear()
         
         try:
-            with open("data/martial_system.json", "r", encoding="utf-8") as f:
-                config = json.load(f)
-            
-            builds = config.get("recommended_builds", [])
+            builds = self.martial_system.config.get("recommended_builds", [])
             for build in builds:
                 item = QListWidgetItem(build["name"])
                 item.setData(Qt.UserRole, build)
@@ -0,0 +1,102 @@
+from PySide6.QtWidgets import QListView, QAbstractItemView
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QSortFilterProxyModel, QTimer
+from core.message_log import MessageLog
+
+SOURCE_ROLE = Qt.UserRole + 1
+
+class MessageLogModel(QAbstractListModel):
+    """消息日志模型 - 按序号映射环形缓冲中的消息
+
+    新消息先写入日志，由 flush 在每个界面帧批量通知视图，
+    被挤出缓冲的旧消息在同一次 flush 中从头部移除。
+    """
+
+    def __init__(self, log: MessageLog, parent=None):
+        super().__init__(parent)
+        self.log = log
+        self._first_seq = log.first_seq
+        self._count = len(log)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._count
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self.log.get(self._first_seq + index.row())
+        if entry is None:
+            return None
+        if role == Qt.DisplayRole:
+            return entry.text
+        if role == SOURCE_ROLE:
+            return entry.source
+        return None
+
+    def flush(self) -> int:
+        """同步日志的增删，返回新增行数"""
+        first_seq = self.log.first_seq
+        last_seq = self.log.next_seq
+        exposed_end = self._first_seq + self._count
+
+        removed = min(max(0, first_seq - self._first_seq), self._count)
+        if removed:
+            self.beginRemoveRows(QModelIndex(), 0, removed - 1)
+            self._first_seq += removed
+            self._count -= removed
+            self.endRemoveRows()
+        self._first_seq = max(self._first_seq, first_seq)
+
+        added = last_seq - max(exposed_end, first_seq)
+        if added > 0:
+            self.beginInsertRows(QModelIndex(), self._count, self._count + added - 1)
+            self._count += added
+            self.endInsertRows()
+        return max(added, 0)
+
+class MessageFilterModel(QSortFilterProxyModel):
+    """按消息来源筛选"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.sources = None
+
+    def set_sources(self, sources):
+        """设置显示的来源，None表示全部"""
+        self.sources = set(sources) if sources is not None else None
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self.sources is None:
+            return True
+        index = self.sourceModel().index(source_row, 0, source_parent)
+        return self.sourceModel().data(index, SOURCE_ROLE) in self.sources
+
+class MessageLogView(QListView):
+    """消息日志视图 - 只绘制可见行，按界面帧批量追加新消息"""
+
+    def __init__(self, log: MessageLog, parent=None, frame_ms: int = 100):
+        super().__init__(parent)
+        self.log_model = MessageLogModel(log, self)
+        self.filter_model = MessageFilterModel(self)
+        self.filter_model.setSourceModel(self.log_model)
+        self.setModel(self.filter_model)
+
+        self.setUniformItemSizes(True)
+        self.setWordWrap(False)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.timeout.connect(self.flush)
+        self.flush_timer.start(frame_ms)
+
+    def set_sources(self, sources):
+        """按来源筛选显示的消息"""
+        self.filter_model.set_sources(sources)
+
+    def flush(self):
+        """把本帧新增的消息同步到视图，停留在底部时保持跟随最新消息"""
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+        if self.log_model.flush() and at_bottom:
+            self.scrollToBottom()
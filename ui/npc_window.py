@@ -1,6 +1,7 @@
 from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QListWidget, QLabel, QPushButton, QTextEdit, QListWidgetItem
 from PySide6.QtCore import Qt
 from core.events import event_bus
+from core.ecs.entity import format_entity_id
 
 class NPCWindow(QDialog):
     """NPC互动界面"""
@@ -60,7 +61,7 @@ class NPCWindow(QDialog):
             for npc_data in nearby_npcs:
                 npc_text = f"{npc_data['name']} (修为: {npc_data['power']})"
                 item = QListWidgetItem(npc_text)
-                item.setData(Qt.UserRole, npc_data)
+                item.setData(Qt.UserRole, dict(npc_data, id=format_entity_id(npc_data["id"])))
                 self.npc_list.addItem(item)
         
         if self.npc_list.count() == 0: